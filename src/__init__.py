@@ -9,5 +9,23 @@ __author__ = 'Your Name'
 from . import data_processing
 from . import visualization
 from . import analysis
+from . import countries
+from . import shared_catalog
+from . import trends
+from . import inference
+from . import forecasting
+from . import reporting
+from . import filtering
+from . import sampling
+from . import profiling
+from . import text_analysis
+from . import backends
+from . import rules
+from . import streaming
+from . import serialization
+from . import pipeline
+from . import associations
+from . import cli
+from . import survival
 
-__all__ = ['data_processing', 'visualization', 'analysis']
+__all__ = ['data_processing', 'visualization', 'analysis', 'countries', 'shared_catalog', 'trends', 'inference', 'forecasting', 'reporting', 'filtering', 'sampling', 'profiling', 'text_analysis', 'backends', 'rules', 'streaming', 'serialization', 'pipeline', 'associations', 'cli', 'survival']
@@ -7,7 +7,44 @@ import pandas as pd
 import numpy as np
 from collections import Counter
 
+from .backends import get_backend
+from .countries import canonicalize_country
+from .data_processing import build_country_index, requires_columns
+from .forecasting import FORECAST_COLUMNS, forecast_additions
+from .rules import RECOMMENDATION_RULES, evaluate_rules
 
+# Column added by data_processing.find_duplicate_clusters
+TITLE_CLUSTER_COLUMN = 'title_cluster_id'
+
+
+def unique_titles(df):
+    """
+    Keep one row per duplicate cluster so each title is counted once
+    
+    Dataframes without a cluster id column are returned unchanged.
+    """
+    if TITLE_CLUSTER_COLUMN not in df.columns:
+        return df
+    return df.drop_duplicates(subset=TITLE_CLUSTER_COLUMN, keep='first')
+
+
+def _country_counts(df):
+    """
+    Count titles per canonical country, crediting every co-producing country
+    
+    Returns:
+    --------
+    pd.Series
+        Title counts indexed by country, sorted in descending order
+    """
+    index = build_country_index(df)
+    categories = index['country'].cat.categories
+    counts = np.bincount(index['country'].cat.codes, minlength=len(categories))
+    counts = pd.Series(counts, index=pd.Index(categories, name='country'), name='count')
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+
+@requires_columns('listed_in')
 def get_top_genres(df, n=10):
     """
     Get top N genres by count
@@ -24,10 +61,11 @@ def get_top_genres(df, n=10):
     pd.Series
         Top genres with counts
     """
-    genres = df['listed_in'].str.split(', ').explode()
-    return genres.value_counts().head(n)
+    df = unique_titles(df)
+    return get_backend().split_value_counts(df['listed_in']).head(n)
 
 
+@requires_columns('country')
 def get_top_countries(df, n=10):
     """
     Get top N countries by content count
@@ -44,9 +82,11 @@ def get_top_countries(df, n=10):
     pd.Series
         Top countries with counts
     """
-    return df['country'].value_counts().head(n)
+    df = unique_titles(df)
+    return _country_counts(df).head(n)
 
 
+@requires_columns('director')
 def get_top_directors(df, n=10):
     """
     Get top N directors by content count
@@ -63,11 +103,11 @@ def get_top_directors(df, n=10):
     pd.Series
         Top directors with counts
     """
-    directors = df['director'].str.split(', ').explode()
-    directors = directors[directors != 'Not Available']
-    return directors.value_counts().head(n)
+    df = unique_titles(df)
+    return get_backend().split_value_counts(df['director'], exclude=['Not Available']).head(n)
 
 
+@requires_columns('cast')
 def get_top_actors(df, n=10):
     """
     Get top N actors by appearances
@@ -84,11 +124,11 @@ def get_top_actors(df, n=10):
     pd.Series
         Top actors with counts
     """
-    actors = df['cast'].str.split(', ').explode()
-    actors = actors[actors != 'Not Available']
-    return actors.value_counts().head(n)
+    df = unique_titles(df)
+    return get_backend().split_value_counts(df['cast'], exclude=['Not Available']).head(n)
 
 
+@requires_columns('release_year', 'year_added', 'content_lag_years', 'type')
 def analyze_content_by_year(df):
     """
     Analyze content additions and releases by year
@@ -103,6 +143,7 @@ def analyze_content_by_year(df):
     dict
         Dictionary containing yearly analysis
     """
+    df = unique_titles(df)
     analysis = {
         'releases_by_year': df.groupby('release_year').size().to_dict(),
         'additions_by_year': df.groupby('year_added').size().to_dict(),
@@ -113,6 +154,7 @@ def analyze_content_by_year(df):
     return analysis
 
 
+@requires_columns('country', 'type', 'listed_in', 'director', 'release_year', 'rating')
 def analyze_content_by_country(df, country):
     """
     Analyze content for a specific country
@@ -122,14 +164,17 @@ def analyze_content_by_country(df, country):
     df : pd.DataFrame
         Input dataframe
     country : str
-        Country name to analyze
+        Country name to analyze; co-productions listing it are included
         
     Returns:
     --------
     dict
         Dictionary containing country-specific analysis
     """
-    country_df = df[df['country'] == country]
+    df = unique_titles(df)
+    index = build_country_index(df)
+    rows = index.loc[index['country'] == canonicalize_country(country), 'row'].to_numpy()
+    country_df = df.iloc[np.sort(rows)]
     
     analysis = {
         'total_content': len(country_df),
@@ -144,6 +189,7 @@ def analyze_content_by_country(df, country):
     return analysis
 
 
+@requires_columns('listed_in', 'year_added')
 def analyze_genre_trends(df):
     """
     Analyze genre trends over time
@@ -158,6 +204,8 @@ def analyze_genre_trends(df):
     pd.DataFrame
         Genre trends by year
     """
+    df = unique_titles(df)
+    
     # Explode genres
     df_exploded = df.copy()
     df_exploded['listed_in'] = df_exploded['listed_in'].str.split(', ')
@@ -175,6 +223,7 @@ def analyze_genre_trends(df):
     return genre_trends
 
 
+@requires_columns('country', 'director', 'cast', 'listed_in', 'rating', 'type')
 def calculate_diversity_metrics(df):
     """
     Calculate content diversity metrics
@@ -189,11 +238,13 @@ def calculate_diversity_metrics(df):
     dict
         Dictionary containing diversity metrics
     """
+    df = unique_titles(df)
+    backend = get_backend()
     metrics = {
-        'unique_countries': df['country'].nunique(),
-        'unique_directors': df['director'].str.split(', ').explode().nunique(),
-        'unique_actors': df['cast'].str.split(', ').explode().nunique(),
-        'unique_genres': df['listed_in'].str.split(', ').explode().nunique(),
+        'unique_countries': len(_country_counts(df)),
+        'unique_directors': backend.split_nunique(df['director']),
+        'unique_actors': backend.split_nunique(df['cast']),
+        'unique_genres': backend.split_nunique(df['listed_in']),
         'unique_ratings': df['rating'].nunique(),
         'movie_tv_ratio': len(df[df['type'] == 'Movie']) / len(df[df['type'] == 'TV Show'])
     }
@@ -201,7 +252,8 @@ def calculate_diversity_metrics(df):
     return metrics
 
 
-def analyze_optimal_launch_timing(df):
+@requires_columns('month_name', 'day_of_week', 'quarter_added', 'date_added')
+def analyze_optimal_launch_timing(df, forecast=None):
     """
     Analyze optimal launch timing based on historical data
     
@@ -209,12 +261,20 @@ def analyze_optimal_launch_timing(df):
     -----------
     df : pd.DataFrame
         Input dataframe with temporal columns
+    forecast : pd.DataFrame, optional
+        Output of forecasting.forecast_additions; adds the forward-looking
+        'forecast_best_month' and 'forecast_by_month' from a forecast of
+        total additions. A segmented forecast counts a title once per
+        segment it belongs to, so its monthly sums are reported separately
+        as 'forecast_segment_memberships_by_month' and the totals are
+        forecast from `df` over the same horizon
         
     Returns:
     --------
     dict
         Dictionary containing launch timing insights
     """
+    df = unique_titles(df)
     timing = {
         'best_month': df['month_name'].value_counts().idxmax(),
         'best_day': df['day_of_week'].value_counts().idxmax(),
@@ -224,9 +284,22 @@ def analyze_optimal_launch_timing(df):
         'quarter_distribution': df['quarter_added'].value_counts().to_dict()
     }
     
+    if forecast is not None:
+        segments = [c for c in forecast.columns if c not in FORECAST_COLUMNS]
+        if segments:
+            memberships = forecast.groupby('month')['forecast'].sum()
+            timing['forecast_segment_memberships_by_month'] = {month.strftime('%Y-%m'): value
+                                                               for month, value in memberships.items()}
+            forecast = forecast_additions(df, dimensions=(), horizon=forecast['month'].nunique())
+        by_month = forecast.groupby('month')['forecast'].sum()
+        timing['forecast_best_month'] = by_month.idxmax().strftime('%B %Y')
+        timing['forecast_by_month'] = {month.strftime('%Y-%m'): value
+                                       for month, value in by_month.items()}
+    
     return timing
 
 
+@requires_columns('type', 'release_year', 'content_lag_years', 'country', 'rating')
 def compare_movies_vs_tv_shows(df):
     """
     Compare characteristics of movies vs TV shows
@@ -241,6 +314,7 @@ def compare_movies_vs_tv_shows(df):
     dict
         Dictionary containing comparison metrics
     """
+    df = unique_titles(df)
     movies = df[df['type'] == 'Movie']
     tv_shows = df[df['type'] == 'TV Show']
     
@@ -258,8 +332,8 @@ def compare_movies_vs_tv_shows(df):
             'tv_shows': tv_shows['content_lag_years'].mean()
         },
         'top_countries': {
-            'movies': movies['country'].value_counts().head(5).to_dict(),
-            'tv_shows': tv_shows['country'].value_counts().head(5).to_dict()
+            'movies': _country_counts(movies).head(5).to_dict(),
+            'tv_shows': _country_counts(tv_shows).head(5).to_dict()
         },
         'top_ratings': {
             'movies': movies['rating'].value_counts().head(5).to_dict(),
@@ -270,6 +344,7 @@ def compare_movies_vs_tv_shows(df):
     return comparison
 
 
+@requires_columns('listed_in', 'year_added')
 def identify_content_gaps(df):
     """
     Identify potential content gaps and opportunities
@@ -284,8 +359,10 @@ def identify_content_gaps(df):
     dict
         Dictionary containing gap analysis
     """
+    df = unique_titles(df)
+    
     # Get all genres
-    all_genres = df['listed_in'].str.split(', ').explode().value_counts()
+    all_genres = get_backend().split_value_counts(df['listed_in'])
     
     # Identify underrepresented genres (bottom 25%)
     threshold = all_genres.quantile(0.25)
@@ -293,7 +370,7 @@ def identify_content_gaps(df):
     
     # Analyze recent trends
     recent_df = df[df['year_added'] >= df['year_added'].max() - 2]
-    recent_genres = recent_df['listed_in'].str.split(', ').explode().value_counts()
+    recent_genres = get_backend().split_value_counts(recent_df['listed_in'])
     
     gaps = {
         'underrepresented_genres': underrepresented.to_dict(),
@@ -304,7 +381,9 @@ def identify_content_gaps(df):
     return gaps
 
 
-def generate_business_recommendations(df):
+@requires_columns('type', 'country', 'content_lag_years', 'rating',
+                  'month_name', 'day_of_week', 'quarter_added')
+def generate_business_recommendations(df, confidence=None, n_resamples=2000, seed=None):
     """
     Generate data-driven business recommendations
     
@@ -312,66 +391,76 @@ def generate_business_recommendations(df):
     -----------
     df : pd.DataFrame
         Input dataframe
+    confidence : float, optional
+        If given (e.g. 0.95), threshold rules fire only when the lower bound
+        of the metric's bootstrap confidence interval clears the threshold,
+        and each such recommendation carries its 'confidence_interval'
+    n_resamples : int
+        Number of bootstrap resamples when `confidence` is set
+    seed : int, optional
+        Random seed for the bootstrap
         
     Returns:
     --------
     list
         List of recommendation dictionaries
     """
-    recommendations = []
+    df = unique_titles(df)
+    fired = evaluate_rules(df, RECOMMENDATION_RULES, dimensions=(), confidence=confidence,
+                           n_resamples=n_resamples, seed=seed)
     
-    # Content type recommendation
-    movie_ratio = len(df[df['type'] == 'Movie']) / len(df)
-    if movie_ratio > 0.7:
-        recommendations.append({
-            'category': 'Content Balance',
-            'finding': f'Movies comprise {movie_ratio*100:.1f}% of catalog',
-            'recommendation': 'Increase TV show production to improve subscriber retention',
-            'priority': 'High'
-        })
-    
-    # Geographic expansion
-    top_countries = df['country'].value_counts().head(3)
-    if 'India' in top_countries.index or 'South Korea' in top_countries.index:
-        recommendations.append({
-            'category': 'Geographic Expansion',
-            'finding': 'Strong presence in high-growth Asian markets',
-            'recommendation': 'Triple investment in Indian and Korean content',
-            'priority': 'Very High'
-        })
-    
-    # Launch timing
-    timing = analyze_optimal_launch_timing(df)
-    recommendations.append({
-        'category': 'Launch Strategy',
-        'finding': f"Peak additions in {timing['best_month']} on {timing['best_day']}",
-        'recommendation': f"Schedule major releases for {timing['best_day']}s in {timing['best_month']}",
-        'priority': 'Medium'
-    })
-    
-    # Content freshness
-    avg_lag = df['content_lag_years'].mean()
-    if avg_lag > 3:
-        recommendations.append({
-            'category': 'Content Freshness',
-            'finding': f'Average content lag is {avg_lag:.1f} years',
-            'recommendation': 'Increase original content production to reduce dependency on catalog acquisitions',
-            'priority': 'High'
-        })
-    
-    # Rating diversity
-    mature_content = df[df['rating'].isin(['TV-MA', 'R', 'TV-14'])].shape[0] / len(df)
-    if mature_content > 0.75:
-        recommendations.append({
-            'category': 'Audience Diversification',
-            'finding': f'{mature_content*100:.1f}% of content targets mature audiences',
-            'recommendation': 'Expand family-friendly content to capture broader demographic',
-            'priority': 'Medium'
-        })
+    recommendations = []
+    for row in fired.itertuples(index=False):
+        recommendation = {
+            'category': row.category,
+            'finding': row.finding,
+            'recommendation': row.recommendation,
+            'priority': row.priority
+        }
+        if row.confidence_interval is not None:
+            recommendation['confidence_interval'] = row.confidence_interval
+        recommendations.append(recommendation)
     
     return recommendations
 
 
+@requires_columns('type', 'country', 'listed_in', 'content_lag_years', 'rating',
+                  'month_name', 'day_of_week', 'quarter_added')
+def generate_segment_recommendations(df, dimensions=('country', 'genre', 'type'), rules=None,
+                                     min_titles=30, confidence=None, n_resamples=2000, seed=None):
+    """
+    Generate recommendations for every country, genre and content type
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe
+    dimensions : tuple of str
+        Segment dimensions to generate recommendations for
+    rules : list of dict, optional
+        Declarative rules (defaults to rules.RECOMMENDATION_RULES)
+    min_titles : int
+        Segments with fewer titles are skipped
+    confidence : float, optional
+        Confidence level for interval-checked rules
+    n_resamples : int
+        Number of bootstrap resamples when `confidence` is set
+    seed : int, optional
+        Random seed for the bootstrap
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per recommendation, see rules.evaluate_rules
+    """
+    df = unique_titles(df)
+    return evaluate_rules(df, rules, dimensions=dimensions, include_catalog=False,
+                          min_titles=min_titles, confidence=confidence,
+                          n_resamples=n_resamples, seed=seed)
+
+
+@requires_columns('type', 'country', 'release_year', 'content_age', 'listed_in',
+                  'rating', 'year_added')
 def create_executive_summary(df):
     """
     Create an executive summary of key metrics
@@ -386,6 +475,9 @@ def create_executive_summary(df):
     dict
         Dictionary containing executive summary
     """
+    df = unique_titles(df)
+    country_counts = _country_counts(df)
+    
     summary = {
         'total_titles': len(df),
         'content_split': {
@@ -393,14 +485,14 @@ def create_executive_summary(df):
             'tv_shows': f"{len(df[df['type'] == 'TV Show']) / len(df) * 100:.1f}%"
         },
         'geographic_reach': {
-            'countries': df['country'].nunique(),
-            'top_market': df['country'].value_counts().index[0]
+            'countries': len(country_counts),
+            'top_market': country_counts.index[0]
         },
         'content_recency': {
             'avg_release_year': int(df['release_year'].mean()),
             'avg_content_age': f"{df['content_age'].mean():.1f} years"
         },
-        'top_genre': df['listed_in'].str.split(', ').explode().value_counts().index[0],
+        'top_genre': get_backend().split_value_counts(df['listed_in']).index[0],
         'primary_rating': df['rating'].value_counts().index[0],
         'key_insight': generate_key_insight(df)
     }
@@ -408,6 +500,7 @@ def create_executive_summary(df):
     return summary
 
 
+@requires_columns('year_added', 'type')
 def generate_key_insight(df):
     """
     Generate a key insight from the data
@@ -422,6 +515,8 @@ def generate_key_insight(df):
     str
         Key insight statement
     """
+    df = unique_titles(df)
+    
     # Analyze growth trend
     recent_years = df[df['year_added'] >= df['year_added'].max() - 3]
     tv_growth = len(recent_years[recent_years['type'] == 'TV Show']) / len(recent_years)
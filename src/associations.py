@@ -0,0 +1,250 @@
+"""
+Associations Module
+Genre co-occurrence, support and lift per segment from bit-packed membership
+"""
+
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+from .analysis import unique_titles
+from .data_processing import build_segment_index
+from .filtering import popcount
+
+# Segment dimension -> column with the segment values
+ASSOCIATION_DIMENSIONS = {'year': 'year_added'}
+
+
+def pack_genres(df):
+    """
+    Bit-packed genre membership matrix
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dataframe with 'listed_in'
+        
+    Returns:
+    --------
+    tuple
+        (uint64 array of shape (titles, ceil(genres / 64)) with bit g of a
+        row set when the title lists genre g, pd.Index of genres)
+    """
+    index = build_segment_index(df, 'genre')
+    categories = index['value'].cat.categories
+    # Number genres alphabetically so itemsets list them in that order
+    order = np.argsort(np.asarray(categories, dtype=str), kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    codes = rank[index['value'].cat.codes.to_numpy()]
+    rows = index['row'].to_numpy().astype(np.int64)
+    genres = pd.Index(categories[order], name='genre')
+    n_words = max((len(genres) + 63) // 64, 1)
+    
+    packed = np.zeros(len(df) * n_words, dtype=np.uint64)
+    # Each (title, genre) pair occurs once, so adding bits equals OR-ing them
+    np.add.at(packed, rows * n_words + (codes >> 6), np.uint64(1) << (codes & 63).astype(np.uint64))
+    return packed.reshape(len(df), n_words), genres
+
+
+def _segment_rows(df, by):
+    """
+    Rows of each segment of the given dimensions
+    
+    Returns (row positions, segment codes, labels) where labels has one
+    column per dimension and a row per segment code; multi-valued
+    dimensions place a title in several segments.
+    """
+    rows = np.arange(len(df))
+    dimension_codes, categories = [], []
+    for dimension in by:
+        index = build_segment_index(df, ASSOCIATION_DIMENSIONS.get(dimension, dimension))
+        order = np.argsort(index['row'].to_numpy(), kind='stable')
+        index_codes = index['value'].cat.codes.to_numpy().astype(np.int64)[order]
+        per_row = np.bincount(index['row'].to_numpy(), minlength=len(df))
+        starts = np.cumsum(per_row) - per_row
+        # Repeat every (row, segments so far) entry once per value of this dimension
+        repeats = per_row[rows]
+        entry = np.repeat(np.arange(len(rows)), repeats)
+        offsets = np.arange(len(entry)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        rows = rows[entry]
+        dimension_codes = [codes[entry] for codes in dimension_codes]
+        dimension_codes.append(index_codes[starts[rows] + offsets])
+        categories.append(index['value'].cat.categories)
+    
+    if not by:
+        return rows, np.zeros(len(rows), dtype=np.int64), pd.DataFrame(index=[0])
+    combined = np.zeros(len(rows), dtype=np.int64)
+    for codes, values in zip(dimension_codes, categories):
+        combined = combined * len(values) + codes
+    present, segment_codes = np.unique(combined, return_inverse=True)
+    labels = {}
+    for dimension, values in zip(reversed(by), reversed(categories)):
+        labels[dimension] = np.asarray(values)[present % len(values)]
+        present = present // len(values)
+    return rows, segment_codes, pd.DataFrame({dimension: labels[dimension] for dimension in by})
+
+
+def _distinct_groups(segment_codes, packed):
+    """Distinct (segment, genre set) combinations and their title counts"""
+    keys = pd.DataFrame(packed, copy=False)
+    keys.insert(0, 'segment', segment_codes)
+    counts = keys.groupby(list(keys.columns), sort=False).size()
+    groups = counts.index.to_frame(index=False).to_numpy(dtype=np.uint64)
+    return groups[:, 0].astype(np.int64), np.ascontiguousarray(groups[:, 1:]), counts.to_numpy()
+
+
+def _set_bits(masks, k):
+    """Positions of the k set bits of each packed row, in ascending order"""
+    items = np.empty((len(masks), k), dtype=np.int64)
+    filled = np.zeros(len(masks), dtype=np.int64)
+    for w in range(masks.shape[1]):
+        word = masks[:, w].copy()
+        live = np.flatnonzero(word)
+        while len(live):
+            # Isolate the lowest set bit; its log2 is exact in float64
+            lowest = word[live] & (~word[live] + np.uint64(1))
+            items[live, filled[live]] = 64 * w + np.log2(lowest).astype(np.int64)
+            filled[live] += 1
+            word[live] &= word[live] - np.uint64(1)
+            live = live[word[live] != 0]
+    return items
+
+
+def _itemset_counts(segments, masks, weights, n_genres, max_size):
+    """
+    Title counts of every genre itemset up to `max_size` per segment
+    
+    The set bits of each distinct genre set are extracted with bitwise
+    ops, and the sub-itemsets of each size are enumerated for all sets of
+    the same popcount at once.
+    
+    Returns a dict size -> (segment codes, itemset codes (rows of genre
+    codes), counts).
+    """
+    sizes = popcount(masks)
+    results = {}
+    for size in range(1, max_size + 1):
+        segment_parts, item_parts, weight_parts = [], [], []
+        for k in np.unique(sizes[sizes >= size]):
+            members = np.flatnonzero(sizes == k)
+            items = _set_bits(masks[members], k)
+            for subset in combinations(range(k), size):
+                segment_parts.append(segments[members])
+                item_parts.append(items[:, subset])
+                weight_parts.append(weights[members])
+        if not segment_parts:
+            continue
+        items = np.concatenate(item_parts)
+        key = np.concatenate(segment_parts)
+        for column in range(size):
+            key = key * n_genres + items[:, column]
+        unique_keys, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(weight_parts)).astype(np.int64)
+        results[size] = (np.concatenate(segment_parts)[first], items[first], counts)
+    return results
+
+
+def genre_associations(df, by=(), max_size=3, min_count=5, min_support=0.0):
+    """
+    Support and lift of genre combinations, overall or per segment
+    
+    Lift compares how often genres are listed together with what their
+    separate frequencies predict: above 1 the combination is over-supplied
+    relative to independence, below 1 under-supplied.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe with 'listed_in'
+    by : str or tuple of str
+        Segment dimensions ('country', 'year', 'type', 'rating', ...);
+        the whole catalog if empty
+    max_size : int
+        Largest itemset size (1 to 3 is typical)
+    min_count : int
+        Minimum titles listing the combination within a segment
+    min_support : float
+        Minimum share of the segment's titles
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per segment and itemset with the segment columns,
+        'itemset' (tuple of genres), 'size', 'titles' (segment size),
+        'count', 'support', 'expected_support' and 'lift'
+    """
+    by = (by,) if isinstance(by, str) else tuple(by)
+    df = unique_titles(df).reset_index(drop=True)
+    packed, genres = pack_genres(df)
+    rows, segment_codes, labels = _segment_rows(df, by)
+    titles = np.bincount(segment_codes, minlength=len(labels))
+    
+    segments, masks, weights = _distinct_groups(segment_codes, packed[rows])
+    has_genres = popcount(masks) > 0
+    counts = _itemset_counts(segments[has_genres], masks[has_genres], weights[has_genres],
+                             len(genres), max_size)
+    if not counts:
+        return pd.DataFrame(columns=list(by) + ['itemset', 'size', 'titles', 'count', 'support',
+                                                'expected_support', 'lift'])
+    
+    # Single-genre support per segment, for the independence baseline
+    single_segments, single_items, single_counts = counts[1]
+    single_support = np.zeros((len(labels), len(genres)))
+    single_support[single_segments, single_items[:, 0]] = single_counts / titles[single_segments]
+    
+    tables = []
+    for size, (segment, items, count) in counts.items():
+        support = count / titles[segment]
+        keep = (count >= min_count) & (support >= min_support)
+        segment, items, count, support = segment[keep], items[keep], count[keep], support[keep]
+        expected = np.prod(single_support[segment[:, None], items], axis=1)
+        table = labels.iloc[segment].reset_index(drop=True)
+        table['itemset'] = [tuple(names) for names in genres.to_numpy()[items].tolist()]
+        table['size'] = size
+        table['titles'] = titles[segment]
+        table['count'] = count
+        table['support'] = support
+        table['expected_support'] = expected
+        table['lift'] = support / expected
+        tables.append(table)
+    
+    result = pd.concat(tables, ignore_index=True)
+    result = result.sort_values(list(by) + ['size', 'count'], ascending=[True] * (len(by) + 1) + [False],
+                                kind='stable')
+    return result.reset_index(drop=True)
+
+
+def association_growth(table, period='year'):
+    """
+    Year-over-year growth of each combination within its segment
+    
+    Parameters:
+    -----------
+    table : pd.DataFrame
+        Output of genre_associations with `period` among its segment columns
+    period : str
+        Period column
+        
+    Returns:
+    --------
+    pd.DataFrame
+        The table with 'support_growth' (relative change of support since
+        the previous period) and 'conditional_growth' (relative change of
+        lift, i.e. growth beyond what the genres' own growth explains);
+        NaN when the combination was below the thresholds the period before
+    """
+    keys = [c for c in table.columns[:table.columns.get_loc('itemset')] if c != period] + ['itemset']
+    table = table.sort_values(keys + [period], kind='stable')
+    grouped = table.groupby(keys, sort=False, dropna=False)
+    consecutive = (table[period] - grouped[period].shift(1)) == 1
+    table = table.assign(
+        support_growth=(table['support'] / grouped['support'].shift(1) - 1).where(consecutive),
+        conditional_growth=(table['lift'] / grouped['lift'].shift(1) - 1).where(consecutive)
+    )
+    return table.sort_index()
+
+
+if __name__ == "__main__":
+    print("Associations Module")
+    print("Import this module to mine genre combinations")
@@ -0,0 +1,307 @@
+"""
+Backends Module
+Interchangeable execution engines for the string-heavy catalog kernels
+"""
+
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# Environment variable selecting the default backend ('auto' if unset)
+BACKEND_ENV_VAR = 'CATALOG_BACKEND'
+
+
+class PandasBackend:
+    """Reference implementation on pandas object-string operations"""
+    
+    name = 'pandas'
+    csv_engine = 'c'
+    
+    def split_value_counts(self, series, delimiter=', ', exclude=None):
+        """
+        Count the entries of a delimited multi-valued column
+        
+        Equivalent to series.str.split(delimiter).explode().value_counts()
+        after dropping the `exclude` values.
+        """
+        values = series.str.split(delimiter).explode()
+        if exclude:
+            values = values[~values.isin(exclude)]
+        return values.value_counts()
+    
+    def split_nunique(self, series, delimiter=', '):
+        """Number of distinct entries of a delimited multi-valued column"""
+        return series.str.split(delimiter).explode().nunique()
+    
+    def extract_number(self, series):
+        """First run of digits of every value as float (NaN if none)"""
+        return series.str.extract(r'(\d+)', expand=False).astype(float)
+
+
+class ArrowBackend(PandasBackend):
+    """
+    Multithreaded pyarrow.compute kernels
+    
+    Columns are handed to Arrow as string arrays; values Arrow cannot
+    represent as strings fall back to the pandas implementation. Results
+    are rebuilt in pandas' first-appearance order and sorted the same way,
+    so ties rank identically.
+    """
+    
+    name = 'pyarrow'
+    csv_engine = 'pyarrow'
+    
+    def __init__(self):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        self.pa, self.pc = pa, pc
+    
+    def _strings(self, series):
+        """Arrow string array of a series, or None if it is not all text"""
+        try:
+            return self.pa.array(series, from_pandas=True, type=self.pa.string())
+        except (self.pa.ArrowInvalid, self.pa.ArrowTypeError, TypeError):
+            return None
+    
+    def _split(self, series, delimiter):
+        """Flattened entries of a delimited column, or None"""
+        strings = self._strings(series)
+        if strings is None:
+            return None
+        return self.pc.list_flatten(self.pc.split_pattern(strings, delimiter))
+    
+    def split_value_counts(self, series, delimiter=', ', exclude=None):
+        parts = self._split(series, delimiter)
+        if parts is None:
+            return super().split_value_counts(series, delimiter, exclude)
+        if exclude:
+            excluded = self.pc.is_in(parts, value_set=self.pa.array(list(exclude), type=self.pa.string()))
+            parts = parts.filter(self.pc.invert(excluded))
+        counts = self.pc.value_counts(parts)
+        result = pd.Series(counts.field('counts').to_numpy().astype(np.int64),
+                           index=pd.Index(counts.field('values').to_numpy(zero_copy_only=False),
+                                          dtype=object, name=series.name),
+                           name='count')
+        return result.sort_values(ascending=False)
+    
+    def split_nunique(self, series, delimiter=', '):
+        parts = self._split(series, delimiter)
+        if parts is None:
+            return super().split_nunique(series, delimiter)
+        return self.pc.count_distinct(parts).as_py()
+    
+    def extract_number(self, series):
+        strings = self._strings(series)
+        if strings is None:
+            return super().extract_number(series)
+        digits = self.pc.extract_regex(strings, r'(?P<number>\d+)').field('number')
+        # Values without digits come back as empty strings rather than nulls
+        digits = self.pc.if_else(self.pc.equal(digits, ''), self.pa.scalar(None, self.pa.string()), digits)
+        numbers = self.pc.cast(digits, self.pa.float64()).to_numpy(zero_copy_only=False)
+        return pd.Series(numbers, index=series.index, name=series.name)
+
+
+# Backend name -> class, in order of preference for 'auto'
+BACKENDS = {'pyarrow': ArrowBackend, 'pandas': PandasBackend}
+
+_active = {'backend': None}
+
+
+def register_backend(name, backend_class, preferred=False):
+    """
+    Add an execution backend
+    
+    Parameters:
+    -----------
+    name : str
+        Backend name
+    backend_class : type
+        Subclass of PandasBackend overriding the kernels it accelerates;
+        its constructor should raise ImportError if its engine is missing
+    preferred : bool
+        Try it first when the backend is 'auto'
+    """
+    if preferred:
+        others = {k: v for k, v in BACKENDS.items() if k != name}
+        BACKENDS.clear()
+        BACKENDS.update({name: backend_class, **others})
+    else:
+        BACKENDS[name] = backend_class
+
+
+def available_backends():
+    """Names of the backends whose engines are installed"""
+    names = []
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend_class()
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def _create(name):
+    """Instantiate a backend by name"""
+    if name == 'auto':
+        for candidate, backend_class in BACKENDS.items():
+            try:
+                return backend_class()
+            except ImportError:
+                continue
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'; choose from {list(BACKENDS)}")
+    try:
+        return BACKENDS[name]()
+    except ImportError:
+        print(f"Backend '{name}' is not installed, falling back to pandas")
+        return PandasBackend()
+
+
+def set_backend(name):
+    """
+    Select the backend used by analysis and data_processing
+    
+    Parameters:
+    -----------
+    name : str
+        A key of BACKENDS or 'auto' (fastest installed); missing engines
+        fall back to pandas
+    """
+    _active['backend'] = _create(name)
+
+
+def get_backend():
+    """The active backend, chosen from $CATALOG_BACKEND on first use"""
+    if _active['backend'] is None:
+        set_backend(os.environ.get(BACKEND_ENV_VAR, 'auto'))
+    return _active['backend']
+
+
+@contextmanager
+def use_backend(name):
+    """Temporarily switch backends"""
+    previous = _active['backend']
+    set_backend(name)
+    try:
+        yield _active['backend']
+    finally:
+        _active['backend'] = previous
+
+
+def _identical(left, right):
+    """Exact equality of analysis results, treating NaN as equal"""
+    if isinstance(left, (pd.DataFrame, pd.Series, pd.Index)):
+        if type(left) is not type(right):
+            return False
+        try:
+            assert_equal = {pd.DataFrame: pd.testing.assert_frame_equal,
+                            pd.Series: pd.testing.assert_series_equal,
+                            pd.Index: pd.testing.assert_index_equal}[type(left)]
+            assert_equal(left, right, check_exact=True)
+            return True
+        except AssertionError:
+            return False
+    if isinstance(left, dict):
+        return (isinstance(right, dict) and list(left) == list(right)
+                and all(_identical(left[k], right[k]) for k in left))
+    if isinstance(left, (list, tuple)):
+        return (type(left) is type(right) and len(left) == len(right)
+                and all(_identical(a, b) for a, b in zip(left, right)))
+    if pd.api.types.is_scalar(left) and pd.api.types.is_scalar(right) and pd.isna(left) and pd.isna(right):
+        return True
+    return bool(left == right)
+
+
+def _benchmark_cases(df, filepath=None):
+    """Public functions exercised by the parity check and benchmark"""
+    from . import analysis, data_processing
+    
+    cases = {
+        'get_top_genres': lambda: analysis.get_top_genres(df),
+        'get_top_directors': lambda: analysis.get_top_directors(df),
+        'get_top_actors': lambda: analysis.get_top_actors(df),
+        'analyze_content_by_year': lambda: analysis.analyze_content_by_year(df),
+        'calculate_diversity_metrics': lambda: analysis.calculate_diversity_metrics(df),
+        'identify_content_gaps': lambda: analysis.identify_content_gaps(df),
+        'create_executive_summary': lambda: analysis.create_executive_summary(df),
+        'extract_duration_info': lambda: data_processing.extract_duration_info(df)
+    }
+    if filepath:
+        cases['load_and_clean_data'] = lambda: data_processing.load_and_clean_data(filepath)
+    return cases
+
+
+def check_backend_parity(df, filepath=None, backends=None):
+    """
+    Check that every backend reproduces the pandas results exactly
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    filepath : str, optional
+        Catalog file, to also compare load_and_clean_data
+    backends : list of str, optional
+        Backends to check (defaults to all installed)
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per (function, backend) with an 'identical' flag
+    """
+    backends = [b for b in (backends or available_backends()) if b != 'pandas']
+    cases = _benchmark_cases(df, filepath)
+    with use_backend('pandas'):
+        expected = {name: case() for name, case in cases.items()}
+    
+    records = []
+    for backend in backends:
+        with use_backend(backend):
+            for name, case in cases.items():
+                records.append({'function': name, 'backend': backend,
+                                'identical': _identical(expected[name], case())})
+    return pd.DataFrame(records)
+
+
+def benchmark_backends(df, filepath=None, backends=None, repeat=3):
+    """
+    Time the public functions under every backend
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    filepath : str, optional
+        Catalog file, to also time load_and_clean_data
+    backends : list of str, optional
+        Backends to time (defaults to all installed)
+    repeat : int
+        Runs per function; the fastest is reported
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Best wall-clock seconds indexed by function, one column per backend
+    """
+    backends = backends or available_backends()
+    cases = _benchmark_cases(df, filepath)
+    timings = {}
+    for backend in backends:
+        with use_backend(backend):
+            timings[backend] = {}
+            for name, case in cases.items():
+                best = np.inf
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    case()
+                    best = min(best, time.perf_counter() - start)
+                timings[backend][name] = best
+    return pd.DataFrame(timings).rename_axis('function')
+
+
+if __name__ == "__main__":
+    print("Backends Module")
+    print("Available backends:", available_backends())
@@ -0,0 +1,356 @@
+"""
+CLI Module
+Batch command-line entry point: load, clean, analyze and render catalogs
+"""
+
+import argparse
+import cProfile
+import hashlib
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .backends import BACKENDS, set_backend
+from .data_processing import load_and_clean_data
+from .profiling import DataProfile
+from .reporting import DEFAULT_ARTIFACTS, build_report
+from .serialization import save_result
+
+# Result file format -> extension
+OUTPUT_FORMATS = {'json': '.json', 'arrow': '.arrow'}
+
+REPORT_FORMATS = {'both': ('markdown', 'html'), 'markdown': ('markdown',), 'html': ('html',), 'none': ()}
+
+# Functions listed in cProfile reports
+PROFILE_LINES = 40
+
+
+def _names(value):
+    """Parse 'all', 'none' or a comma-separated list of artifact names"""
+    if value == 'all':
+        return None
+    if value == 'none':
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def select_artifacts(analyses=None, charts=None):
+    """
+    Report artifacts to run, in report order
+    
+    Parameters:
+    -----------
+    analyses : list of str, optional
+        Table artifact names; all if None
+    charts : list of str, optional
+        Chart artifact names; all if None
+        
+    Returns:
+    --------
+    list of dict
+        Selected artifacts of reporting.DEFAULT_ARTIFACTS
+    """
+    selected = []
+    for kind, names in (('table', analyses), ('chart', charts)):
+        available = [a['name'] for a in DEFAULT_ARTIFACTS if a['kind'] == kind]
+        unknown = set(names or []).difference(available)
+        if unknown:
+            raise ValueError(f"Unknown {kind} artifacts {sorted(unknown)}; choose from {available}")
+        selected.extend(a['name'] for a in DEFAULT_ARTIFACTS
+                        if a['kind'] == kind and (names is None or a['name'] in names))
+    return [a for a in DEFAULT_ARTIFACTS if a['name'] in selected]
+
+
+def _clean_cache_path(cache_dir, filepath, columns, detect_duplicates):
+    """Cache file of a cleaned catalog, keyed by file identity and request"""
+    stat = os.stat(filepath)
+    key = json.dumps([os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns,
+                      sorted(columns), detect_duplicates])
+    return os.path.join(cache_dir, f'clean_{hashlib.sha256(key.encode()).hexdigest()[:16]}.pkl')
+
+
+def load_catalog(filepath, columns, workers=4, chunk_size=None, cache_dir=None,
+                 detect_duplicates=False, data_profile=None):
+    """
+    Load and clean one catalog, reusing a cached cleaned copy when possible
+    
+    Parameters:
+    -----------
+    filepath : str
+        Catalog CSV
+    columns : list of str
+        Raw or derived columns the selected artifacts need
+    workers : int
+        Threads for independent cleaning stages
+    chunk_size : int, optional
+        Rows per chunk when reading incrementally
+    cache_dir : str, optional
+        Directory caching cleaned catalogs
+    detect_duplicates : bool
+        Add near-duplicate title clusters
+    data_profile : profiling.DataProfile, optional
+        Profile updated while reading; bypasses the cache
+        
+    Returns:
+    --------
+    tuple
+        (cleaned dataframe, whether it came from the cache)
+    """
+    cache_path = None
+    if cache_dir and data_profile is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = _clean_cache_path(cache_dir, filepath, columns, detect_duplicates)
+        if os.path.exists(cache_path):
+            print(f"Using cached cleaned data for {filepath}")
+            return pd.read_pickle(cache_path), True
+    
+    df = load_and_clean_data(filepath, detect_duplicates=detect_duplicates, columns=columns,
+                             n_jobs=workers, chunksize=chunk_size, profile=data_profile)
+    if cache_path:
+        df.to_pickle(cache_path)
+    return df, False
+
+
+def _write_profile(profiler, output_dir):
+    """Write cProfile statistics as text and in binary pstats format"""
+    profiler.dump_stats(os.path.join(output_dir, 'profile.prof'))
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_LINES)
+    path = os.path.join(output_dir, 'profile.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(stream.getvalue())
+    return path
+
+
+def run_catalog(filepath, output_dir, artifacts=None, output_format='json', report_formats=('markdown', 'html'),
+                workers=4, chunk_size=None, cache_dir=None, detect_duplicates=False, profile=False,
+                data_profile=False):
+    """
+    Run load -> clean -> analyze -> render for one catalog
+    
+    Parameters:
+    -----------
+    filepath : str
+        Catalog CSV
+    output_dir : str
+        Directory for results, report, figures and profiles
+    artifacts : list of dict, optional
+        Artifacts to produce (defaults to reporting.DEFAULT_ARTIFACTS)
+    output_format : str
+        'json' or 'arrow' for the analysis results
+    report_formats : tuple of str
+        Report documents to write ('markdown', 'html'); charts are rendered
+        even without documents
+    workers : int
+        Threads for independent cleaning stages
+    chunk_size : int, optional
+        Rows per chunk when reading incrementally
+    cache_dir : str, optional
+        Directory caching cleaned data and report fragments
+    detect_duplicates : bool
+        Count near-duplicate titles once
+    profile : bool
+        Write a cProfile report of the run
+    data_profile : bool
+        Write a data-quality profile of the raw catalog
+        
+    Returns:
+    --------
+    dict
+        Run summary with phase 'timings' (seconds) and written 'files'
+    """
+    artifacts = artifacts if artifacts is not None else DEFAULT_ARTIFACTS
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {'input': filepath, 'output_dir': output_dir, 'timings': {}, 'files': []}
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    
+    columns = sorted({c for artifact in artifacts for c in artifact['columns']})
+    quality = DataProfile() if data_profile else None
+    df, cached = load_catalog(filepath, columns, workers=workers, chunk_size=chunk_size,
+                              cache_dir=cache_dir and os.path.join(cache_dir, 'data'),
+                              detect_duplicates=detect_duplicates, data_profile=quality)
+    summary.update(rows=len(df), cached_data=cached)
+    summary['timings']['load_clean'] = time.perf_counter() - start
+    
+    phase = time.perf_counter()
+    results, analysis_timings = {}, {}
+    result_dir = os.path.join(output_dir, 'results')
+    os.makedirs(result_dir, exist_ok=True)
+    for artifact in artifacts:
+        if artifact['kind'] != 'table':
+            continue
+        began = time.perf_counter()
+        results[artifact['name']] = artifact['func'](df, **artifact['params'])
+        analysis_timings[artifact['name']] = time.perf_counter() - began
+        path = os.path.join(result_dir, artifact['name'] + OUTPUT_FORMATS[output_format])
+        save_result(results[artifact['name']], path)
+        summary['files'].append(path)
+    summary['timings']['analyze'] = time.perf_counter() - phase
+    summary['timings']['analyses'] = analysis_timings
+    
+    phase = time.perf_counter()
+    if report_formats or any(a['kind'] == 'chart' for a in artifacts):
+        report = build_report(df, output_dir, artifacts=artifacts, formats=report_formats,
+                              cache_dir=cache_dir and os.path.join(cache_dir, 'report'), results=results)
+        summary.update(rebuilt=report['rebuilt'], reused=report['reused'])
+        summary['files'].extend(report['files'])
+    summary['timings']['render'] = time.perf_counter() - phase
+    
+    if quality is not None:
+        path = os.path.join(output_dir, 'data_profile.csv')
+        quality.summary().to_csv(path)
+        quality.save(os.path.join(output_dir, 'data_profile.json'))
+        summary['files'].append(path)
+    summary['timings']['total'] = time.perf_counter() - start
+    
+    if profiler:
+        profiler.disable()
+        summary['files'].append(_write_profile(profiler, output_dir))
+    return summary
+
+
+def _run_job(job):
+    """Process-pool wrapper around run_catalog"""
+    backend, kwargs = job
+    if backend:
+        set_backend(backend)
+    try:
+        return run_catalog(**kwargs)
+    except Exception as error:
+        return {'input': kwargs['filepath'], 'output_dir': kwargs['output_dir'], 'error': repr(error)}
+
+
+def _output_dirs(inputs, output_dir):
+    """One output subdirectory per input, named after the file"""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in inputs]
+    dirs = []
+    for i, stem in enumerate(stems):
+        name = stem if stems.count(stem) == 1 else f'{stem}_{i + 1}'
+        dirs.append(os.path.join(output_dir, name))
+    return dirs
+
+
+def build_parser():
+    """Argument parser of the batch command"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description='Load, clean, analyze and render streaming catalogs in batch.')
+    parser.add_argument('inputs', nargs='*', help='catalog CSV files')
+    parser.add_argument('-o', '--output-dir', default='output',
+                        help='directory for results; one subdirectory per input (default: output)')
+    parser.add_argument('-j', '--workers', type=int, default=4,
+                        help='worker processes across inputs and threads for cleaning stages (default: 4)')
+    parser.add_argument('--cache-dir', help='directory caching cleaned data and report fragments between runs')
+    parser.add_argument('--chunk-size', type=int, help='rows per chunk when reading CSVs incrementally')
+    parser.add_argument('--analyses', type=_names, default=None, metavar='NAMES',
+                        help="comma-separated analyses, 'all' (default) or 'none'")
+    parser.add_argument('--charts', type=_names, default=None, metavar='NAMES',
+                        help="comma-separated charts, 'all' (default) or 'none'")
+    parser.add_argument('--format', choices=sorted(OUTPUT_FORMATS), default='json',
+                        help='format of the analysis result files (default: json)')
+    parser.add_argument('--report', choices=list(REPORT_FORMATS), default='both',
+                        help='report documents to write (default: both)')
+    parser.add_argument('--backend', choices=['auto'] + list(BACKENDS),
+                        help='execution backend for string kernels (default: $CATALOG_BACKEND or auto)')
+    parser.add_argument('--detect-duplicates', action='store_true',
+                        help='count near-duplicate titles once')
+    parser.add_argument('--profile', action='store_true',
+                        help='write a cProfile report (profile.txt, profile.prof) per input')
+    parser.add_argument('--data-profile', action='store_true',
+                        help='write a data-quality profile of each raw catalog')
+    parser.add_argument('--list', action='store_true', help='list available analyses and charts and exit')
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the batch command
+    
+    Parameters:
+    -----------
+    argv : list of str, optional
+        Command-line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+    --------
+    int
+        Exit status: 0 if every input succeeded
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        for kind, label in (('table', 'Analyses'), ('chart', 'Charts')):
+            print(f"{label}:")
+            for artifact in DEFAULT_ARTIFACTS:
+                if artifact['kind'] == kind:
+                    print(f"  {artifact['name']:24s} {artifact['title']}")
+        return 0
+    if not args.inputs:
+        parser.error("at least one input file is required")
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        parser.error(f"input files not found: {', '.join(missing)}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    try:
+        artifacts = select_artifacts(args.analyses, args.charts)
+    except ValueError as error:
+        parser.error(str(error))
+    
+    if args.backend:
+        set_backend(args.backend)
+    os.makedirs(args.output_dir, exist_ok=True)
+    parallel = len(args.inputs) > 1 and args.workers > 1
+    jobs = []
+    for filepath, output_dir in zip(args.inputs, _output_dirs(args.inputs, args.output_dir)):
+        cache_dir = args.cache_dir and os.path.join(args.cache_dir, os.path.basename(output_dir))
+        jobs.append((args.backend, {
+            'filepath': filepath, 'output_dir': output_dir, 'artifacts': artifacts,
+            'output_format': args.format, 'report_formats': REPORT_FORMATS[args.report],
+            'workers': 1 if parallel else args.workers, 'chunk_size': args.chunk_size,
+            'cache_dir': cache_dir, 'detect_duplicates': args.detect_duplicates,
+            'profile': args.profile, 'data_profile': args.data_profile
+        }))
+    
+    start = time.perf_counter()
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as executor:
+            summaries = list(executor.map(_run_job, jobs))
+    else:
+        summaries = [_run_job(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    
+    manifest = {
+        'command': ['python', '-m', 'src'] + list(sys.argv[1:] if argv is None else argv),
+        'options': {k: v for k, v in vars(args).items() if k != 'list'},
+        'elapsed_seconds': elapsed,
+        'catalogs': summaries
+    }
+    with open(os.path.join(args.output_dir, 'run.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    
+    failed = [s for s in summaries if 'error' in s]
+    for summary in summaries:
+        if 'error' in summary:
+            print(f"FAILED {summary['input']}: {summary['error']}")
+        else:
+            timings = summary['timings']
+            print(f"{summary['input']}: {summary['rows']} titles in {timings['total']:.2f}s "
+                  f"(load/clean {timings['load_clean']:.2f}s, analyze {timings['analyze']:.2f}s, "
+                  f"render {timings['render']:.2f}s) -> {summary['output_dir']}")
+    print(f"Processed {len(summaries) - len(failed)}/{len(summaries)} catalogs in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
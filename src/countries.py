@@ -0,0 +1,223 @@
+"""
+Countries Module
+Reference tables and lookups for canonical country names and ISO-3 codes
+"""
+
+import re
+from functools import lru_cache
+
+
+# Canonical country name -> ISO 3166-1 alpha-3 code
+COUNTRY_ISO3 = {
+    'Afghanistan': 'AFG',
+    'Albania': 'ALB',
+    'Algeria': 'DZA',
+    'Angola': 'AGO',
+    'Argentina': 'ARG',
+    'Armenia': 'ARM',
+    'Australia': 'AUS',
+    'Austria': 'AUT',
+    'Azerbaijan': 'AZE',
+    'Bahamas': 'BHS',
+    'Bangladesh': 'BGD',
+    'Belarus': 'BLR',
+    'Belgium': 'BEL',
+    'Bermuda': 'BMU',
+    'Bolivia': 'BOL',
+    'Bosnia and Herzegovina': 'BIH',
+    'Botswana': 'BWA',
+    'Brazil': 'BRA',
+    'Bulgaria': 'BGR',
+    'Burkina Faso': 'BFA',
+    'Cambodia': 'KHM',
+    'Cameroon': 'CMR',
+    'Canada': 'CAN',
+    'Cayman Islands': 'CYM',
+    'Chile': 'CHL',
+    'China': 'CHN',
+    'Colombia': 'COL',
+    'Costa Rica': 'CRI',
+    'Croatia': 'HRV',
+    'Cuba': 'CUB',
+    'Cyprus': 'CYP',
+    'Czech Republic': 'CZE',
+    'Denmark': 'DNK',
+    'Dominican Republic': 'DOM',
+    'Ecuador': 'ECU',
+    'Egypt': 'EGY',
+    'Estonia': 'EST',
+    'Ethiopia': 'ETH',
+    'Finland': 'FIN',
+    'France': 'FRA',
+    'Georgia': 'GEO',
+    'Germany': 'DEU',
+    'Ghana': 'GHA',
+    'Greece': 'GRC',
+    'Guatemala': 'GTM',
+    'Hong Kong': 'HKG',
+    'Hungary': 'HUN',
+    'Iceland': 'ISL',
+    'India': 'IND',
+    'Indonesia': 'IDN',
+    'Iran': 'IRN',
+    'Iraq': 'IRQ',
+    'Ireland': 'IRL',
+    'Israel': 'ISR',
+    'Italy': 'ITA',
+    'Jamaica': 'JAM',
+    'Japan': 'JPN',
+    'Jordan': 'JOR',
+    'Kazakhstan': 'KAZ',
+    'Kenya': 'KEN',
+    'Kuwait': 'KWT',
+    'Latvia': 'LVA',
+    'Lebanon': 'LBN',
+    'Liechtenstein': 'LIE',
+    'Lithuania': 'LTU',
+    'Luxembourg': 'LUX',
+    'Malawi': 'MWI',
+    'Malaysia': 'MYS',
+    'Malta': 'MLT',
+    'Mauritius': 'MUS',
+    'Mexico': 'MEX',
+    'Mongolia': 'MNG',
+    'Montenegro': 'MNE',
+    'Morocco': 'MAR',
+    'Mozambique': 'MOZ',
+    'Namibia': 'NAM',
+    'Nepal': 'NPL',
+    'Netherlands': 'NLD',
+    'New Zealand': 'NZL',
+    'Nicaragua': 'NIC',
+    'Nigeria': 'NGA',
+    'North Macedonia': 'MKD',
+    'Norway': 'NOR',
+    'Pakistan': 'PAK',
+    'Palestine': 'PSE',
+    'Panama': 'PAN',
+    'Paraguay': 'PRY',
+    'Peru': 'PER',
+    'Philippines': 'PHL',
+    'Poland': 'POL',
+    'Portugal': 'PRT',
+    'Puerto Rico': 'PRI',
+    'Qatar': 'QAT',
+    'Romania': 'ROU',
+    'Russia': 'RUS',
+    'Samoa': 'WSM',
+    'Saudi Arabia': 'SAU',
+    'Senegal': 'SEN',
+    'Serbia': 'SRB',
+    'Singapore': 'SGP',
+    'Slovakia': 'SVK',
+    'Slovenia': 'SVN',
+    'Somalia': 'SOM',
+    'South Africa': 'ZAF',
+    'South Korea': 'KOR',
+    'Spain': 'ESP',
+    'Sri Lanka': 'LKA',
+    'Sudan': 'SDN',
+    'Sweden': 'SWE',
+    'Switzerland': 'CHE',
+    'Syria': 'SYR',
+    'Taiwan': 'TWN',
+    'Tanzania': 'TZA',
+    'Thailand': 'THA',
+    'Tunisia': 'TUN',
+    'Turkey': 'TUR',
+    'Uganda': 'UGA',
+    'Ukraine': 'UKR',
+    'United Arab Emirates': 'ARE',
+    'United Kingdom': 'GBR',
+    'United States': 'USA',
+    'Uruguay': 'URY',
+    'Vatican City': 'VAT',
+    'Venezuela': 'VEN',
+    'Vietnam': 'VNM',
+    'Zimbabwe': 'ZWE'
+}
+
+# Spelling variants and historical names -> canonical country name
+COUNTRY_ALIASES = {
+    'USA': 'United States',
+    'US': 'United States',
+    'U.S.': 'United States',
+    'U.S.A.': 'United States',
+    'United States of America': 'United States',
+    'UK': 'United Kingdom',
+    'U.K.': 'United Kingdom',
+    'Great Britain': 'United Kingdom',
+    'Britain': 'United Kingdom',
+    'England': 'United Kingdom',
+    'Scotland': 'United Kingdom',
+    'Wales': 'United Kingdom',
+    'Korea': 'South Korea',
+    'Republic of Korea': 'South Korea',
+    'West Germany': 'Germany',
+    'East Germany': 'Germany',
+    'Russian Federation': 'Russia',
+    'UAE': 'United Arab Emirates',
+    'Czechia': 'Czech Republic',
+    'Holland': 'Netherlands',
+    'The Netherlands': 'Netherlands',
+    'Viet Nam': 'Vietnam',
+    'Turkiye': 'Turkey',
+    'Türkiye': 'Turkey',
+    'Macedonia': 'North Macedonia',
+    'Hong Kong SAR': 'Hong Kong',
+    "People's Republic of China": 'China',
+    'PRC': 'China',
+    'Syrian Arab Republic': 'Syria',
+    'The Bahamas': 'Bahamas'
+}
+
+
+def _lookup_key(name):
+    """Case and punctuation insensitive key used by the country lookup"""
+    return re.sub(r'[^0-9a-z]+', '', name.casefold())
+
+
+# Precompiled normalized key -> canonical name lookup
+_COUNTRY_LOOKUP = {_lookup_key(name): name for name in COUNTRY_ISO3}
+_COUNTRY_LOOKUP.update({_lookup_key(alias): name for alias, name in COUNTRY_ALIASES.items()})
+
+
+@lru_cache(maxsize=4096)
+def canonicalize_country(name):
+    """
+    Map a single country name variant to its canonical form
+    
+    Parameters:
+    -----------
+    name : str
+        Raw country name (one country, not a comma separated list)
+        
+    Returns:
+    --------
+    str
+        Canonical country name, or the stripped input when it is not known
+    """
+    name = name.strip()
+    return _COUNTRY_LOOKUP.get(_lookup_key(name), name)
+
+
+def country_iso3(name):
+    """
+    Resolve the ISO-3 code of a canonical country name
+    
+    Parameters:
+    -----------
+    name : str
+        Canonical country name
+        
+    Returns:
+    --------
+    str or None
+        ISO 3166-1 alpha-3 code, or None when the country is not known
+    """
+    return COUNTRY_ISO3.get(name)
+
+
+if __name__ == "__main__":
+    print("Countries Module")
+    print("Import this module to use country lookups")
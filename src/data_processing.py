@@ -5,24 +5,270 @@ Utilities for loading, cleaning, and preprocessing streaming content data
 
 import pandas as pd
 import numpy as np
+import re
+import zlib
 from datetime import datetime
+from functools import lru_cache
 
+from .backends import get_backend
+from .countries import canonicalize_country, country_iso3
 
-def load_data(filepath):
+# Mersenne prime used by the MinHash universal hash family
+_MINHASH_PRIME = np.uint64((1 << 61) - 1)
+
+
+# Declared schema of the raw catalog CSV. 'dtype' is the dtype read from
+# disk; the remaining keys are row-level validation rules.
+CATALOG_SCHEMA = {
+    'show_id': {'dtype': 'object'},
+    'type': {'dtype': 'object', 'allowed': ['Movie', 'TV Show']},
+    'title': {'dtype': 'object'},
+    'director': {'dtype': 'object'},
+    'cast': {'dtype': 'object'},
+    'country': {'dtype': 'object'},
+    'date_added': {'dtype': 'object'},
+    'release_year': {'dtype': 'Int64', 'min': 1900, 'max': 2100},
+    'rating': {'dtype': 'object', 'not_pattern': r'^\d+ min$'},
+    'duration': {'dtype': 'object', 'pattern': r'^\d+ (min|Seasons?)$'},
+    'listed_in': {'dtype': 'object'},
+    'description': {'dtype': 'object'}
+}
+
+# Ratings counted as mature-audience content
+MATURE_RATINGS = ['TV-MA', 'R', 'TV-14']
+
+# Raw columns each derived column is computed from
+DERIVED_COLUMN_SOURCES = {
+    'year_added': ['date_added'],
+    'month_added': ['date_added'],
+    'month_name': ['date_added'],
+    'day_of_week': ['date_added'],
+    'quarter_added': ['date_added'],
+    'content_lag_years': ['date_added', 'release_year'],
+    'content_age': ['release_year'],
+    'duration_minutes': ['type', 'duration'],
+    'duration_seasons': ['type', 'duration'],
+    'title_cluster_id': ['title', 'cast', 'director', 'type', 'release_year']
+}
+
+
+def requires_columns(*columns):
+    """
+    Declare the columns an analysis function reads
+    
+    The columns are stored on the function as `required_columns` so that
+    loaders can project the CSV down to what a job actually needs.
+    
+    Parameters:
+    -----------
+    *columns : str
+        Raw or derived column names
+    """
+    def decorator(func):
+        func.required_columns = tuple(columns)
+        return func
+    return decorator
+
+
+def resolve_source_columns(columns=None, analyses=None, schema=None):
+    """
+    Resolve requested columns and analysis functions to raw CSV columns
+    
+    Parameters:
+    -----------
+    columns : iterable of str, optional
+        Raw or derived column names
+    analyses : iterable of callables, optional
+        Functions decorated with requires_columns
+    schema : dict, optional
+        Schema the raw columns must belong to (defaults to CATALOG_SCHEMA)
+        
+    Returns:
+    --------
+    list or None
+        Raw columns in schema order, or None when nothing was requested
+    """
+    schema = schema or CATALOG_SCHEMA
+    requested = list(columns or [])
+    for func in analyses or []:
+        requested.extend(getattr(func, 'required_columns', ()))
+    if not requested:
+        return None
+    
+    raw = set()
+    for column in requested:
+        raw.update(DERIVED_COLUMN_SOURCES.get(column, [column]))
+    
+    unknown = raw.difference(schema)
+    if unknown:
+        raise ValueError(f"Columns not in schema: {sorted(unknown)}")
+    
+    return [column for column in schema if column in raw]
+
+
+def _csv_engine():
+    """CSV parser of the active backend (multithreaded pyarrow when available)"""
+    return get_backend().csv_engine
+
+
+def _coerce_dtypes(df, schema):
+    """Convert text columns to their declared dtypes; unparseable values become missing"""
+    for column, rules in schema.items():
+        if column in df.columns and rules.get('dtype') == 'Int64' \
+                and not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    return df
+
+
+def validate_schema(df, schema=None):
+    """
+    Validate rows against the schema's rules
+    
+    Values that break a rule are replaced with missing values so downstream
+    cleaning treats them like any other gap. Pattern rules are evaluated
+    once per distinct value.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe
+    schema : dict, optional
+        Schema to validate against (defaults to CATALOG_SCHEMA)
+        
+    Returns:
+    --------
+    tuple
+        (validated dataframe, dict of column -> number of invalid values)
+    """
+    schema = schema or CATALOG_SCHEMA
+    df = df.copy()
+    violations = {}
+    
+    for column, rules in schema.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        invalid = pd.Series(False, index=df.index)
+        
+        if rules.get('dtype') == 'Int64' and not pd.api.types.is_numeric_dtype(values):
+            numeric = pd.to_numeric(values, errors='coerce')
+            invalid |= numeric.isna() & values.notna()
+            values = numeric.astype('Int64')
+        if 'min' in rules:
+            invalid |= (values < rules['min']).fillna(False)
+        if 'max' in rules:
+            invalid |= (values > rules['max']).fillna(False)
+        if 'allowed' in rules:
+            invalid |= ~values.isin(rules['allowed']) & values.notna()
+        if 'pattern' in rules or 'not_pattern' in rules:
+            codes, uniques = pd.factorize(values)
+            bad = np.zeros(len(uniques) + 1, dtype=bool)
+            unique_str = pd.Series(uniques, dtype=object).astype(str)
+            if 'pattern' in rules:
+                bad[:-1] |= ~unique_str.str.match(rules['pattern']).to_numpy()
+            if 'not_pattern' in rules:
+                bad[:-1] |= unique_str.str.match(rules['not_pattern']).to_numpy()
+            invalid |= bad[codes]
+        
+        if invalid.any():
+            violations[column] = int(invalid.sum())
+            values = values.mask(invalid)
+        df[column] = values
+    
+    return df, violations
+
+
+def load_data(filepath, columns=None, analyses=None, schema=None, validate=True,
+              chunksize=None, profile=None):
     """
     Load streaming content dataset from CSV file
     
+    Only the columns needed for the requested columns or analyses are
+    parsed, with the dtypes declared in the schema, using the multithreaded
+    pyarrow parser when it is installed. With a `chunksize` or a `profile`
+    the file is read in chunks, each profiled before validation.
+    
     Parameters:
     -----------
     filepath : str
         Path to the CSV file
+    columns : iterable of str, optional
+        Raw or derived columns the job needs; all columns if omitted
+    analyses : iterable of callables, optional
+        Analysis functions whose declared columns should be loaded
+    schema : dict, optional
+        Column schema (defaults to CATALOG_SCHEMA)
+    validate : bool
+        Validate rows against the schema rules and report violations;
+        declared dtypes are applied either way
+    chunksize : int, optional
+        Rows per chunk when reading incrementally
+    profile : profiling.DataProfile, optional
+        Profile updated with every raw chunk
         
     Returns:
     --------
     pd.DataFrame
         Loaded dataframe
     """
-    df = pd.read_csv(filepath)
+    schema = schema or CATALOG_SCHEMA
+    usecols = resolve_source_columns(columns, analyses, schema)
+    
+    header = pd.read_csv(filepath, nrows=0).columns
+    selected = [c for c in header if usecols is None or c in usecols]
+    dtype = {c: schema[c]['dtype'] for c in selected if c in schema}
+    
+    if chunksize or profile is not None:
+        # Typed columns are read as text so malformed values reach the
+        # profile and the validation counts
+        dtype = {c: 'object' for c in dtype}
+        chunks, violations = [], {}
+        for chunk in pd.read_csv(filepath, usecols=selected, dtype=dtype,
+                                 chunksize=chunksize or 100_000):
+            chunk = chunk[selected]
+            chunk_violations = {}
+            if validate or profile is not None:
+                validated, chunk_violations = validate_schema(chunk, schema)
+            if profile is not None:
+                profile.update(chunk, chunk_violations)
+            if validate:
+                chunk = validated
+                for column, count in chunk_violations.items():
+                    violations[column] = violations.get(column, 0) + count
+            else:
+                chunk = _coerce_dtypes(chunk, schema)
+            chunks.append(chunk)
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        engine = _csv_engine()
+        try:
+            df = pd.read_csv(filepath, usecols=selected, dtype=dtype, engine=engine)
+        except (ValueError, TypeError):
+            # Malformed values in typed columns; read them as text and let
+            # validation coerce and count the failures
+            dtype = {c: 'object' for c in dtype}
+            df = pd.read_csv(filepath, usecols=selected, dtype=dtype, engine=engine)
+        df = df[selected]
+        if engine == 'pyarrow':
+            # pyarrow leaves None in text columns where the C parser gives NaN
+            for column in df.columns[df.dtypes == object]:
+                values = df[column].to_numpy(copy=True)
+                values[pd.isna(values)] = np.nan
+                df[column] = values
+        violations = {}
+        if validate:
+            df, violations = validate_schema(df, schema)
+        else:
+            df = _coerce_dtypes(df, schema)
+    
+    for column, count in violations.items():
+        print(f"Schema violations in '{column}': {count} values set to missing")
+    
+    # Hand numpy dtypes to the cleaning steps, as pd.read_csv would by default
+    for column in df.columns:
+        if str(df[column].dtype) == 'Int64':
+            df[column] = df[column].astype('float64' if df[column].isna().any() else 'int64')
+    
     print(f"Data loaded successfully. Shape: {df.shape}")
     return df
 
@@ -62,17 +308,11 @@ def extract_duration_info(df):
     """
     df = df.copy()
     
-    # Create duration columns
-    df['duration_minutes'] = np.nan
-    df['duration_seasons'] = np.nan
-    
-    # Extract minutes for movies
-    mask_movies = df['type'] == 'Movie'
-    df.loc[mask_movies, 'duration_minutes'] = df.loc[mask_movies, 'duration'].str.extract('(\d+)').astype(float)
+    numbers = get_backend().extract_number(df['duration'])
     
-    # Extract seasons for TV shows
-    mask_tv = df['type'] == 'TV Show'
-    df.loc[mask_tv, 'duration_seasons'] = df.loc[mask_tv, 'duration'].str.extract('(\d+)').astype(float)
+    # Minutes for movies, seasons for TV shows
+    df['duration_minutes'] = numbers.where(df['type'] == 'Movie')
+    df['duration_seasons'] = numbers.where(df['type'] == 'TV Show')
     
     return df
 
@@ -164,10 +404,152 @@ def extract_temporal_features(df):
     return df
 
 
+@lru_cache(maxsize=65536)
+def _split_multi_value(value, delimiter, canonicalize):
+    """Split, strip, canonicalize and de-duplicate one delimited value"""
+    parts = []
+    for part in str(value).split(delimiter):
+        part = part.strip()
+        if not part:
+            continue
+        if canonicalize is not None:
+            part = canonicalize(part)
+        if part not in parts:
+            parts.append(part)
+    return tuple(parts)
+
+
+def build_multi_value_index(series, delimiter=',', canonicalize=None, missing_value=None):
+    """
+    Build a compact long-form index of a multi-value column
+    
+    String splitting and canonicalization run once per unique value, so the
+    cost depends on the number of distinct raw strings rather than rows.
+    Categorical columns reuse their codes instead of being factorized.
+    
+    Parameters:
+    -----------
+    series : pd.Series
+        Column with delimited values, e.g. "United States, India"
+    delimiter : str
+        Delimiter used in the column values
+    canonicalize : callable, optional
+        Function mapping a single stripped value to its canonical form
+    missing_value : str, optional
+        Value assigned to missing or empty entries; they are dropped if None
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per (title, value) pair with an integer 'row' column holding
+        the positional row of the title and a categorical 'value' column
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Already coded (e.g. the cleaned country column): no per-row string work
+        codes, uniques = series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    split = [_split_multi_value(value, delimiter, canonicalize) for value in uniques]
+    
+    if missing_value is not None:
+        split = [parts or (missing_value,) for parts in split]
+        split.append((missing_value,))
+        codes = np.where(codes < 0, len(split) - 1, codes)
+    
+    categories = pd.unique(pd.Series([v for parts in split for v in parts], dtype=object))
+    category_codes = {value: i for i, value in enumerate(categories)}
+    per_unique = [np.array([category_codes[v] for v in parts], dtype=np.int64) for parts in split]
+    
+    rows, value_codes = _expand_unique_values(codes, per_unique, np.int64)
+    
+    return pd.DataFrame({
+        'row': rows,
+        'value': pd.Categorical.from_codes(value_codes, categories=categories)
+    })
+
+
+def build_country_index(df):
+    """
+    Build a per-title country index with canonical names and ISO-3 codes
+    
+    Multi-country values such as "United States, India" contribute one entry
+    per country, so co-productions are counted for every producing country.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe with 'country' column
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Columns 'row' (positional row of the title), 'country' (categorical
+        canonical name) and 'iso3' (ISO-3 code, None for unknown countries)
+    """
+    index = build_multi_value_index(df['country'], delimiter=',',
+                                    canonicalize=canonicalize_country,
+                                    missing_value='Unknown')
+    index = index.rename(columns={'value': 'country'})
+    
+    # ISO codes are resolved once per category, not per row
+    iso_codes = np.array([country_iso3(c) for c in index['country'].cat.categories], dtype=object)
+    index['iso3'] = iso_codes[index['country'].cat.codes.to_numpy()] if len(iso_codes) else None
+    
+    return index
+
+
+# Segment dimension -> (source column, is the column multi-valued)
+SEGMENT_DIMENSIONS = {
+    'genre': ('listed_in', True),
+    'country': ('country', True),
+    'director': ('director', True),
+    'cast': ('cast', True),
+    'type': ('type', False),
+    'rating': ('rating', False)
+}
+
+
+def build_segment_index(df, dimension):
+    """
+    Build a (row, value) membership index for a segment dimension
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe
+    dimension : str
+        A key of SEGMENT_DIMENSIONS ('genre', 'country', 'type', ...) or any
+        single-valued column name
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Columns 'row' (positional row of the title) and 'value' (categorical)
+    """
+    if dimension == 'country':
+        return build_country_index(df)[['row', 'country']].rename(columns={'country': 'value'})
+    
+    column, multi_valued = SEGMENT_DIMENSIONS.get(dimension, (dimension, False))
+    if multi_valued:
+        return build_multi_value_index(df[column], delimiter=',')
+    
+    codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+    rows = np.flatnonzero(codes >= 0)
+    return pd.DataFrame({
+        'row': rows,
+        'value': pd.Categorical.from_codes(codes[rows], categories=uniques)
+    })
+
+
 def clean_country_column(df):
     """
     Clean and standardize country names
     
+    Every listed country is mapped to its canonical name, duplicates and
+    empty entries are dropped and missing values become 'Unknown'. The
+    column is stored as a categorical, so build_country_index and the
+    country analyses reuse its codes instead of re-factorizing strings.
+    
     Parameters:
     -----------
     df : pd.DataFrame
@@ -176,26 +558,18 @@ def clean_country_column(df):
     Returns:
     --------
     pd.DataFrame
-        Dataframe with cleaned country column
+        Dataframe with cleaned categorical country column
     """
     df = df.copy()
     
-    # Common country name standardizations
-    country_mapping = {
-        'United States': 'United States',
-        'India': 'India',
-        'United Kingdom': 'United Kingdom',
-        'Japan': 'Japan',
-        'South Korea': 'South Korea',
-        'Canada': 'Canada',
-        'France': 'France',
-        'Spain': 'Spain',
-        'Germany': 'Germany',
-        'Mexico': 'Mexico'
-    }
-    
-    # Fill missing values
-    df['country'] = df['country'].fillna('Unknown')
+    # Standardize each distinct raw value once and map back by code; missing
+    # rows have code -1 and pick up the trailing 'Unknown'
+    codes, uniques = pd.factorize(df['country'], use_na_sentinel=True)
+    cleaned = np.array([', '.join(_split_multi_value(value, ',', canonicalize_country)) or 'Unknown'
+                        for value in uniques] + ['Unknown'], dtype=object)
+    cleaned_codes, categories = pd.factorize(cleaned)
+    df['country'] = pd.Categorical.from_codes(cleaned_codes[codes], categories=categories)
+    df['country'] = df['country'].cat.remove_unused_categories()
     
     return df
 
@@ -220,15 +594,20 @@ def handle_missing_values(df, strategy='default'):
     
     if strategy == 'default':
         # Fill categorical columns with 'Unknown' or 'Not Available'
-        df['director'] = df['director'].fillna('Not Available')
-        df['cast'] = df['cast'].fillna('Not Available')
-        df['country'] = df['country'].fillna('Unknown')
-        df['rating'] = df['rating'].fillna('Not Rated')
-        
+        fill_values = {
+            'director': 'Not Available',
+            'cast': 'Not Available',
+            'country': 'Unknown',
+            'rating': 'Not Rated'
+        }
+        for column, value in fill_values.items():
+            if column in df.columns:
+                df[column] = df[column].fillna(value)
+    
     elif strategy == 'drop':
         # Drop rows with missing critical values
-        df = df.dropna(subset=['title', 'type', 'release_year'])
-        
+        df = df.dropna(subset=[c for c in ['title', 'type', 'release_year'] if c in df.columns])
+    
     return df
 
 
@@ -253,40 +632,379 @@ def create_content_age(df):
     return df
 
 
-def load_and_clean_data(filepath):
+def _token_hashes(tokens):
+    """Stable 32-bit hashes for a list of string tokens"""
+    return np.fromiter((zlib.crc32(t.encode('utf-8')) for t in tokens),
+                       dtype=np.uint64, count=len(tokens))
+
+
+# Edition qualifiers that do not make a title a different work, e.g. "(Remastered)"
+_EDITION_WORDS = (r"\b(?:remaster(?:ed)?|director'?s cut|extended|uncut|unrated|special edition|"
+                  r"anniversary edition|dubbed|subbed|subtitled)\b")
+_EDITION_PATTERN = re.compile(
+    rf"[(\[][^()\[\]]*{_EDITION_WORDS}[^()\[\]]*[)\]]|\s*[:\-]\s+[^:\-]*{_EDITION_WORDS}[^:\-]*$",
+    re.IGNORECASE)
+
+# Roman numerals up to 39 written with i, v and x only
+_ROMAN_PATTERN = re.compile(r'^(x{0,3})(ix|iv|v?i{0,3})$')
+_ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10}
+
+
+def _strip_edition(title):
+    """Title without edition qualifiers such as "(Remastered)" """
+    return _EDITION_PATTERN.sub(' ', str(title))
+
+
+def _roman_value(token):
+    """Value of a lowercase roman numeral token, or None"""
+    if not token or not _ROMAN_PATTERN.match(token):
+        return None
+    values = [_ROMAN_VALUES[c] for c in token]
+    return sum(-v if i + 1 < len(values) and v < values[i + 1] else v for i, v in enumerate(values))
+
+
+def _title_numbers(title):
+    """
+    Sorted distinct numbers in a title, from digits or roman numerals
+    
+    Sequels differ mostly in these ("Rocky" / "Rocky II", "Part 2" /
+    "Part 3"), so titles are only merged when their numbers agree.
+    """
+    numbers = set()
+    for token in re.findall(r'[0-9a-z]+', _strip_edition(title).lower()):
+        if token.isdigit():
+            numbers.add(int(token))
+        else:
+            value = _roman_value(token)
+            if value is not None:
+                numbers.add(value)
+    return tuple(sorted(numbers))
+
+
+def _title_shingles(title, k=3):
+    """Character k-grams of a normalized title, ignoring edition qualifiers"""
+    text = re.sub(r'[^0-9a-z]+', '', _strip_edition(title).lower())
+    if len(text) <= k:
+        return [f't:{text}'] if text else []
+    return [f't:{text[i:i + k]}' for i in range(len(text) - k + 1)]
+
+
+def _name_shingles(names, prefix):
+    """One shingle per person in a comma separated name list"""
+    return [f'{prefix}:{name.strip().lower()}' for name in str(names).split(',')
+            if name.strip() and name.strip() != 'Not Available']
+
+
+def _expand_unique_values(codes, per_unique, dtype):
+    """
+    Expand per-unique-value arrays back to one entry per row/value pair
+    
+    Parameters:
+    -----------
+    codes : np.ndarray
+        Factorized codes of the rows (-1 for missing rows, which are skipped)
+    per_unique : list of np.ndarray
+        Values belonging to each unique code
+    dtype : np.dtype
+        Dtype of the expanded values
+        
+    Returns:
+    --------
+    tuple of np.ndarray
+        (row positions, values) with one entry per row/value pair
+    """
+    if not per_unique:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=dtype)
+    
+    lengths = np.array([len(v) for v in per_unique], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.concatenate(per_unique).astype(dtype) if lengths.sum() else np.empty(0, dtype=dtype)
+    
+    valid = codes >= 0
+    rows = np.flatnonzero(valid)
+    row_codes = codes[valid]
+    counts = lengths[row_codes]
+    
+    # Gather each row's values from the flat per-unique array
+    row_positions = np.repeat(rows, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    values = flat[np.repeat(starts[row_codes], counts) + offsets]
+    
+    return row_positions, values
+
+
+def _expand_shingles(series, shingle_func):
+    """
+    Shingle a column, doing the string work once per unique value
+    
+    Returns:
+    --------
+    tuple of np.ndarray
+        (row positions, shingle hashes) with one entry per row/shingle pair
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    hashed = [_token_hashes(shingle_func(value)) for value in uniques]
+    return _expand_unique_values(codes, hashed, np.uint64)
+
+
+def compute_minhash_signatures(df, num_perm=128, seed=42, chunk_size=131072):
+    """
+    Compute MinHash signatures over title, cast and director shingles
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe with 'title' and optionally 'cast'/'director' columns
+    num_perm : int
+        Number of hash permutations (signature length)
+    seed : int
+        Seed for the hash family, fixed so signatures are reproducible
+    chunk_size : int
+        Number of shingles hashed per vectorized block
+        
+    Returns:
+    --------
+    np.ndarray
+        Array of shape (len(df), num_perm); rows without any shingle are
+        filled with the maximum uint64 value
+    """
+    parts = [_expand_shingles(df['title'], _title_shingles)]
+    if 'cast' in df.columns:
+        parts.append(_expand_shingles(df['cast'], lambda v: _name_shingles(v, 'c')))
+    if 'director' in df.columns:
+        parts.append(_expand_shingles(df['director'], lambda v: _name_shingles(v, 'd')))
+    
+    rows = np.concatenate([p[0] for p in parts])
+    shingles = np.concatenate([p[1] for p in parts])
+    order = np.argsort(rows, kind='stable')
+    rows, shingles = rows[order], shingles[order]
+    
+    # Universal hash family h(x) = (a * x + b) mod p; a < 2**31 keeps a * x
+    # below 2**63 for 32-bit shingle hashes so uint64 arithmetic never wraps
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 61, size=num_perm, dtype=np.uint64)
+    
+    signatures = np.full((len(df), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(rows), chunk_size):
+        chunk_rows = rows[start:start + chunk_size]
+        hashed = (shingles[start:start + chunk_size, None] * a + b) % _MINHASH_PRIME
+        row_ids, first = np.unique(chunk_rows, return_index=True)
+        minima = np.minimum.reduceat(hashed, first, axis=0)
+        signatures[row_ids] = np.minimum(signatures[row_ids], minima)
+    
+    return signatures
+
+
+def _connected_components(n, left, right):
+    """Label connected components of an edge list by min-label propagation"""
+    labels = np.arange(n)
+    while True:
+        edge_min = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, edge_min)
+        np.minimum.at(updated, right, edge_min)
+        # Pointer jumping to shortcut long chains
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def _representative_clusters(n, left, right, signatures, threshold):
+    """
+    Connected components split until every member resembles its representative
+    
+    Chains of pairwise-similar links can otherwise join titles that share
+    nothing. Members whose estimated similarity to their component's
+    representative (its lowest row) is below `threshold` lose their links
+    to the rest of the component and regroup among themselves; this repeats
+    until every cluster is consistent.
+    """
+    while True:
+        labels = _connected_components(n, left, right)
+        members = np.flatnonzero(labels != np.arange(n))
+        similarity = (signatures[members] == signatures[labels[members]]).mean(axis=1)
+        drifted = np.zeros(n, dtype=bool)
+        drifted[members[similarity < threshold]] = True
+        if not drifted.any():
+            return labels
+        keep = drifted[left] == drifted[right]
+        left, right = left[keep], right[keep]
+
+
+def find_duplicate_clusters(df, num_perm=128, bands=32, threshold=0.7,
+                            block_on=('type', 'release_year'), seed=42):
+    """
+    Detect near-duplicate titles with MinHash signatures and LSH banding
+    
+    Titles are shingled on character 3-grams of the normalized title plus
+    individual cast and director names. Signatures are split into bands;
+    rows sharing any band bucket become candidate pairs, which are kept only
+    when their estimated Jaccard similarity reaches `threshold`, their
+    `block_on` values match and the numbers in their titles (digits or
+    roman numerals, so sequels stay apart) agree. Edition qualifiers such as
+    "(Remastered)" are ignored. Linked rows are then merged, and every
+    member must also reach `threshold` against its cluster's representative,
+    so chains of similar links cannot join unrelated titles. Candidate
+    generation is sub-quadratic, so this scales to merged catalogs.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input dataframe with 'title' and optionally 'cast'/'director' columns
+    num_perm : int
+        MinHash signature length; must be divisible by `bands`
+    bands : int
+        Number of LSH bands; more bands find less similar candidates
+    threshold : float
+        Minimum estimated Jaccard similarity for two rows to be merged
+    block_on : str, tuple of str or None
+        Columns whose values must match for two rows to be duplicates
+    seed : int
+        Seed for the hash family
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Dataframe with a 'title_cluster_id' column shared by all duplicates
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+    
+    df = df.copy()
+    n = len(df)
+    signatures = compute_minhash_signatures(df, num_perm=num_perm, seed=seed)
+    has_shingles = signatures[:, 0] != np.iinfo(np.uint64).max
+    
+    rows_per_band = num_perm // bands
+    candidates = np.flatnonzero(has_shingles)
+    if not len(candidates):
+        # Nothing to compare: every row is its own cluster
+        df['title_cluster_id'] = np.arange(n)
+        return df
+    
+    # Rows may only merge within a block: same block_on values and title numbers
+    title_codes, title_uniques = pd.factorize(df['title'], use_na_sentinel=True)
+    numbers = np.array([' '.join(map(str, _title_numbers(t))) for t in title_uniques] + [''], dtype=object)
+    keys = [pd.Series(numbers[title_codes], index=df.index)]
+    block_on = (block_on,) if isinstance(block_on, str) else tuple(block_on or ())
+    keys.extend(df[column] for column in block_on if column in df.columns)
+    block = pd.MultiIndex.from_arrays(keys).factorize()[0].astype(np.uint64)
+    
+    left, right = [], []
+    for band in range(bands):
+        # Fold the band's hash values into a single bucket key per row
+        band_sig = signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band]
+        keys = block[candidates] * np.uint64(0x9E3779B97F4A7C15)
+        for col in range(rows_per_band):
+            keys = (keys ^ band_sig[:, col]) * np.uint64(0x100000001B3)
+        
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        group_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        group_id = np.cumsum(group_start) - 1
+        first_member = order[group_start][group_id]
+        linked = order != first_member
+        left.append(candidates[order[linked]])
+        right.append(candidates[first_member[linked]])
+    
+    left = np.concatenate(left) if left else np.empty(0, dtype=np.int64)
+    right = np.concatenate(right) if right else np.empty(0, dtype=np.int64)
+    
+    if len(left):
+        pairs = np.unique(left.astype(np.int64) * n + right)
+        left, right = pairs // n, pairs % n
+        # Drop false positives from bucket collisions
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = (similarity >= threshold) & (block[left] == block[right])
+        left, right = left[keep], right[keep]
+    
+    labels = _representative_clusters(n, left, right, signatures, threshold)
+    df['title_cluster_id'] = pd.factorize(labels)[0]
+    
+    return df
+
+
+def deduplicate_titles(df, cluster_column='title_cluster_id'):
+    """
+    Keep one row per duplicate cluster
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dataframe returned by find_duplicate_clusters
+    cluster_column : str
+        Name of the cluster id column
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Dataframe with the first row of every cluster
+    """
+    return df.drop_duplicates(subset=cluster_column, keep='first').reset_index(drop=True)
+
+
+def load_and_clean_data(filepath, detect_duplicates=False, columns=None, analyses=None, n_jobs=4,
+                        chunksize=None, profile=None):
     """
     Complete pipeline to load and clean streaming content data
     
+    When `columns` or `analyses` are given only the raw columns they need are
+    loaded and only the cleaning stages producing the requested columns run
+    (see pipeline.plan_cleaning); independent stages run concurrently. A
+    ValueError is raised when a requested column cannot be produced from
+    the file's columns.
+    
     Parameters:
     -----------
     filepath : str
         Path to the CSV file
+    detect_duplicates : bool
+        If True, add a 'title_cluster_id' column grouping near-duplicate titles
+    columns : iterable of str, optional
+        Raw or derived columns the job needs
+    analyses : iterable of callables, optional
+        Analysis functions whose declared columns should be available
+    n_jobs : int
+        Worker threads for independent cleaning stages
+    chunksize : int, optional
+        Rows per chunk when reading incrementally (see load_data)
+    profile : profiling.DataProfile, optional
+        Profile updated with every raw chunk
         
     Returns:
     --------
     pd.DataFrame
         Cleaned and processed dataframe
     """
-    print("Loading data...")
-    df = load_data(filepath)
-    
-    print("Converting date formats...")
-    df = convert_date_added(df)
+    from .pipeline import CLEANING_STAGES, plan_cleaning, run_plan
     
-    print("Handling missing values...")
-    df = handle_missing_values(df, strategy='default')
+    requested = list(columns or [])
+    for func in analyses or []:
+        requested.extend(getattr(func, 'required_columns', ()))
+    if requested and detect_duplicates:
+        requested.append('title_cluster_id')
     
-    print("Extracting duration information...")
-    df = extract_duration_info(df)
+    print("Loading data...")
+    df = load_data(filepath, columns=resolve_source_columns(requested), chunksize=chunksize, profile=profile)
     
-    print("Extracting temporal features...")
-    df = extract_temporal_features(df)
+    # Without a request, produce everything the default stages write
+    targets = requested or [c for stage in CLEANING_STAGES if stage['default'] for c in stage['outputs']]
+    if detect_duplicates and not requested:
+        targets.append('title_cluster_id')
+    plan = plan_cleaning(targets, available=df.columns)
     
-    print("Calculating content lag...")
-    df = calculate_content_lag(df)
+    # Explicitly requested columns must not be dropped with their stage
+    explicit = requested or (['title_cluster_id'] if detect_duplicates else [])
+    produced = set(df.columns).union(*plan['outputs'])
+    missing = [c for c in dict.fromkeys(explicit) if c not in produced]
+    if missing:
+        raise ValueError(f"Cannot produce columns {missing}: their sources are missing from {filepath}")
+    df, _ = run_plan(df, plan, n_jobs=n_jobs)
     
-    print("Creating content age feature...")
-    df = create_content_age(df)
+    if detect_duplicates:
+        print(f"Found {df['title_cluster_id'].nunique()} distinct titles")
     
     print(f"\nData cleaning complete! Final shape: {df.shape}")
     
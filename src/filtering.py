@@ -0,0 +1,295 @@
+"""
+Filtering Module
+Bitmap-indexed segment filters for fast catalog slicing
+"""
+
+import numpy as np
+
+from .data_processing import SEGMENT_DIMENSIONS, build_segment_index
+
+
+# Dimensions indexed by default; multi-valued ones follow SEGMENT_DIMENSIONS
+INDEX_DIMENSIONS = ('type', 'rating', 'country', 'genre', 'year_added', 'release_year')
+
+# Set bits per byte value, for popcounts on numpy < 2.0
+_POPCOUNT8 = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def popcount(words):
+    """
+    Number of set bits of a uint64 array along its last axis
+    
+    Parameters:
+    -----------
+    words : np.ndarray
+        uint64 bitsets; 1-d for one bitset, 2-d for one bitset per row
+        
+    Returns:
+    --------
+    np.ndarray or np.integer
+        Set bits per row (the total for a 1-d array)
+    """
+    return _POPCOUNT8[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1)
+
+
+def all_of(*predicates):
+    """Predicate matching rows that satisfy every given predicate"""
+    return ('and', predicates)
+
+
+def any_of(*predicates):
+    """Predicate matching rows that satisfy at least one given predicate"""
+    return ('or', predicates)
+
+
+def negate(predicate):
+    """Predicate matching rows that do not satisfy `predicate`"""
+    return ('not', predicate)
+
+
+def _rows_to_words(rows, n_rows):
+    """Pack sorted row positions into a little-endian uint64 bitmap"""
+    n_words = (n_rows + 63) // 64
+    bits = np.zeros(n_words * 64, dtype=bool)
+    bits[rows] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def _words_to_rows(words, n_rows):
+    """Row positions of the set bits of a bitmap"""
+    bits = np.unpackbits(words.view(np.uint8), bitorder='little', count=n_rows)
+    return np.flatnonzero(bits)
+
+
+def _test_bits(words, rows):
+    """Which of `rows` are set in `words`"""
+    rows = rows.astype(np.int64, copy=False)
+    return ((words[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+class BitmapIndex:
+    """
+    Compressed bitmap indexes over the segment values of a catalog
+    
+    Every value of every indexed dimension gets a container holding the
+    rows where it occurs. Like roaring bitmaps, a value is stored as a
+    sorted array of row positions while that is smaller than a dense
+    bitmap, and as packed uint64 words otherwise. Predicates are evaluated
+    with bitmap AND/OR/NOT, staying in the sparse representation where it
+    is cheaper.
+    
+    Predicates are dicts mapping a dimension to a value, a list/set of
+    values (any of them) or a `range` of numeric values; all entries of a
+    dict must hold. Combine predicates with all_of, any_of and negate.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    dimensions : tuple of str
+        Dimensions to index, see data_processing.SEGMENT_DIMENSIONS
+    """
+    
+    def __init__(self, df, dimensions=INDEX_DIMENSIONS):
+        self.n_rows = len(df)
+        self.dimensions = tuple(d for d in dimensions
+                                if SEGMENT_DIMENSIONS.get(d, (d, False))[0] in df.columns)
+        self._containers = {}
+        for dimension in self.dimensions:
+            self._containers[dimension] = self._build_containers(build_segment_index(df, dimension))
+    
+    def _build_containers(self, index):
+        """Group the (row, value) index into one container per value"""
+        codes = index['value'].cat.codes.to_numpy()
+        order = np.argsort(codes, kind='stable')
+        rows = index['row'].to_numpy()[order].astype(np.uint32)
+        counts = np.bincount(codes, minlength=len(index['value'].cat.categories))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        
+        # A row array costs 4 bytes per row, a bitmap one bit per catalog row
+        sparse_limit = self.n_rows // 32
+        containers = {}
+        for code, value in enumerate(index['value'].cat.categories):
+            value_rows = np.unique(rows[bounds[code]:bounds[code + 1]])
+            if len(value_rows) < sparse_limit:
+                containers[value] = value_rows
+            else:
+                containers[value] = _rows_to_words(value_rows, self.n_rows)
+        return containers
+    
+    @property
+    def nbytes(self):
+        """Memory held by all containers"""
+        return sum(c.nbytes for containers in self._containers.values() for c in containers.values())
+    
+    def values(self, dimension):
+        """Indexed values of a dimension"""
+        return list(self._containers[dimension])
+    
+    def _dense(self, container):
+        """Bitmap words of a container"""
+        if container.dtype == np.uint64:
+            return container
+        return _rows_to_words(container, self.n_rows)
+    
+    def _and(self, left, right):
+        """Intersection of two containers"""
+        if left.dtype == np.uint64 and right.dtype == np.uint64:
+            return left & right
+        if left.dtype == np.uint64:
+            left, right = right, left
+        if right.dtype == np.uint64:
+            return left[_test_bits(right, left)]
+        return np.intersect1d(left, right, assume_unique=True)
+    
+    def _or(self, containers):
+        """Union of any number of containers"""
+        sparse = [c for c in containers if c.dtype != np.uint64]
+        dense = [c for c in containers if c.dtype == np.uint64]
+        if not dense:
+            if not sparse:
+                return np.zeros(0, dtype=np.uint32)
+            rows = np.unique(np.concatenate(sparse))
+            if len(rows) < self.n_rows // 32:
+                return rows
+            return _rows_to_words(rows, self.n_rows)
+        words = np.bitwise_or.reduce(dense)
+        if sparse:
+            words = words | _rows_to_words(np.concatenate(sparse), self.n_rows)
+        return words
+    
+    def _not(self, container):
+        """Complement of a container as a bitmap"""
+        words = ~self._dense(container)
+        tail = self.n_rows % 64
+        if tail:
+            words[-1] &= np.uint64((1 << tail) - 1)
+        return words
+    
+    def _match(self, dimension, spec):
+        """Container of rows whose `dimension` matches a value spec"""
+        if dimension not in self._containers:
+            raise KeyError(f"Dimension '{dimension}' is not indexed")
+        containers = self._containers[dimension]
+        if isinstance(spec, range):
+            selected = [c for value, c in containers.items()
+                        if isinstance(value, (int, float, np.number))
+                        and spec.start <= value < spec.stop and (value - spec.start) % spec.step == 0]
+        elif isinstance(spec, (list, tuple, set, frozenset)):
+            selected = [containers[value] for value in spec if value in containers]
+        else:
+            selected = [containers[spec]] if spec in containers else []
+        if len(selected) == 1:
+            return selected[0]
+        return self._or(selected)
+    
+    def _evaluate(self, predicate):
+        """Container of rows matching a predicate"""
+        if isinstance(predicate, dict):
+            result = None
+            for dimension, spec in predicate.items():
+                matched = self._match(dimension, spec)
+                result = matched if result is None else self._and(result, matched)
+            if result is None:
+                return self._not(np.zeros(0, dtype=np.uint32))
+            return result
+        
+        operator, operands = predicate
+        if operator == 'not':
+            return self._not(self._evaluate(operands))
+        evaluated = [self._evaluate(p) for p in operands]
+        if operator == 'or':
+            return self._or(evaluated)
+        # Intersect the smallest containers first
+        evaluated.sort(key=lambda c: len(c) if c.dtype != np.uint64 else self.n_rows)
+        result = evaluated[0]
+        for container in evaluated[1:]:
+            result = self._and(result, container)
+        return result
+    
+    def select(self, predicate):
+        """
+        Row positions matching a predicate
+        
+        Parameters:
+        -----------
+        predicate : dict or tuple
+            Predicate, see the class docstring
+            
+        Returns:
+        --------
+        np.ndarray
+            Sorted positional row indices
+        """
+        result = self._evaluate(predicate)
+        if result.dtype == np.uint64:
+            return _words_to_rows(result, self.n_rows)
+        return result.astype(np.int64)
+    
+    def count(self, predicate):
+        """Number of rows matching a predicate"""
+        result = self._evaluate(predicate)
+        if result.dtype == np.uint64:
+            return int(popcount(result))
+        return len(result)
+    
+    def filter(self, df, predicate):
+        """
+        Rows of `df` matching a predicate
+        
+        The result is an ordinary dataframe slice that every analysis
+        function accepts.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            The dataframe the index was built from
+        predicate : dict or tuple
+            Predicate, see the class docstring
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Matching rows
+        """
+        if len(df) != self.n_rows:
+            raise ValueError("Dataframe does not match the indexed catalog")
+        return df.iloc[self.select(predicate)]
+
+
+def filter_catalog(df, predicate, index=None):
+    """
+    Slice a catalog by a compound segment predicate
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    predicate : dict or tuple
+        Predicate, see BitmapIndex
+    index : BitmapIndex, optional
+        Prebuilt index for `df`; build one when slicing repeatedly
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Matching rows
+    """
+    if index is None:
+        dimensions = set()
+        stack = [predicate]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                dimensions.update(item)
+            elif item[0] == 'not':
+                stack.append(item[1])
+            else:
+                stack.extend(item[1])
+        index = BitmapIndex(df, dimensions=tuple(dimensions))
+    return index.filter(df, predicate)
+
+
+if __name__ == "__main__":
+    print("Filtering Module")
+    print("Import this module to slice catalogs with bitmap indexes")
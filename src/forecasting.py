@@ -0,0 +1,208 @@
+"""
+Forecasting Module
+Batched seasonal forecasts of monthly content additions per segment
+"""
+
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+from .data_processing import build_segment_index
+
+# Columns of forecast_additions output that are not segment labels
+FORECAST_COLUMNS = ('month', 'forecast', 'lower', 'upper')
+
+
+def build_monthly_series(df, dimensions=('genre', 'country')):
+    """
+    Build a matrix of monthly additions for every combination of segments
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe with 'date_added' and segment columns
+    dimensions : tuple of str
+        Segment dimensions to cross, e.g. ('genre', 'country'); a single
+        series of total additions if empty
+        
+    Returns:
+    --------
+    tuple
+        (counts array of shape (series, months), pd.DataFrame of segment
+        labels with one column per dimension, pd.PeriodIndex of months)
+    """
+    dates = pd.to_datetime(df['date_added'])
+    ordinals = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+    valid = ~np.isnan(ordinals)
+    first, last = int(np.nanmin(ordinals)), int(np.nanmax(ordinals))
+    month_index = pd.period_range(pd.Period(year=first // 12, month=first % 12 + 1, freq='M'),
+                                  periods=last - first + 1, freq='M', name='month')
+    month_codes = np.full(len(df), -1, dtype=np.int64)
+    month_codes[valid] = ordinals[valid] - first
+    
+    # Cross the (row, value) memberships of every dimension on the row
+    crossed = pd.DataFrame({'row': np.flatnonzero(valid)})
+    for dimension in dimensions:
+        index = build_segment_index(df, dimension).rename(columns={'value': dimension})
+        crossed = crossed.merge(index, on='row', how='inner')
+    
+    if dimensions:
+        segment_codes = pd.MultiIndex.from_frame(crossed[list(dimensions)].astype(object))
+        codes, labels = pd.factorize(segment_codes, sort=True)
+        labels = pd.DataFrame(list(labels), columns=list(dimensions))
+    else:
+        # A single series of total additions
+        codes, labels = np.zeros(len(crossed), dtype=np.int64), pd.DataFrame(index=[0])
+    n_series, n_months = len(labels), len(month_index)
+    
+    flat = codes * n_months + month_codes[crossed['row'].to_numpy()]
+    counts = np.bincount(flat, minlength=n_series * n_months).reshape(n_series, n_months)
+    
+    return counts.astype(float), labels, month_index
+
+
+def _design_matrix(t, month_of_year, seasonal):
+    """Intercept, linear trend and sum-to-zero monthly seasonal effects"""
+    columns = [np.ones_like(t, dtype=float), t.astype(float)]
+    if seasonal:
+        for month in range(11):
+            columns.append((month_of_year == month).astype(float) - (month_of_year == 11))
+    return np.column_stack(columns)
+
+
+def fit_seasonal_forecast(counts, months, horizon=12, history=36, confidence=0.9):
+    """
+    Fit trend + monthly seasonality to many series with one least-squares solve
+    
+    Every series shares the same design matrix, so the coefficients of all
+    series come from a single pseudo-inverse product and the prediction
+    intervals share one leverage vector.
+    
+    Parameters:
+    -----------
+    counts : np.ndarray
+        Array of shape (series, months) of monthly additions
+    months : pd.PeriodIndex
+        Months of the columns of `counts`
+    horizon : int
+        Number of months to forecast
+    history : int
+        Number of most recent months used for fitting
+    confidence : float
+        Coverage of the prediction intervals
+        
+    Returns:
+    --------
+    dict
+        'forecast', 'lower' and 'upper' arrays of shape (series, horizon)
+        and the forecast 'months'
+    """
+    counts = counts[:, -history:]
+    months = months[-history:]
+    n_months = counts.shape[1]
+    
+    t = np.arange(n_months)
+    month_of_year = months.month.to_numpy() - 1
+    seasonal = n_months >= 24
+    X = _design_matrix(t, month_of_year, seasonal)
+    
+    future = pd.period_range(months[-1] + 1, periods=horizon, freq='M')
+    X_future = _design_matrix(np.arange(n_months, n_months + horizon),
+                              future.month.to_numpy() - 1, seasonal)
+    
+    # Batched least squares: (params x months) @ (months x series)
+    coefficients = np.linalg.pinv(X) @ counts.T
+    residuals = counts - (X @ coefficients).T
+    dof = max(n_months - X.shape[1], 1)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+    
+    leverage = np.einsum('ij,jk,ik->i', X_future, np.linalg.pinv(X.T @ X), X_future)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    spread = z * sigma[:, None] * np.sqrt(1 + leverage)[None, :]
+    
+    forecast = np.clip((X_future @ coefficients).T, 0, None)
+    
+    return {
+        'forecast': forecast,
+        'lower': np.clip(forecast - spread, 0, None),
+        'upper': forecast + spread,
+        'months': future
+    }
+
+
+def forecast_additions(df, dimensions=('genre', 'country'), horizon=12, history=36,
+                       confidence=0.9, min_history_additions=1):
+    """
+    Forecast monthly additions for every segment combination
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    dimensions : tuple of str
+        Segment dimensions to cross; the unsegmented total if empty
+    horizon : int
+        Number of months to forecast
+    history : int
+        Number of most recent months used for fitting
+    confidence : float
+        Coverage of the prediction intervals
+    min_history_additions : int
+        Series with fewer additions in the fitting window are skipped
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per (segment combination, month) with 'forecast', 'lower'
+        and 'upper' columns
+    """
+    counts, labels, months = build_monthly_series(df, dimensions)
+    keep = counts[:, -history:].sum(axis=1) >= min_history_additions
+    counts, labels = counts[keep], labels[keep].reset_index(drop=True)
+    
+    fitted = fit_seasonal_forecast(counts, months, horizon=horizon,
+                                   history=history, confidence=confidence)
+    
+    n_series = len(labels)
+    result = labels.loc[np.repeat(np.arange(n_series), horizon)].reset_index(drop=True)
+    result['month'] = np.tile(fitted['months'], n_series)
+    for column in ['forecast', 'lower', 'upper']:
+        result[column] = fitted[column].ravel()
+    
+    return result
+
+
+def forecast_launch_windows(forecast, by=None, n=3):
+    """
+    Rank upcoming months by forecasted additions
+    
+    Parameters:
+    -----------
+    forecast : pd.DataFrame
+        Output of forecast_additions
+    by : list of str, optional
+        Segment columns to rank within; the whole catalog if None
+    n : int
+        Number of months to keep per group
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Top months with summed 'forecast' and combined 'lower'/'upper'
+    """
+    keys = list(by or []) + ['month']
+    # Combine interval half-widths assuming independent series
+    forecast = forecast.assign(variance=(forecast['upper'] - forecast['forecast']) ** 2)
+    totals = forecast.groupby(keys)[['forecast', 'variance']].sum().reset_index()
+    spread = np.sqrt(totals.pop('variance'))
+    totals['lower'] = (totals['forecast'] - spread).clip(lower=0)
+    totals['upper'] = totals['forecast'] + spread
+    totals = totals.sort_values('forecast', ascending=False, kind='stable')
+    if by:
+        return totals.groupby(list(by), sort=False).head(n).reset_index(drop=True)
+    return totals.head(n).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("Forecasting Module")
+    print("Import this module to use forecasting functions")
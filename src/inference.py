@@ -0,0 +1,385 @@
+"""
+Inference Module
+Vectorized bootstrap confidence intervals and permutation tests
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_processing import MATURE_RATINGS, build_segment_index
+
+# Values with at most this many distinct entries per metric are resampled
+# through multinomial draws over their value counts instead of row indices
+MAX_COMPRESSED_VALUES = 2048
+
+# Upper bound on elements materialized per resampling block
+_BLOCK_ELEMENTS = 4_000_000
+
+
+def _segment_value_counts(values, segments, n_segments):
+    """
+    Compress values into a (segments x distinct values) count matrix
+    
+    Returns:
+    --------
+    tuple
+        (counts matrix, distinct values) or None when there are too many
+        distinct values for compression to pay off
+    """
+    uniques, inverse = np.unique(values, return_inverse=True)
+    if len(uniques) > MAX_COMPRESSED_VALUES:
+        return None
+    counts = np.bincount(segments * len(uniques) + inverse,
+                         minlength=n_segments * len(uniques)).reshape(n_segments, len(uniques))
+    return counts, uniques
+
+
+def _resample_compressed_means(counts, uniques, n_resamples, seed):
+    """
+    Bootstrap segment means by drawing resampled value counts
+    
+    Resampling n rows with replacement is equivalent to a multinomial draw
+    over the distinct values, so the cost is independent of the row count.
+    """
+    rng = np.random.default_rng(seed)
+    totals = counts.sum(axis=1)
+    present = totals > 0
+    probabilities = counts[present] / totals[present, None]
+    n_segments = present.sum()
+    
+    means = np.full((n_resamples, len(totals)), np.nan)
+    block = max(1, _BLOCK_ELEMENTS // max(n_segments * len(uniques), 1))
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        draws = rng.multinomial(totals[present], probabilities, size=(size, n_segments))
+        means[start:start + size, present] = draws @ uniques / totals[present]
+    return means
+
+
+def _resample_poisson_means(values, segments, n_segments, n_resamples, seed):
+    """
+    Bootstrap segment means with Poisson(1) row weights
+    
+    Used for continuous values with too many distinct entries to compress.
+    """
+    rng = np.random.default_rng(seed)
+    order = np.argsort(segments, kind='stable')
+    values, segments = values[order], segments[order]
+    present, starts = np.unique(segments, return_index=True)
+    
+    means = np.full((n_resamples, n_segments), np.nan)
+    block = max(1, _BLOCK_ELEMENTS // max(len(values), 1))
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        weights = rng.poisson(1.0, size=(size, len(values))).astype(float)
+        weighted_sums = np.add.reduceat(weights * values, starts, axis=1)
+        weight_totals = np.add.reduceat(weights, starts, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means[start:start + size, present] = weighted_sums / weight_totals
+    return means
+
+
+def _resample_proportions(successes, totals, n_resamples, seed):
+    """Bootstrap segment proportions as binomial draws of the success count"""
+    rng = np.random.default_rng(seed)
+    proportions = np.full((n_resamples, len(totals)), np.nan)
+    present = totals > 0
+    p = successes[present] / totals[present]
+    proportions[:, present] = rng.binomial(totals[present], p, size=(n_resamples, present.sum())) / totals[present]
+    return proportions
+
+
+def _split_resamples(func, args, n_resamples, seed, n_jobs):
+    """
+    Run a resampling function, optionally spread across a process pool
+    
+    Each job gets an independent child seed, so results are reproducible
+    for a fixed (seed, n_jobs) pair.
+    """
+    n_jobs = max(1, min(n_jobs or 1, n_resamples))
+    seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+    sizes = np.diff(np.linspace(0, n_resamples, n_jobs + 1).astype(int))
+    
+    if n_jobs == 1:
+        return func(*args, n_resamples, seeds[0])
+    
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(func, *args, int(size), child) for size, child in zip(sizes, seeds)]
+        return np.concatenate([f.result() for f in futures], axis=0)
+
+
+def _summarize(estimates, replicates, confidence, counts, index):
+    """Percentile intervals and standard errors from bootstrap replicates"""
+    alpha = (1 - confidence) / 2
+    with np.errstate(invalid='ignore'):
+        lower, upper = np.nanpercentile(replicates, [100 * alpha, 100 * (1 - alpha)], axis=0)
+        std_error = np.nanstd(replicates, axis=0, ddof=1)
+    return pd.DataFrame({
+        'estimate': estimates,
+        'lower': lower,
+        'upper': upper,
+        'std_error': std_error,
+        'n': counts
+    }, index=index)
+
+
+def bootstrap_ci(values, segments=None, statistic='mean', n_resamples=2000,
+                 confidence=0.95, seed=None, n_jobs=1):
+    """
+    Bootstrap confidence intervals of a mean or proportion per segment
+    
+    Parameters:
+    -----------
+    values : array-like
+        Numeric values (for 'mean') or booleans (for 'proportion'); missing
+        values are ignored
+    segments : array-like, optional
+        Segment label of each value; a single 'all' segment if omitted
+    statistic : str
+        'mean' or 'proportion'
+    n_resamples : int
+        Number of bootstrap resamples
+    confidence : float
+        Confidence level of the percentile interval
+    seed : int, optional
+        Random seed
+    n_jobs : int
+        Number of worker processes the resamples are spread across
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Indexed by segment with 'estimate', 'lower', 'upper', 'std_error'
+        and 'n' columns
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if segments is None:
+        segments = pd.Series('all', index=values.index)
+    segments = pd.Series(segments).reset_index(drop=True)
+    
+    valid = values.notna().to_numpy() & segments.notna().to_numpy()
+    codes, labels = pd.factorize(segments[valid], sort=True)
+    values = values[valid].to_numpy(dtype=float)
+    n_segments = len(labels)
+    
+    totals = np.bincount(codes, minlength=n_segments)
+    sums = np.bincount(codes, weights=values, minlength=n_segments)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimates = sums / totals
+    
+    if statistic == 'proportion':
+        replicates = _split_resamples(_resample_proportions, (sums, totals),
+                                      n_resamples, seed, n_jobs)
+    elif statistic == 'mean':
+        compressed = _segment_value_counts(values, codes, n_segments)
+        if compressed is not None:
+            replicates = _split_resamples(_resample_compressed_means, compressed,
+                                          n_resamples, seed, n_jobs)
+        else:
+            replicates = _split_resamples(_resample_poisson_means, (values, codes, n_segments),
+                                          n_resamples, seed, n_jobs)
+    else:
+        raise ValueError(f"Unknown statistic: {statistic}")
+    
+    return _summarize(estimates, replicates, confidence, totals, pd.Index(labels, name='segment'))
+
+
+def _permuted_group_sums(counts, uniques, group_size, n_permutations, seed):
+    """Sums of a random group of fixed size drawn without replacement"""
+    rng = np.random.default_rng(seed)
+    sums = np.empty(n_permutations)
+    block = max(1, _BLOCK_ELEMENTS // max(len(uniques), 1))
+    for start in range(0, n_permutations, block):
+        size = min(block, n_permutations - start)
+        draws = rng.multivariate_hypergeometric(counts, group_size, size=size)
+        sums[start:start + size] = draws @ uniques
+    return sums
+
+
+def _permuted_group_sums_shuffled(values, group_size, n_permutations, seed):
+    """Group sums from explicit shuffles, for values that do not compress"""
+    rng = np.random.default_rng(seed)
+    sums = np.empty(n_permutations)
+    block = max(1, _BLOCK_ELEMENTS // max(len(values), 1))
+    for start in range(0, n_permutations, block):
+        size = min(block, n_permutations - start)
+        keys = rng.random((size, len(values)))
+        chosen = np.argpartition(keys, group_size - 1, axis=1)[:, :group_size]
+        sums[start:start + size] = values[chosen].sum(axis=1)
+    return sums
+
+
+def permutation_test(values, in_group, n_permutations=10000, seed=None, n_jobs=1):
+    """
+    Two-sided permutation test for a difference in means between two groups
+    
+    Relabelling a group of fixed size is a multivariate hypergeometric draw
+    over the distinct values, so permutations are generated without
+    shuffling rows whenever the values compress.
+    
+    Parameters:
+    -----------
+    values : array-like
+        Numeric or boolean values; missing values are ignored
+    in_group : array-like of bool
+        True for rows of the first group, False for the second
+    n_permutations : int
+        Number of random relabellings
+    seed : int, optional
+        Random seed
+    n_jobs : int
+        Number of worker processes the permutations are spread across
+        
+    Returns:
+    --------
+    dict
+        Observed 'difference' (first minus second group mean) and 'p_value'
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    in_group = pd.Series(in_group).reset_index(drop=True).astype(bool)
+    valid = values.notna().to_numpy()
+    values = values[valid].to_numpy(dtype=float)
+    in_group = in_group[valid].to_numpy()
+    
+    n_first = int(in_group.sum())
+    n_second = len(values) - n_first
+    if n_first == 0 or n_second == 0:
+        return {'difference': np.nan, 'p_value': np.nan}
+    
+    total = values.sum()
+    observed = values[in_group].mean() - values[~in_group].mean()
+    
+    uniques, counts = np.unique(values, return_counts=True)
+    if len(uniques) <= MAX_COMPRESSED_VALUES:
+        sums = _split_resamples(_permuted_group_sums, (counts, uniques, n_first),
+                                n_permutations, seed, n_jobs)
+    else:
+        sums = _split_resamples(_permuted_group_sums_shuffled, (values, n_first),
+                                n_permutations, seed, n_jobs)
+    differences = sums / n_first - (total - sums) / n_second
+    
+    # Tolerance keeps ties with the observed statistic on the extreme side
+    extreme = np.abs(differences) >= abs(observed) - 1e-12
+    p_value = (extreme.sum() + 1) / (n_permutations + 1)
+    
+    return {'difference': observed, 'p_value': p_value}
+
+
+def _interval_dict(row):
+    """Plain dict view of one bootstrap_ci row"""
+    return {key: (int(row[key]) if key == 'n' else float(row[key]))
+            for key in ['estimate', 'lower', 'upper', 'std_error', 'n']}
+
+
+def compare_movies_vs_tv_shows_ci(df, n_resamples=2000, n_permutations=10000,
+                                  confidence=0.95, seed=None, n_jobs=1):
+    """
+    Confidence intervals and significance tests for movie vs TV show metrics
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    n_resamples : int
+        Number of bootstrap resamples
+    n_permutations : int
+        Number of permutations for the difference tests
+    confidence : float
+        Confidence level of the intervals
+    seed : int, optional
+        Random seed
+    n_jobs : int
+        Number of worker processes
+        
+    Returns:
+    --------
+    dict
+        For 'avg_release_year', 'avg_content_lag' and 'mature_share': the
+        interval of each type plus the difference and its p-value
+    """
+    types = df['type'].where(df['type'].isin(['Movie', 'TV Show']))
+    is_movie = df['type'] == 'Movie'
+    metrics = {
+        'avg_release_year': (df['release_year'], 'mean'),
+        'avg_content_lag': (df['content_lag_years'], 'mean'),
+        'mature_share': (df['rating'].isin(MATURE_RATINGS), 'proportion')
+    }
+    
+    comparison = {}
+    for name, (values, statistic) in metrics.items():
+        intervals = bootstrap_ci(values.where(types.notna()), segments=types, statistic=statistic,
+                                 n_resamples=n_resamples, confidence=confidence,
+                                 seed=seed, n_jobs=n_jobs)
+        test = permutation_test(values[types.notna()], is_movie[types.notna()],
+                                n_permutations=n_permutations, seed=seed, n_jobs=n_jobs)
+        comparison[name] = {
+            'movies': _interval_dict(intervals.loc['Movie']) if 'Movie' in intervals.index else None,
+            'tv_shows': _interval_dict(intervals.loc['TV Show']) if 'TV Show' in intervals.index else None,
+            'difference': test['difference'],
+            'p_value': test['p_value']
+        }
+    
+    return comparison
+
+
+# Metric name -> (statistic, function computing per-row values)
+RECOMMENDATION_METRICS = {
+    'movie_ratio': ('proportion', lambda df: df['type'] == 'Movie'),
+    'avg_content_lag': ('mean', lambda df: df['content_lag_years']),
+    'mature_share': ('proportion', lambda df: df['rating'].isin(MATURE_RATINGS)),
+    'avg_release_year': ('mean', lambda df: df['release_year'])
+}
+
+
+def segment_metric_intervals(df, dimension=None, metrics=None, n_resamples=2000,
+                             confidence=0.95, seed=None, n_jobs=1):
+    """
+    Bootstrap intervals of recommendation metrics for every segment at once
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    dimension : str, optional
+        Segment dimension such as 'country' or 'genre'; catalog-wide if None
+    metrics : list of str, optional
+        Keys of RECOMMENDATION_METRICS (all by default)
+    n_resamples : int
+        Number of bootstrap resamples
+    confidence : float
+        Confidence level of the intervals
+    seed : int, optional
+        Random seed
+    n_jobs : int
+        Number of worker processes
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Indexed by (metric, segment) with interval columns
+    """
+    metrics = metrics or list(RECOMMENDATION_METRICS)
+    
+    if dimension is None:
+        rows = np.arange(len(df))
+        segments = None
+    else:
+        index = build_segment_index(df, dimension)
+        rows = index['row'].to_numpy()
+        segments = index['value'].astype(object).to_numpy()
+    
+    results = {}
+    for metric in metrics:
+        statistic, values_of = RECOMMENDATION_METRICS[metric]
+        values = values_of(df).to_numpy()[rows]
+        results[metric] = bootstrap_ci(values, segments=segments, statistic=statistic,
+                                       n_resamples=n_resamples, confidence=confidence,
+                                       seed=seed, n_jobs=n_jobs)
+    
+    return pd.concat(results, names=['metric'])
+
+
+if __name__ == "__main__":
+    print("Inference Module")
+    print("Import this module to use bootstrap and permutation statistics")
@@ -0,0 +1,232 @@
+"""
+Pipeline Module
+Cleaning stages as a dependency graph, scheduled for the columns a job needs
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import pandas as pd
+
+from . import data_processing as dp
+
+
+def _stage(name, func, inputs, outputs, message, optional=(), default=True):
+    """
+    Declare a cleaning stage
+    
+    Parameters:
+    -----------
+    name : str
+        Stage name
+    func : callable
+        Function taking and returning a dataframe
+    inputs : tuple of str
+        Columns the stage cannot run without
+    outputs : tuple of str
+        Columns the stage adds or rewrites
+    message : str
+        Progress message printed when the stage starts
+    optional : tuple of str
+        Columns the stage also reads when they are loaded
+    default : bool
+        Whether the stage runs when no target columns are requested
+    """
+    return {'name': name, 'func': func, 'inputs': tuple(inputs), 'optional': tuple(optional),
+            'outputs': tuple(outputs), 'message': message, 'default': default}
+
+
+# Declared in the order load_and_clean_data applied them; stages rewriting
+# the same column keep this relative order
+CLEANING_STAGES = [
+    _stage('convert_dates', dp.convert_date_added, ['date_added'], ['date_added'],
+           "Converting date formats..."),
+    _stage('missing_values', dp.handle_missing_values, [], ['director', 'cast', 'country', 'rating'],
+           "Handling missing values...", optional=['director', 'cast', 'country', 'rating']),
+    _stage('countries', dp.clean_country_column, ['country'], ['country'],
+           "Standardizing country names..."),
+    _stage('duration', dp.extract_duration_info, ['type', 'duration'], ['duration_minutes', 'duration_seasons'],
+           "Extracting duration information..."),
+    _stage('temporal', dp.extract_temporal_features, ['date_added'],
+           ['year_added', 'month_added', 'month_name', 'day_of_week', 'quarter_added'],
+           "Extracting temporal features..."),
+    _stage('content_lag', dp.calculate_content_lag, ['date_added', 'release_year'], ['content_lag_years'],
+           "Calculating content lag..."),
+    _stage('content_age', dp.create_content_age, ['release_year'], ['content_age'],
+           "Creating content age feature..."),
+    _stage('duplicates', dp.find_duplicate_clusters, ['title'], ['title_cluster_id'],
+           "Detecting near-duplicate titles...", optional=['director', 'cast', 'type', 'release_year'],
+           default=False)
+]
+
+
+def _reads(stage):
+    """Columns a stage may read"""
+    return set(stage['inputs']) | set(stage['optional'])
+
+
+def _depends(later, earlier):
+    """Whether `later` must wait for `earlier` (read-after-write, write-after-write or write-after-read)"""
+    writes = set(earlier['outputs'])
+    return bool(writes & (_reads(later) | set(later['outputs'])) or _reads(earlier) & set(later['outputs']))
+
+
+def plan_cleaning(targets=None, available=None, stages=None):
+    """
+    Select and order the stages needed to produce a set of columns
+    
+    A requested column needs every stage that writes it, and each selected
+    stage needs the earlier stages writing its inputs. Stages whose
+    required inputs are neither loaded nor produced are dropped.
+    
+    Parameters:
+    -----------
+    targets : iterable of str, optional
+        Raw or derived columns the job needs; all default stages if None
+    available : iterable of str, optional
+        Columns of the loaded dataframe (defaults to every column)
+    stages : list of dict, optional
+        Stage declarations (defaults to CLEANING_STAGES)
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per stage in execution order with 'inputs', 'outputs',
+        'depends_on' (stage names) and 'level' (stages of the same level
+        can run concurrently)
+    """
+    stages = stages or CLEANING_STAGES
+    
+    if targets is None:
+        selected = [s for s in stages if s['default']]
+    else:
+        targets = set(targets)
+        chosen = [bool(set(s['outputs']) & targets) for s in stages]
+        # Later stages first, so stages pulled in for their inputs are visited afterwards
+        for position in reversed(range(len(stages))):
+            if chosen[position]:
+                for earlier in range(position):
+                    if set(stages[earlier]['outputs']) & _reads(stages[position]):
+                        chosen[earlier] = True
+        selected = [s for s, keep in zip(stages, chosen) if keep]
+    
+    if available is not None:
+        present = set(available)
+        runnable = []
+        for stage in selected:
+            if set(stage['inputs']) <= present and (stage['inputs'] or set(stage['optional']) & present):
+                runnable.append(stage)
+                present |= set(stage['outputs'])
+        selected = runnable
+    
+    records = []
+    levels = {}
+    for position, stage in enumerate(selected):
+        depends_on = [earlier['name'] for earlier in selected[:position] if _depends(stage, earlier)]
+        levels[stage['name']] = max((levels[name] + 1 for name in depends_on), default=0)
+        reads = stage['inputs'] + tuple(c for c in stage['optional'] if available is None or c in available)
+        records.append({'stage': stage['name'], 'inputs': reads, 'outputs': stage['outputs'],
+                        'depends_on': depends_on, 'level': levels[stage['name']], 'spec': stage})
+    return pd.DataFrame(records, columns=['stage', 'inputs', 'outputs', 'depends_on', 'level', 'spec']
+                        ).set_index('stage')
+
+
+def _run_stage(stage, frame):
+    """Run one stage on its input columns; returns (outputs, start, end, thread)"""
+    start = time.perf_counter()
+    result = stage['func'](frame)
+    outputs = {column: result[column] for column in stage['outputs'] if column in result.columns}
+    return outputs, start, time.perf_counter(), threading.current_thread().name
+
+
+def run_plan(df, plan, n_jobs=4, verbose=True):
+    """
+    Execute a cleaning plan, running independent stages concurrently
+    
+    Each stage receives only its input columns and contributes only its
+    declared outputs, so concurrent stages never share a dataframe. The
+    result is the same for any `n_jobs`.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Loaded raw dataframe
+    plan : pd.DataFrame
+        Output of plan_cleaning
+    n_jobs : int
+        Worker threads
+    verbose : bool
+        Print each stage's progress message
+        
+    Returns:
+    --------
+    tuple
+        (cleaned dataframe, timings) where timings has one row per stage
+        with 'start', 'end' and 'seconds' relative to the run start and
+        the 'worker' thread
+    """
+    columns = {column: df[column] for column in df.columns}
+    order = list(df.columns)
+    pending = list(plan.index)
+    done = set()
+    timings = {}
+    origin = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=max(n_jobs, 1)) as executor:
+        running = {}
+        while pending or running:
+            for name in [n for n in pending if set(plan.at[n, 'depends_on']) <= done]:
+                stage = plan.at[name, 'spec']
+                if verbose:
+                    print(stage['message'])
+                frame = pd.DataFrame({c: columns[c] for c in plan.at[name, 'inputs']}, index=df.index)
+                running[executor.submit(_run_stage, stage, frame)] = name
+                pending.remove(name)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                outputs, start, end, worker = future.result()
+                columns.update(outputs)
+                done.add(name)
+                timings[name] = {'start': start - origin, 'end': end - origin,
+                                 'seconds': end - start, 'worker': worker}
+    
+    # New columns in plan order, independent of completion order
+    for name in plan.index:
+        order.extend(c for c in plan.at[name, 'outputs'] if c in columns and c not in order)
+    cleaned = pd.DataFrame({column: columns[column] for column in order}, index=df.index)
+    timings = pd.DataFrame.from_dict(timings, orient='index').reindex(plan.index)
+    return cleaned, timings
+
+
+def describe_plan(plan, timings=None):
+    """
+    Readable summary of a plan and, if given, its timings
+    
+    Parameters:
+    -----------
+    plan : pd.DataFrame
+        Output of plan_cleaning
+    timings : pd.DataFrame, optional
+        Timings returned by run_plan
+        
+    Returns:
+    --------
+    str
+        One line per stage
+    """
+    lines = []
+    for name, stage in plan.iterrows():
+        line = (f"[level {stage['level']}] {name}: {', '.join(stage['inputs']) or '-'} -> "
+                f"{', '.join(stage['outputs'])}")
+        if stage['depends_on']:
+            line += f" (after {', '.join(stage['depends_on'])})"
+        if timings is not None and name in timings.index:
+            line += f" {timings.at[name, 'seconds'] * 1000:.1f} ms"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    print("Pipeline Module")
+    print(describe_plan(plan_cleaning()))
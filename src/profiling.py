@@ -0,0 +1,515 @@
+"""
+Profiling Module
+Streaming, mergeable data-quality profiles of catalog files
+"""
+
+import json
+import numpy as np
+import pandas as pd
+
+from .data_processing import CATALOG_SCHEMA, validate_schema
+
+# Raw columns holding dates, profiled by parsed value and parse failures
+DATE_COLUMNS = ('date_added',)
+
+PROFILE_QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the arcsine scale)
+    
+    Points and centroids are sorted and grouped so that each centroid spans
+    at most one unit of the scale function k(q) = d / (2 pi) asin(2q - 1),
+    which keeps centroids small near the tails and the relative quantile
+    error low there.
+    
+    Parameters:
+    -----------
+    compression : int
+        Scale parameter d; about d centroids are kept
+    """
+    
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+    
+    @property
+    def count(self):
+        """Number of values added"""
+        return float(self.weights.sum())
+    
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k - k.min()).astype(np.int64)
+        buckets = np.unique(buckets, return_inverse=True)[1]
+        merged_weights = np.bincount(buckets, weights=weights)
+        self.means = np.bincount(buckets, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+    
+    def update(self, values, weights=None):
+        """Add an array of values (NaN ignored), optionally with weights"""
+        values = np.asarray(values, dtype=float)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float)
+        finite = np.isfinite(values)
+        values, weights = values[finite], weights[finite]
+        if len(values):
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, weights]))
+        return self
+    
+    def merge(self, other):
+        """A new digest summarizing both digests' values"""
+        merged = TDigest(max(self.compression, other.compression))
+        merged.min, merged.max = min(self.min, other.min), max(self.max, other.max)
+        if len(self.means) or len(other.means):
+            merged._compress(np.concatenate([self.means, other.means]),
+                             np.concatenate([self.weights, other.weights]))
+        return merged
+    
+    def quantile(self, q):
+        """Estimated quantile(s) q in [0, 1]"""
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q) * self.count, positions, values)
+    
+    def to_dict(self):
+        return {'compression': self.compression, 'means': self.means.tolist(),
+                'weights': self.weights.tolist(), 'min': self.min, 'max': self.max}
+    
+    @classmethod
+    def from_dict(cls, state):
+        digest = cls(state['compression'])
+        digest.means = np.asarray(state['means'], dtype=float)
+        digest.weights = np.asarray(state['weights'], dtype=float)
+        digest.min, digest.max = state['min'], state['max']
+        return digest
+
+
+def _bit_length(x):
+    """Exact bit length of uint64 values"""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+def _hash_values(values):
+    """64-bit hashes of values by their text, so typed and raw reads agree"""
+    text = pd.Series(values).astype(str).to_numpy(dtype=object)
+    return pd.util.hash_array(text, categorize=True)
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch
+    
+    Parameters:
+    -----------
+    precision : int
+        log2 of the number of registers; the relative error is about
+        1.04 / sqrt(2 ** precision)
+    """
+    
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def update(self, values):
+        """Add an array of non-missing values"""
+        if not len(values):
+            return self
+        hashes = _hash_values(values)
+        tail_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tails = hashes & np.uint64((1 << tail_bits) - 1)
+        ranks = (tail_bits - _bit_length(tails) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+        return self
+    
+    def merge(self, other):
+        """A new sketch of the union of both sketches' values"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+    
+    def estimate(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+    
+    def to_dict(self):
+        return {'precision': self.precision, 'registers': self.registers.tolist()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['precision'])
+        sketch.registers = np.asarray(state['registers'], dtype=np.uint8)
+        return sketch
+
+
+class TopValues:
+    """
+    Mergeable frequent-value summary
+    
+    Keeps the `capacity` most frequent values; counts dropped when pruning
+    bound the error of the retained counts.
+    """
+    
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.error = 0.0
+    
+    def _prune(self, counts):
+        counts = counts.sort_values(ascending=False, kind='stable')
+        if len(counts) > self.capacity:
+            self.error += float(counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity]
+        self.counts = counts
+    
+    def update(self, counts):
+        """Add a Series of counts indexed by value"""
+        counts = counts.set_axis(counts.index.astype(str)).groupby(level=0).sum().astype(float)
+        self._prune(self.counts.add(counts, fill_value=0))
+        return self
+    
+    def merge(self, other):
+        """A new summary of both summaries"""
+        merged = TopValues(max(self.capacity, other.capacity))
+        merged.error = self.error + other.error
+        merged._prune(self.counts.add(other.counts, fill_value=0))
+        return merged
+    
+    def top(self, n=10):
+        return self.counts.head(n)
+    
+    def to_dict(self):
+        return {'capacity': self.capacity, 'counts': self.counts.to_dict(), 'error': self.error}
+    
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls(state['capacity'])
+        summary.counts = pd.Series(state['counts'], dtype=float)
+        summary.error = state['error']
+        return summary
+
+
+class ColumnProfile:
+    """
+    Profile of one column: counts, parse failures, quantiles, distinct
+    values and frequent values
+    
+    Quantiles are over the value for numeric columns, the day number for
+    date columns and the text length otherwise.
+    """
+    
+    def __init__(self, kind, compression=100, precision=14, capacity=100):
+        self.kind = kind
+        self.rows = 0
+        self.nulls = 0
+        self.failures = 0
+        self.digest = TDigest(compression)
+        self.distinct = HyperLogLog(precision)
+        self.top_values = TopValues(capacity)
+    
+    def update(self, values, failures=0):
+        """Add one chunk of raw column values"""
+        # Every measurement is taken once per distinct value and weighted
+        # by its count
+        codes, uniques = pd.factorize(values)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        uniques = pd.Series(uniques, dtype=values.dtype)
+        self.rows += len(values)
+        self.nulls += int((codes < 0).sum())
+        self.failures += int(failures)
+        
+        if self.kind == 'numeric':
+            measured = pd.to_numeric(uniques, errors='coerce').to_numpy(dtype=float)
+        elif self.kind == 'date':
+            parsed = pd.to_datetime(uniques, errors='coerce')
+            self.failures += int(counts[parsed.isna().to_numpy()].sum())
+            measured = (parsed - pd.Timestamp(0)).dt.days.to_numpy(dtype=float)
+        else:
+            measured = uniques.astype(str).str.len().to_numpy(dtype=float)
+        self.digest.update(measured, counts)
+        self.distinct.update(uniques.to_numpy())
+        self.top_values.update(pd.Series(counts, index=uniques.to_numpy()))
+        return self
+    
+    def merge(self, other):
+        """A new profile covering both partitions"""
+        merged = ColumnProfile(self.kind, self.digest.compression, self.distinct.precision,
+                               self.top_values.capacity)
+        merged.rows = self.rows + other.rows
+        merged.nulls = self.nulls + other.nulls
+        merged.failures = self.failures + other.failures
+        merged.digest = self.digest.merge(other.digest)
+        merged.distinct = self.distinct.merge(other.distinct)
+        merged.top_values = self.top_values.merge(other.top_values)
+        return merged
+    
+    def quantiles(self, qs=PROFILE_QUANTILES):
+        """Estimated quantiles, as dates for date columns"""
+        values = self.digest.quantile(list(qs))
+        if self.kind == 'date':
+            return [pd.Timestamp(0) + pd.Timedelta(days=v) if np.isfinite(v) else pd.NaT for v in values]
+        return list(values)
+    
+    def to_dict(self):
+        return {'kind': self.kind, 'rows': self.rows, 'nulls': self.nulls, 'failures': self.failures,
+                'digest': self.digest.to_dict(), 'distinct': self.distinct.to_dict(),
+                'top_values': self.top_values.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        profile = cls(state['kind'])
+        profile.rows, profile.nulls, profile.failures = state['rows'], state['nulls'], state['failures']
+        profile.digest = TDigest.from_dict(state['digest'])
+        profile.distinct = HyperLogLog.from_dict(state['distinct'])
+        profile.top_values = TopValues.from_dict(state['top_values'])
+        return profile
+
+
+class DataProfile:
+    """
+    Streaming data-quality profile of a catalog
+    
+    Update it chunk by chunk while loading (see data_processing.load_data),
+    merge profiles of separately loaded partitions, save snapshots and
+    compare them with compare_profiles to detect drift.
+    
+    Parameters:
+    -----------
+    schema : dict, optional
+        Column schema whose rules count as parse failures (defaults to
+        CATALOG_SCHEMA)
+    compression : int
+        t-digest compression
+    precision : int
+        HyperLogLog precision
+    capacity : int
+        Frequent values kept per column
+    """
+    
+    def __init__(self, schema=None, compression=100, precision=14, capacity=100):
+        self.schema = schema or CATALOG_SCHEMA
+        self.compression = compression
+        self.precision = precision
+        self.capacity = capacity
+        self.columns = {}
+    
+    def _kind(self, column):
+        if column in DATE_COLUMNS:
+            return 'date'
+        if self.schema.get(column, {}).get('dtype') in ('Int64', 'int64', 'float64'):
+            return 'numeric'
+        return 'text'
+    
+    def update(self, chunk, violations=None):
+        """
+        Add a chunk of raw rows
+        
+        Parameters:
+        -----------
+        chunk : pd.DataFrame
+            Raw rows, before validation
+        violations : dict, optional
+            Schema violations per column already computed for this chunk;
+            computed here when omitted
+            
+        Returns:
+        --------
+        DataProfile
+            The profile itself, for chaining
+        """
+        if violations is None:
+            _, violations = validate_schema(chunk, self.schema)
+        for column in chunk.columns:
+            if column not in self.columns:
+                self.columns[column] = ColumnProfile(self._kind(column), self.compression,
+                                                     self.precision, self.capacity)
+            self.columns[column].update(chunk[column], violations.get(column, 0))
+        return self
+    
+    def merge(self, other):
+        """A new profile covering both profiles' rows"""
+        merged = DataProfile(self.schema, self.compression, self.precision, self.capacity)
+        for column in list(self.columns) + [c for c in other.columns if c not in self.columns]:
+            if column in self.columns and column in other.columns:
+                merged.columns[column] = self.columns[column].merge(other.columns[column])
+            else:
+                merged.columns[column] = self.columns.get(column) or other.columns[column]
+        return merged
+    
+    def summary(self, top_n=5):
+        """
+        One row per column with data-quality and distribution statistics
+        
+        Returns:
+        --------
+        pd.DataFrame
+            'rows', 'null_rate', 'failure_rate', 'distinct_estimate', one
+            column per quantile and 'top_values'
+        """
+        records = {}
+        for column, profile in self.columns.items():
+            record = {
+                'kind': profile.kind,
+                'rows': profile.rows,
+                'null_rate': profile.nulls / profile.rows if profile.rows else np.nan,
+                'failure_rate': profile.failures / profile.rows if profile.rows else np.nan,
+                'distinct_estimate': round(profile.distinct.estimate())
+            }
+            for q, value in zip(PROFILE_QUANTILES, profile.quantiles()):
+                record[f'p{round(q * 100):02d}'] = value
+            record['top_values'] = profile.top_values.top(top_n).astype(int).to_dict()
+            records[column] = record
+        return pd.DataFrame.from_dict(records, orient='index').rename_axis('column')
+    
+    def save(self, path):
+        """Write the profile snapshot as JSON"""
+        state = {'compression': self.compression, 'precision': self.precision,
+                 'capacity': self.capacity,
+                 'columns': {c: p.to_dict() for c, p in self.columns.items()}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+
+def load_profile(path, schema=None):
+    """
+    Read a profile snapshot written by DataProfile.save
+    
+    Parameters:
+    -----------
+    path : str
+        JSON snapshot
+    schema : dict, optional
+        Column schema (defaults to CATALOG_SCHEMA)
+        
+    Returns:
+    --------
+    DataProfile
+        The restored profile
+    """
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    profile = DataProfile(schema, state['compression'], state['precision'], state['capacity'])
+    profile.columns = {c: ColumnProfile.from_dict(s) for c, s in state['columns'].items()}
+    return profile
+
+
+def profile_csv(filepath, chunksize=100_000, columns=None, schema=None, profile=None):
+    """
+    Profile a catalog file chunk by chunk without materializing it
+    
+    Parameters:
+    -----------
+    filepath : str
+        Path to the CSV file
+    chunksize : int
+        Rows per chunk
+    columns : list of str, optional
+        Columns to profile; all if omitted
+    schema : dict, optional
+        Column schema (defaults to CATALOG_SCHEMA)
+    profile : DataProfile, optional
+        Profile to update, e.g. one partition's profile
+        
+    Returns:
+    --------
+    DataProfile
+        The updated profile
+    """
+    profile = profile or DataProfile(schema)
+    for chunk in pd.read_csv(filepath, usecols=columns, dtype=str, chunksize=chunksize):
+        profile.update(chunk)
+    return profile
+
+
+def compare_profiles(baseline, current, null_rate_change=0.05, failure_rate_change=0.01,
+                     distinct_change=0.25, quantile_shift=0.5, top_value_shift=0.2):
+    """
+    Compare two profile snapshots and flag drift
+    
+    Parameters:
+    -----------
+    baseline, current : DataProfile
+        Earlier and later snapshots
+    null_rate_change, failure_rate_change : float
+        Alert on absolute rate changes above these
+    distinct_change : float
+        Alert on relative changes of the distinct count above this
+    quantile_shift : float
+        Alert when the median moves by more than this many baseline
+        interquartile ranges
+    top_value_shift : float
+        Alert when the total variation distance between the frequent-value
+        shares exceeds this
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per (column, metric) with 'baseline', 'current', 'change'
+        and 'alert'
+    """
+    records = []
+    for column in baseline.columns:
+        if column not in current.columns:
+            records.append((column, 'present', 1, 0, -1, True))
+            continue
+        old, new = baseline.columns[column], current.columns[column]
+        
+        for metric, count_attr, threshold in [('null_rate', 'nulls', null_rate_change),
+                                              ('failure_rate', 'failures', failure_rate_change)]:
+            before = getattr(old, count_attr) / max(old.rows, 1)
+            after = getattr(new, count_attr) / max(new.rows, 1)
+            records.append((column, metric, before, after, after - before, abs(after - before) > threshold))
+        
+        before, after = old.distinct.estimate(), new.distinct.estimate()
+        change = after / before - 1 if before else np.inf
+        records.append((column, 'distinct', before, after, change, abs(change) > distinct_change))
+        
+        q25, median, q75 = old.digest.quantile([0.25, 0.5, 0.75])
+        new_median = new.digest.quantile(0.5)
+        spread = q75 - q25 if q75 > q25 else max(abs(median), 1.0)
+        shift = (new_median - median) / spread
+        records.append((column, 'median', median, new_median, shift, bool(abs(shift) > quantile_shift)))
+        
+        old_shares = old.top_values.counts / max(old.rows - old.nulls, 1)
+        new_shares = new.top_values.counts / max(new.rows - new.nulls, 1)
+        distance = old_shares.subtract(new_shares, fill_value=0).abs().sum() / 2
+        records.append((column, 'top_values', np.nan, np.nan, distance, distance > top_value_shift))
+    
+    for column in current.columns:
+        if column not in baseline.columns:
+            records.append((column, 'present', 0, 1, 1, True))
+    
+    return pd.DataFrame(records, columns=['column', 'metric', 'baseline', 'current', 'change', 'alert'])
+
+
+if __name__ == "__main__":
+    print("Profiling Module")
+    print("Import this module to profile catalog files")
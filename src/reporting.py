@@ -0,0 +1,300 @@
+"""
+Reporting Module
+Incremental generation of the business insights report
+"""
+
+import hashlib
+import html
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+from . import analysis
+from . import visualization
+
+
+def _artifact(name, title, func, kind='table', columns=None, params=None):
+    """Describe one report artifact"""
+    return {
+        'name': name,
+        'title': title,
+        'func': func,
+        'kind': kind,
+        'columns': columns or list(getattr(func, 'required_columns', ())),
+        'params': params or {}
+    }
+
+
+# Report sections in document order
+DEFAULT_ARTIFACTS = [
+    _artifact('executive_summary', 'Executive Summary', analysis.create_executive_summary),
+    _artifact('content_distribution', 'Content Type Distribution',
+              visualization.create_content_distribution_plot, kind='chart', columns=['type']),
+    _artifact('top_genres', 'Top Genres', analysis.get_top_genres, params={'n': 10}),
+    _artifact('genre_chart', 'Genre Distribution', visualization.create_genre_distribution_plot,
+              kind='chart', columns=['listed_in'], params={'n': 15}),
+    _artifact('top_countries', 'Top Countries', analysis.get_top_countries, params={'n': 10}),
+    _artifact('country_chart', 'Content Producing Countries', visualization.create_top_countries_plot,
+              kind='chart', columns=['country'], params={'n': 10}),
+    _artifact('movies_vs_tv', 'Movies vs TV Shows', analysis.compare_movies_vs_tv_shows),
+    _artifact('launch_timing', 'Launch Timing', analysis.analyze_optimal_launch_timing),
+    _artifact('month_chart', 'Additions by Month', visualization.create_addition_by_month_plot,
+              kind='chart', columns=['month_name']),
+    _artifact('rating_chart', 'Rating Distribution', visualization.create_rating_distribution_plot,
+              kind='chart', columns=['rating']),
+    _artifact('content_lag_chart', 'Content Lag', visualization.create_content_lag_plot,
+              kind='chart', columns=['content_lag_years']),
+    _artifact('content_gaps', 'Content Gaps', analysis.identify_content_gaps),
+    _artifact('recommendations', 'Recommendations', analysis.generate_business_recommendations)
+]
+
+
+def _stable_repr(value):
+    """repr of code constants that does not depend on the string hash seed"""
+    if isinstance(value, frozenset):
+        return 'frozenset({' + ', '.join(sorted(_stable_repr(v) for v in value)) + '})'
+    if isinstance(value, tuple):
+        return '(' + ', '.join(_stable_repr(v) for v in value) + ',)'
+    if hasattr(value, 'co_code'):
+        return value.co_code.hex() + _stable_repr(value.co_consts)
+    return repr(value)
+
+
+def _function_fingerprint(func):
+    """Identify a function by its qualified name and compiled code"""
+    code = getattr(func, '__code__', None)
+    body = code.co_code + _stable_repr(code.co_consts).encode() if code is not None else b''
+    return f'{func.__module__}.{func.__qualname__}'.encode() + hashlib.sha256(body).digest()
+
+
+@lru_cache(maxsize=None)
+def _package_fingerprint():
+    """
+    Digest of every module source of this package
+    
+    Artifact functions call helpers across modules, so any source change
+    invalidates cached fragments rather than only edits to the artifact
+    function itself.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(f for f in files if f.endswith('.py')):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, package_dir).encode())
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.digest()
+
+
+def fingerprint_artifact(df, artifact):
+    """
+    Fingerprint an artifact's inputs: data slice, function, package sources
+    and parameters
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    artifact : dict
+        Artifact description
+        
+    Returns:
+    --------
+    str
+        Hex digest that changes whenever any input changes
+    """
+    columns = [c for c in artifact['columns'] if c in df.columns]
+    if analysis.TITLE_CLUSTER_COLUMN in df.columns:
+        columns.append(analysis.TITLE_CLUSTER_COLUMN)
+    
+    digest = hashlib.sha256()
+    digest.update(json.dumps(columns).encode())
+    digest.update(np.ascontiguousarray(pd.util.hash_pandas_object(df[columns], index=False).to_numpy()))
+    digest.update(_function_fingerprint(artifact['func']))
+    digest.update(_package_fingerprint())
+    digest.update(json.dumps(artifact['params'], sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _format_value(value):
+    """Readable text for a scalar result value"""
+    if isinstance(value, (float, np.floating)):
+        return f'{value:,.2f}'
+    if isinstance(value, (int, np.integer)):
+        return f'{value:,}'
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def _markdown_table(frame):
+    """Render a dataframe as a GitHub-flavoured markdown table"""
+    header = '| ' + ' | '.join(str(c) for c in frame.columns) + ' |'
+    rule = '|' + '|'.join('---' for _ in frame.columns) + '|'
+    rows = ['| ' + ' | '.join(_format_value(v) for v in row) + ' |' for row in frame.itertuples(index=False)]
+    return '\n'.join([header, rule] + rows)
+
+
+def _as_frame(result):
+    """Tabular view of a Series, DataFrame or list of records, else None"""
+    if isinstance(result, pd.DataFrame):
+        return result.reset_index() if result.index.name or result.index.names[0] else result
+    if isinstance(result, pd.Series):
+        return result.rename_axis(result.index.name or 'item').reset_index(name=result.name or 'value')
+    if isinstance(result, list) and result and all(isinstance(r, dict) for r in result):
+        return pd.DataFrame(result)
+    return None
+
+
+def _render_mapping(result, depth=0):
+    """Render nested dicts as markdown bullets and HTML lists"""
+    markdown, markup = [], ['<ul>']
+    for key, value in result.items():
+        indent = '  ' * depth
+        if isinstance(value, dict):
+            nested_md, nested_html = _render_mapping(value, depth + 1)
+            markdown.append(f'{indent}- **{key}**')
+            markdown.append(nested_md)
+            markup.append(f'<li><strong>{html.escape(str(key))}</strong>{nested_html}</li>')
+        else:
+            markdown.append(f'{indent}- **{key}**: {_format_value(value)}')
+            markup.append(f'<li><strong>{html.escape(str(key))}</strong>: '
+                          f'{html.escape(_format_value(value))}</li>')
+    markup.append('</ul>')
+    return '\n'.join(markdown), ''.join(markup)
+
+
+def render_result(result):
+    """
+    Render an analysis result as markdown and HTML fragments
+    
+    Parameters:
+    -----------
+    result : object
+        Return value of an analysis function
+        
+    Returns:
+    --------
+    tuple of str
+        (markdown, html)
+    """
+    frame = _as_frame(result)
+    if frame is not None:
+        return _markdown_table(frame), frame.to_html(index=False, border=0)
+    if isinstance(result, dict):
+        return _render_mapping(result)
+    return _format_value(result), f'<p>{html.escape(_format_value(result))}</p>'
+
+
+def _build_artifact(df, artifact, figure_dir, results):
+    """Run one artifact (or take its precomputed result) and return its rendered fragments"""
+    if artifact['kind'] == 'chart':
+        import matplotlib.pyplot as plt
+        filename = f"{artifact['name']}.png"
+        artifact['func'](df, save_path=os.path.join(figure_dir, filename), **artifact['params'])
+        plt.close('all')
+        relative = f'figures/{filename}'
+        return (f"![{artifact['title']}]({relative})",
+                f'<img src="{relative}" alt="{html.escape(artifact["title"])}">')
+    if artifact['name'] in results:
+        return render_result(results[artifact['name']])
+    return render_result(artifact['func'](df, **artifact['params']))
+
+
+def build_report(df, output_dir, artifacts=None, formats=('markdown', 'html'),
+                 title='Business Insights Report', cache_dir=None, results=None):
+    """
+    Build the insights report, re-rendering only artifacts whose inputs changed
+    
+    Each artifact is fingerprinted from the columns it reads, its function,
+    the package sources and its parameters. Fragments and figures from earlier builds are kept
+    in `output_dir` together with a manifest, and reused when the
+    fingerprint is unchanged.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    output_dir : str
+        Directory for the report, its figures and the build cache
+    artifacts : list of dict, optional
+        Artifact descriptions (defaults to DEFAULT_ARTIFACTS)
+    formats : tuple of str
+        'markdown' and/or 'html'
+    title : str
+        Report title
+    cache_dir : str, optional
+        Build cache directory (defaults to `output_dir`/.report_cache)
+    results : dict, optional
+        Already computed table results by artifact name, rendered instead
+        of calling the artifact function
+        
+    Returns:
+    --------
+    dict
+        'rebuilt' and 'reused' artifact names and the written 'files'
+    """
+    artifacts = artifacts or DEFAULT_ARTIFACTS
+    figure_dir = os.path.join(output_dir, 'figures')
+    cache_dir = cache_dir or os.path.join(output_dir, '.report_cache')
+    os.makedirs(figure_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    
+    fragments, rebuilt, reused = [], [], []
+    for artifact in artifacts:
+        fingerprint = fingerprint_artifact(df, artifact)
+        fragment_path = os.path.join(cache_dir, f"{artifact['name']}.json")
+        cached = manifest.get(artifact['name'])
+        
+        figure_missing = (artifact['kind'] == 'chart'
+                          and not os.path.exists(os.path.join(figure_dir, f"{artifact['name']}.png")))
+        if cached == fingerprint and os.path.exists(fragment_path) and not figure_missing:
+            with open(fragment_path, encoding='utf-8') as f:
+                fragment = json.load(f)
+            reused.append(artifact['name'])
+        else:
+            markdown, markup = _build_artifact(df, artifact, figure_dir, results or {})
+            fragment = {'markdown': markdown, 'html': markup}
+            with open(fragment_path, 'w', encoding='utf-8') as f:
+                json.dump(fragment, f)
+            manifest[artifact['name']] = fingerprint
+            rebuilt.append(artifact['name'])
+        fragments.append((artifact['title'], fragment))
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    files = []
+    if 'markdown' in formats:
+        path = os.path.join(output_dir, 'business_insights.md')
+        body = '\n\n'.join(f'## {heading}\n\n{fragment["markdown"]}' for heading, fragment in fragments)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'# {title}\n\n{body}\n')
+        files.append(path)
+    if 'html' in formats:
+        path = os.path.join(output_dir, 'business_insights.html')
+        body = '\n'.join(f'<h2>{html.escape(heading)}</h2>\n{fragment["html"]}' for heading, fragment in fragments)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+                    f'<title>{html.escape(title)}</title>\n</head>\n<body>\n'
+                    f'<h1>{html.escape(title)}</h1>\n{body}\n</body>\n</html>\n')
+        files.append(path)
+    
+    print(f"Report built: {len(rebuilt)} artifacts rendered, {len(reused)} reused from cache")
+    
+    return {'rebuilt': rebuilt, 'reused': reused, 'files': files}
+
+
+if __name__ == "__main__":
+    print("Reporting Module")
+    print("Import this module to build reports")
@@ -0,0 +1,267 @@
+"""
+Rules Module
+Declarative recommendation rules evaluated for every segment at once
+"""
+
+import operator
+import numpy as np
+import pandas as pd
+
+from .data_processing import build_segment_index
+from .inference import RECOMMENDATION_METRICS, segment_metric_intervals
+
+# Metrics taken as the most frequent value of a column
+MODE_METRICS = {
+    'best_month': 'month_name',
+    'best_day': 'day_of_week',
+    'best_quarter': 'quarter_added'
+}
+
+_OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+# Each rule names a metric, a comparison against a threshold (no operator
+# means the rule always fires), a priority and message templates. Templates
+# are formatted with the segment's metrics plus 'value' (the rule's metric)
+# and 'segment'. Rules with a 'dimension' are evaluated over that
+# dimension's segments (optionally restricted to 'segments'); with
+# 'combine': 'any' they yield one catalog-level recommendation when any
+# segment matches. 'interval' rules use bootstrap bounds when a confidence
+# level is requested.
+RECOMMENDATION_RULES = [
+    {
+        'name': 'content_balance',
+        'category': 'Content Balance',
+        'metric': 'movie_ratio', 'operator': '>', 'threshold': 0.7,
+        'priority': 'High',
+        'finding': 'Movies comprise {value:.1%} of catalog',
+        'recommendation': 'Increase TV show production to improve subscriber retention',
+        'interval': {'scale': 100, 'unit': '%'}
+    },
+    {
+        'name': 'asian_markets',
+        'category': 'Geographic Expansion',
+        'metric': 'title_rank', 'operator': '<=', 'threshold': 3,
+        'dimension': 'country', 'segments': ['India', 'South Korea'], 'combine': 'any',
+        'priority': 'Very High',
+        'finding': 'Strong presence in high-growth Asian markets',
+        'recommendation': 'Triple investment in Indian and Korean content'
+    },
+    {
+        'name': 'launch_timing',
+        'category': 'Launch Strategy',
+        'metric': 'best_month',
+        'priority': 'Medium',
+        'finding': 'Peak additions in {best_month} on {best_day}',
+        'recommendation': 'Schedule major releases for {best_day}s in {best_month}'
+    },
+    {
+        'name': 'content_freshness',
+        'category': 'Content Freshness',
+        'metric': 'avg_content_lag', 'operator': '>', 'threshold': 3,
+        'priority': 'High',
+        'finding': 'Average content lag is {value:.1f} years',
+        'recommendation': 'Increase original content production to reduce dependency on catalog acquisitions',
+        'interval': {'scale': 1, 'unit': ' years'}
+    },
+    {
+        'name': 'audience_diversification',
+        'category': 'Audience Diversification',
+        'metric': 'mature_share', 'operator': '>', 'threshold': 0.75,
+        'priority': 'Medium',
+        'finding': '{value:.1%} of content targets mature audiences',
+        'recommendation': 'Expand family-friendly content to capture broader demographic',
+        'interval': {'scale': 100, 'unit': '%'}
+    }
+]
+
+
+def compute_segment_metrics(df, dimension=None):
+    """
+    Compute every rule metric for all segments of a dimension in one pass
+    
+    Rows are mapped to segment codes once; means and proportions are
+    weighted bincounts over the codes and modes are argmaxes of a
+    (segments x values) count matrix.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    dimension : str, optional
+        Segment dimension ('country', 'genre', 'type', ...); the whole
+        catalog as segment 'all' if None
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per segment with 'titles', 'title_share', 'title_rank',
+        the RECOMMENDATION_METRICS and the MODE_METRICS
+    """
+    if dimension is None:
+        rows = np.arange(len(df))
+        codes = np.zeros(len(df), dtype=np.int64)
+        labels = pd.Index(['all'])
+    else:
+        index = build_segment_index(df, dimension)
+        rows = index['row'].to_numpy()
+        codes = index['value'].cat.codes.to_numpy().astype(np.int64)
+        labels = pd.Index(index['value'].cat.categories)
+    n_segments = len(labels)
+    
+    titles = np.bincount(codes, minlength=n_segments)
+    # Ties rank in category order, like a stable sort of the counts
+    order = np.argsort(-titles, kind='stable')
+    rank = np.empty(n_segments, dtype=np.int64)
+    rank[order] = np.arange(1, n_segments + 1)
+    metrics = {'titles': titles, 'title_share': titles / max(len(df), 1), 'title_rank': rank}
+    
+    for metric, (_, values_of) in RECOMMENDATION_METRICS.items():
+        try:
+            values = np.asarray(values_of(df), dtype=float)[rows]
+        except KeyError:
+            continue
+        valid = ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=n_segments)
+        counts = np.bincount(codes[valid], minlength=n_segments)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics[metric] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    
+    for metric, column in MODE_METRICS.items():
+        if column not in df.columns:
+            continue
+        value_codes, uniques = pd.factorize(df[column].to_numpy()[rows])
+        valid = value_codes >= 0
+        k = max(len(uniques), 1)
+        counts = np.bincount(codes[valid] * k + value_codes[valid],
+                             minlength=n_segments * k).reshape(n_segments, k)
+        best = np.asarray(uniques, dtype=object)[counts.argmax(axis=1)] if len(uniques) else \
+            np.full(n_segments, None, dtype=object)
+        metrics[metric] = np.where(counts.sum(axis=1) > 0, best, None)
+    
+    return pd.DataFrame(metrics, index=labels.rename('segment'))
+
+
+def _applies(rule, level, dimensions, include_catalog):
+    """Whether a rule is evaluated at a level (None for the whole catalog)"""
+    if rule.get('dimension') is not None:
+        return level == rule['dimension'] and (rule.get('combine') != 'any' or include_catalog)
+    return level is None or level in dimensions
+
+
+def _fires(rule, values, bounds):
+    """Boolean mask of segments where the rule's condition holds"""
+    if rule.get('operator') is None:
+        return pd.notna(values).to_numpy()
+    compare = _OPERATORS[rule['operator']]
+    if bounds is not None:
+        # Require the whole confidence interval to clear the threshold
+        values = bounds['lower'] if rule['operator'] in ('>', '>=') else bounds['upper']
+    return compare(values.astype(float), rule['threshold']).fillna(False).to_numpy()
+
+
+def evaluate_rules(df, rules=None, dimensions=('country', 'genre', 'type'), include_catalog=True,
+                   min_titles=30, confidence=None, n_resamples=2000, seed=None):
+    """
+    Evaluate declarative recommendation rules for the catalog and every segment
+    
+    Metrics are computed once per dimension for all its segments, so the
+    cost barely grows with the number of markets.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe with one row per title
+    rules : list of dict, optional
+        Rules (defaults to RECOMMENDATION_RULES)
+    dimensions : tuple of str
+        Segment dimensions to evaluate the rules for
+    include_catalog : bool
+        Also evaluate the rules catalog-wide
+    min_titles : int
+        Segments with fewer titles are skipped
+    confidence : float, optional
+        If given, 'interval' rules fire only when the bootstrap confidence
+        interval clears the threshold
+    n_resamples : int
+        Bootstrap resamples when `confidence` is set
+    seed : int, optional
+        Random seed for the bootstrap
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per fired rule and segment with 'dimension', 'segment',
+        'rule', 'category', 'finding', 'recommendation', 'priority',
+        'value' and 'confidence_interval'
+    """
+    rules = rules or RECOMMENDATION_RULES
+    levels = ([None] if include_catalog else []) + list(dimensions)
+    levels += [r['dimension'] for r in rules if r.get('dimension') and r['dimension'] not in levels]
+    
+    records = []
+    for position, level in enumerate(levels):
+        applicable = [r for r in rules if _applies(r, level, dimensions, include_catalog)]
+        if not applicable:
+            continue
+        table = compute_segment_metrics(df, level)
+        
+        intervals = None
+        interval_metrics = list(dict.fromkeys(r['metric'] for r in applicable if r.get('interval')))
+        if confidence is not None and interval_metrics:
+            intervals = segment_metric_intervals(df, dimension=level, metrics=interval_metrics,
+                                                 n_resamples=n_resamples, confidence=confidence,
+                                                 seed=seed)
+        
+        for rule in applicable:
+            candidates = table
+            if rule.get('segments') is not None:
+                candidates = table[table.index.isin(rule['segments'])]
+            if level is not None and rule.get('combine') != 'any':
+                candidates = candidates[candidates['titles'] >= min_titles]
+            if rule['metric'] not in candidates.columns or candidates.empty:
+                continue
+            
+            bounds = None
+            if rule.get('interval') and intervals is not None:
+                bounds = intervals.xs(rule['metric'], level='metric').reindex(candidates.index)
+            fired = candidates[_fires(rule, candidates[rule['metric']], bounds)]
+            if rule.get('combine') == 'any':
+                fired = fired.head(1).rename(index=lambda _: 'all')
+                level_name = None
+            else:
+                level_name = level
+            
+            for segment, metrics in fired.iterrows():
+                context = dict(metrics, value=metrics[rule['metric']], segment=segment)
+                finding = rule['finding'].format(**context)
+                if level_name is not None:
+                    finding = rule.get('segment_finding', '{segment}: ' + rule['finding']).format(**context)
+                interval = None
+                if bounds is not None:
+                    lower, upper = bounds.loc[segment, ['lower', 'upper']]
+                    scale, unit = rule['interval'].get('scale', 1), rule['interval'].get('unit', '')
+                    finding += (f" ({confidence*100:.0f}% CI {lower*scale:.1f}{unit}"
+                                f" to {upper*scale:.1f}{unit})")
+                    interval = (float(lower), float(upper))
+                records.append({
+                    'order': (0 if level_name is None else position + 1, rules.index(rule)),
+                    'dimension': level_name or 'all',
+                    'segment': segment,
+                    'rule': rule['name'],
+                    'category': rule['category'],
+                    'finding': finding,
+                    'recommendation': rule['recommendation'].format(**context),
+                    'priority': rule['priority'],
+                    'value': context['value'],
+                    'confidence_interval': interval
+                })
+    
+    # Catalog-level findings first, each level in rule order
+    records.sort(key=lambda record: record.pop('order'))
+    return pd.DataFrame(records, columns=['dimension', 'segment', 'rule', 'category', 'finding',
+                                          'recommendation', 'priority', 'value', 'confidence_interval'])
+
+
+if __name__ == "__main__":
+    print("Rules Module")
+    print("Import this module to evaluate recommendation rules")
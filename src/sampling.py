@@ -0,0 +1,474 @@
+"""
+Sampling Module
+Approximate analysis on persisted, progressively refined catalog samples
+"""
+
+import pickle
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+from .analysis import unique_titles
+from .data_processing import build_country_index, build_segment_index
+
+# Dimensions whose 'Not Available' placeholder is not a real value
+_PLACEHOLDER_DIMENSIONS = ('director', 'cast')
+
+
+def _catalog_fingerprint(df):
+    """Cheap identity check that a sample belongs to a catalog"""
+    key = df['title'] if 'title' in df.columns else df.index.to_series()
+    return int(pd.util.hash_pandas_object(key, index=False).sum()), len(df)
+
+
+def _stratum_codes(df, strata):
+    """
+    Stratum of every row from 'type' and/or primary 'country'
+    
+    Returns:
+    --------
+    tuple
+        (codes array, pd.Index of stratum labels)
+    """
+    if not strata:
+        return np.zeros(len(df), dtype=np.int64), pd.Index(['all'], name='stratum')
+    
+    keys = []
+    for stratum in strata:
+        if stratum == 'country':
+            index = build_country_index(df).drop_duplicates('row')
+            primary = pd.Series('Unknown', index=np.arange(len(df)), dtype=object)
+            primary.iloc[index['row'].to_numpy()] = index['country'].astype(object).to_numpy()
+            keys.append(primary.to_numpy())
+        else:
+            keys.append(df[stratum].fillna('Unknown').to_numpy())
+    labels = pd.MultiIndex.from_arrays(keys, names=list(strata)) if len(keys) > 1 else pd.Index(keys[0])
+    codes, uniques = pd.factorize(labels, sort=True)
+    return codes, uniques
+
+
+def _count_stat(df, rows, strata_codes, dimension):
+    """Sample counts per (value, stratum) for a segment dimension"""
+    frame = df.iloc[rows]
+    index = build_segment_index(frame, dimension)
+    return pd.DataFrame({
+        'value': index['value'].astype(object).to_numpy(),
+        'stratum': strata_codes[rows[index['row'].to_numpy()]],
+        'n': 1
+    })
+
+
+def _lag_stat(df, rows, strata_codes):
+    """Sample count, sum and sum of squares of content lag per (year added, stratum)"""
+    frame = df.iloc[rows][['year_added', 'content_lag_years']]
+    valid = frame.notna().all(axis=1).to_numpy()
+    lag = frame['content_lag_years'].to_numpy()[valid]
+    return pd.DataFrame({
+        'value': frame['year_added'].to_numpy()[valid],
+        'stratum': strata_codes[rows[valid]],
+        'n': 1,
+        'sum': lag,
+        'sumsq': lag ** 2
+    })
+
+
+def _pair_stat(df, rows, strata_codes, columns):
+    """Sample counts per (value pair, stratum) of two single-valued columns"""
+    frame = df.iloc[rows][list(columns)]
+    valid = frame.notna().all(axis=1).to_numpy()
+    return pd.DataFrame({
+        'value': list(zip(*(frame[c].to_numpy()[valid] for c in columns))),
+        'stratum': strata_codes[rows[valid]],
+        'n': 1
+    })
+
+
+class CatalogSample:
+    """
+    A reusable, progressively refinable probability sample of a catalog
+    
+    Every title draws one uniform random key from `seed`; a title is in
+    the sample at fraction f when its key falls below its stratum's
+    inclusion rate. Samples at increasing fractions are therefore nested,
+    and `refine` only processes the newly included titles: the sufficient
+    statistics (per-stratum counts and sums) of earlier rows are kept and
+    topped up. Estimates are Horvitz-Thompson totals and ratios with
+    normal-approximation confidence intervals.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    fraction : float
+        Initial sampling fraction
+    strata : tuple of str, optional
+        Stratify by 'type' and/or 'country' (primary country); uniform if None
+    min_per_stratum : int
+        Small strata are sampled at a higher rate so they keep at least this
+        many titles in expectation
+    confidence : float
+        Coverage of the confidence intervals
+    seed : int
+        Seed of the sampling keys
+    """
+    
+    def __init__(self, df, fraction=0.05, strata=None, min_per_stratum=30, confidence=0.95, seed=0):
+        self.df = unique_titles(df)
+        self.strata = tuple(strata or ())
+        self.min_per_stratum = min_per_stratum
+        self.confidence = confidence
+        self.seed = seed
+        self.fingerprint = _catalog_fingerprint(self.df)
+        self._strata_codes, self.stratum_labels = _stratum_codes(self.df, self.strata)
+        self._stratum_sizes = np.bincount(self._strata_codes, minlength=len(self.stratum_labels))
+        self._keys = np.random.default_rng(seed).random(len(self.df))
+        self.fraction = 0.0
+        self.rows = np.zeros(0, dtype=np.int64)
+        self._stats = {}
+        self.refine(fraction)
+    
+    def rates(self, fraction=None):
+        """Inclusion probability of each stratum at a sampling fraction"""
+        fraction = self.fraction if fraction is None else fraction
+        boosted = self.min_per_stratum / np.maximum(self._stratum_sizes, 1)
+        return np.minimum(1.0, np.maximum(fraction, boosted))
+    
+    def refine(self, fraction):
+        """
+        Grow the sample to a larger fraction, processing only the new titles
+        
+        Parameters:
+        -----------
+        fraction : float
+            New sampling fraction (ignored if not larger than the current one)
+            
+        Returns:
+        --------
+        CatalogSample
+            The sample itself, for chaining
+        """
+        if fraction <= self.fraction and len(self.rows):
+            return self
+        old_rates = self.rates()[self._strata_codes] if len(self.rows) else np.zeros(len(self.df))
+        new_rates = self.rates(fraction)[self._strata_codes]
+        new_rows = np.flatnonzero((self._keys < new_rates) & (self._keys >= old_rates))
+        
+        for name, compute in self._stat_builders().items():
+            if name in self._stats:
+                self._stats[name] = self._accumulate(self._stats[name], compute(new_rows))
+        
+        self.rows = np.union1d(self.rows, new_rows)
+        self.fraction = fraction
+        return self
+    
+    def _stat_builders(self):
+        """Functions computing each sufficient statistic over given rows"""
+        df, codes = self.df, self._strata_codes
+        builders = {
+            'lag': lambda rows: _lag_stat(df, rows, codes),
+            'year_type': lambda rows: _pair_stat(df, rows, codes, ('year_added', 'type'))
+        }
+        for dimension in ('genre', 'country', 'director', 'cast', 'rating', 'type',
+                          'release_year', 'year_added'):
+            builders[dimension] = lambda rows, d=dimension: _count_stat(df, rows, codes, d)
+        return builders
+    
+    @staticmethod
+    def _accumulate(stats, new):
+        """Add new per-(value, stratum) sums to existing ones"""
+        new = new.groupby(['value', 'stratum']).sum()
+        if stats is None:
+            return new
+        return stats.add(new, fill_value=0)
+    
+    def _stat(self, name):
+        """A sufficient statistic over the current sample, computed on first use"""
+        if name not in self._stats:
+            self._stats[name] = self._accumulate(None, self._stat_builders()[name](self.rows))
+        return self._stats[name]
+    
+    def _weights(self, stats):
+        """Inverse inclusion probability and (1 - p) / p^2 of each stats row"""
+        rates = self.rates()[stats.index.get_level_values('stratum')]
+        return 1 / rates, (1 - rates) / rates ** 2
+    
+    def _interval(self, estimate, variance, n, floor=None):
+        """Assemble an estimate table with normal-approximation intervals"""
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        std_error = np.sqrt(np.maximum(variance, 0))
+        lower = estimate - z * std_error
+        if floor is not None:
+            lower = np.maximum(lower, floor)
+        return pd.DataFrame({
+            'estimate': estimate,
+            'lower': lower,
+            'upper': estimate + z * std_error,
+            'std_error': std_error,
+            'n': n
+        })
+    
+    def estimate_counts(self, dimension):
+        """
+        Estimated number of titles per value of a segment dimension
+        
+        Parameters:
+        -----------
+        dimension : str
+            Segment dimension, e.g. 'genre', 'country', 'rating'
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Indexed by value with 'estimate', 'lower', 'upper', 'std_error'
+            and 'n' (sampled titles), sorted by estimate
+        """
+        stats = self._stat(dimension)
+        if dimension in _PLACEHOLDER_DIMENSIONS:
+            stats = stats[stats.index.get_level_values('value') != 'Not Available']
+        weight, variance_weight = self._weights(stats)
+        totals = pd.DataFrame({
+            'estimate': weight * stats['n'].to_numpy(),
+            'variance': variance_weight * stats['n'].to_numpy(),
+            'n': stats['n'].to_numpy()
+        }, index=stats.index.get_level_values('value')).groupby(level=0).sum()
+        result = self._interval(totals['estimate'], totals['variance'], totals['n'].astype(int),
+                                floor=totals['n'])
+        result.index.name = dimension
+        return result.sort_values('estimate', ascending=False, kind='stable')
+    
+    def get_top_genres(self, n=10):
+        """Sampled counterpart of analysis.get_top_genres"""
+        return self.estimate_counts('genre').head(n)
+    
+    def get_top_countries(self, n=10):
+        """Sampled counterpart of analysis.get_top_countries"""
+        return self.estimate_counts('country').head(n)
+    
+    def get_top_directors(self, n=10):
+        """Sampled counterpart of analysis.get_top_directors"""
+        return self.estimate_counts('director').head(n)
+    
+    def get_top_actors(self, n=10):
+        """Sampled counterpart of analysis.get_top_actors"""
+        return self.estimate_counts('cast').head(n)
+    
+    def analyze_content_by_year(self):
+        """
+        Sampled counterpart of analysis.analyze_content_by_year
+        
+        Returns:
+        --------
+        dict
+            The same keys as the exact analysis, each an estimate table;
+            'content_type_by_year' is indexed by (year_added, type)
+        """
+        lag = self._stat('lag')
+        weight, variance_weight = self._weights(lag)
+        parts = pd.DataFrame({
+            'n': lag['n'].to_numpy(),
+            'weighted_n': weight * lag['n'].to_numpy(),
+            'weighted_sum': weight * lag['sum'].to_numpy(),
+            'variance_weight': variance_weight,
+            'sum': lag['sum'].to_numpy(),
+            'sumsq': lag['sumsq'].to_numpy()
+        }, index=lag.index.get_level_values('value'))
+        totals = parts.groupby(level=0)[['n', 'weighted_n', 'weighted_sum']].sum()
+        ratio = totals['weighted_sum'] / totals['weighted_n']
+        
+        # Linearized variance of a ratio estimator
+        r = ratio.reindex(parts.index).to_numpy()
+        residual = parts['sumsq'] - 2 * r * parts['sum'] + r ** 2 * parts['n']
+        variance = (parts['variance_weight'] * residual).groupby(level=0).sum() / totals['weighted_n'] ** 2
+        avg_lag = self._interval(ratio, variance, totals['n'].astype(int))
+        avg_lag.index.name = 'year_added'
+        
+        type_by_year = self.estimate_counts('year_type')
+        type_by_year.index = pd.MultiIndex.from_tuples(type_by_year.index, names=['year_added', 'type'])
+        
+        return {
+            'releases_by_year': self.estimate_counts('release_year').sort_index(),
+            'additions_by_year': self.estimate_counts('year_added').sort_index(),
+            'avg_content_lag': avg_lag,
+            'content_type_by_year': type_by_year.sort_index()
+        }
+    
+    def _estimate_distinct(self, dimension):
+        """Distinct values of a dimension, via Chao1 unless the sample is complete"""
+        frequencies = self._stat(dimension)['n'].groupby(level='value').sum()
+        observed = len(frequencies)
+        if (self.rates() >= 1).all():
+            return observed, 0.0, observed
+        f1 = int((frequencies == 1).sum())
+        f2 = int((frequencies == 2).sum())
+        estimate = observed + f1 * (f1 - 1) / (2 * (f2 + 1))
+        if f2:
+            ratio = f1 / f2
+            variance = f2 * (ratio ** 2 / 2 + ratio ** 3 + ratio ** 4 / 4)
+        else:
+            variance = f1 * (f1 - 1) / 2 + f1 * (2 * f1 - 1) ** 2 / 4 - f1 ** 4 / (4 * estimate)
+        return estimate, variance, observed
+    
+    def calculate_diversity_metrics(self):
+        """
+        Sampled counterpart of analysis.calculate_diversity_metrics
+        
+        Distinct counts use the Chao1 richness estimator, which is a lower
+        bound for heavily undersampled dimensions; the movie/TV ratio is a
+        ratio of Horvitz-Thompson totals.
+        
+        Returns:
+        --------
+        pd.DataFrame
+            Indexed by metric with 'estimate', 'lower', 'upper', 'std_error'
+            and 'n'
+        """
+        rows = {}
+        for metric, dimension in [('unique_countries', 'country'), ('unique_directors', 'director'),
+                                  ('unique_actors', 'cast'), ('unique_genres', 'genre'),
+                                  ('unique_ratings', 'rating')]:
+            estimate, variance, observed = self._estimate_distinct(dimension)
+            rows[metric] = (estimate, variance, observed)
+        
+        types = self._stat('type')
+        weight, variance_weight = self._weights(types)
+        values = types.index.get_level_values('value')
+        movies = values == 'Movie'
+        shows = values == 'TV Show'
+        movie_total = (weight * types['n'].to_numpy())[movies].sum()
+        show_total = (weight * types['n'].to_numpy())[shows].sum()
+        ratio = movie_total / show_total if show_total else np.nan
+        variance = (((variance_weight * types['n'].to_numpy())[movies].sum()
+                     + ratio ** 2 * (variance_weight * types['n'].to_numpy())[shows].sum())
+                    / show_total ** 2) if show_total else np.nan
+        rows['movie_tv_ratio'] = (ratio, variance, int(types['n'].to_numpy()[movies | shows].sum()))
+        
+        estimates = pd.DataFrame(rows, index=['estimate', 'variance', 'n']).T
+        result = self._interval(estimates['estimate'].astype(float), estimates['variance'].astype(float),
+                                estimates['n'].astype(int))
+        distinct = result.index != 'movie_tv_ratio'
+        result.loc[distinct, 'lower'] = np.maximum(result.loc[distinct, 'lower'], result.loc[distinct, 'n'])
+        result.index.name = 'metric'
+        return result
+    
+    def progressive(self, method, fractions=(0.01, 0.05, 0.2, 1.0), **kwargs):
+        """
+        Yield increasingly precise estimates as the sample grows
+        
+        Parameters:
+        -----------
+        method : str
+            Name of an estimate method, e.g. 'get_top_genres'
+        fractions : tuple of float
+            Increasing sampling fractions to refine through
+        **kwargs
+            Passed to the estimate method
+            
+        Yields:
+        -------
+        tuple
+            (fraction, estimate)
+        """
+        for fraction in fractions:
+            if fraction < self.fraction:
+                continue
+            self.refine(fraction)
+            yield self.fraction, getattr(self, method)(**kwargs)
+    
+    def frame(self):
+        """The sampled rows, with their sampling weight in a 'sample_weight' column"""
+        frame = self.df.iloc[self.rows].copy()
+        frame['sample_weight'] = 1 / self.rates()[self._strata_codes[self.rows]]
+        return frame
+    
+    def save(self, path):
+        """
+        Persist the sample and its accumulated statistics
+        
+        Parameters:
+        -----------
+        path : str
+            Destination file
+        """
+        state = {
+            'fingerprint': self.fingerprint,
+            'fraction': self.fraction,
+            'strata': self.strata,
+            'min_per_stratum': self.min_per_stratum,
+            'confidence': self.confidence,
+            'seed': self.seed,
+            'rows': self.rows,
+            'stats': self._stats
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(state, f)
+
+
+def load_sample(path, df):
+    """
+    Reload a persisted sample for the catalog it was drawn from
+    
+    Parameters:
+    -----------
+    path : str
+        File written by CatalogSample.save
+    df : pd.DataFrame
+        The cleaned catalog the sample was drawn from
+        
+    Returns:
+    --------
+    CatalogSample
+        The sample, with its statistics restored rather than recomputed
+    """
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    
+    sample = CatalogSample.__new__(CatalogSample)
+    sample.df = unique_titles(df)
+    sample.fingerprint = _catalog_fingerprint(sample.df)
+    if sample.fingerprint != state['fingerprint']:
+        raise ValueError("The sample was drawn from a different catalog")
+    
+    sample.strata = state['strata']
+    sample.min_per_stratum = state['min_per_stratum']
+    sample.confidence = state['confidence']
+    sample.seed = state['seed']
+    sample._strata_codes, sample.stratum_labels = _stratum_codes(sample.df, sample.strata)
+    sample._stratum_sizes = np.bincount(sample._strata_codes, minlength=len(sample.stratum_labels))
+    sample._keys = np.random.default_rng(sample.seed).random(len(sample.df))
+    sample.fraction = state['fraction']
+    sample.rows = state['rows']
+    sample._stats = state['stats']
+    return sample
+
+
+def draw_sample(df, fraction=0.05, strata=None, min_per_stratum=30, confidence=0.95, seed=0):
+    """
+    Draw a uniform or stratified sample for approximate analysis
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    fraction : float
+        Sampling fraction
+    strata : tuple of str, optional
+        Stratify by 'type' and/or 'country'
+    min_per_stratum : int
+        Expected minimum titles per stratum
+    confidence : float
+        Coverage of the confidence intervals
+    seed : int
+        Seed of the sampling keys
+        
+    Returns:
+    --------
+    CatalogSample
+        See CatalogSample
+    """
+    return CatalogSample(df, fraction=fraction, strata=strata, min_per_stratum=min_per_stratum,
+                         confidence=confidence, seed=seed)
+
+
+if __name__ == "__main__":
+    print("Sampling Module")
+    print("Import this module to run approximate analyses on samples")
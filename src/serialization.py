@@ -0,0 +1,600 @@
+"""
+Serialization Module
+Exact, compact encoding of analysis results as typed JSON or Arrow IPC
+"""
+
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+FORMAT_NAME = 'streaming-content-analytics/result'
+FORMAT_VERSION = 1
+
+# Schema metadata key holding the result skeleton in Arrow output
+ARROW_SKELETON_KEY = b'result'
+
+_NONFINITE = {'nan': np.nan, 'inf': np.inf, '-inf': -np.inf}
+
+# Python scalar types stored as typed columns when a sequence holds only one of them
+_PYTHON_SCALARS = {bool: 'bool', int: 'int', float: 'float', str: 'str'}
+
+
+def _float_token(value):
+    """Text of a non-finite float"""
+    return 'nan' if np.isnan(value) else ('inf' if value > 0 else '-inf')
+
+
+def _numeric_array(values):
+    """
+    Typed encoding of a bool/int/uint/float numpy array
+    
+    Numeric arrays are left as numpy arrays for the JSON writer; NaN is
+    written as null and restored by the float dtype, infinities are stored
+    by position.
+    """
+    values = np.ascontiguousarray(values)
+    encoded = {'dtype': values.dtype.str, 'values': values}
+    if values.dtype.kind == 'f':
+        infinite = np.flatnonzero(np.isinf(values))
+        if len(infinite):
+            encoded['inf'] = [infinite.tolist(), np.sign(values[infinite]).astype(int).tolist()]
+            values = values.copy()
+            values[infinite] = 0
+            encoded['values'] = values
+    return encoded
+
+
+def _decode_numeric(encoded):
+    """Inverse of _numeric_array"""
+    # null entries of float arrays become NaN
+    values = np.asarray(encoded['values'], dtype=np.dtype(encoded['dtype']))
+    if 'inf' in encoded:
+        positions, signs = encoded['inf']
+        values[positions] = np.asarray(signs, dtype=float) * np.inf
+    return values
+
+
+def _object_array(values):
+    """1-d object array of arbitrary values (tuples stay elements)"""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _encode_sequence(values):
+    """Columnar encoding of a list of scalars, typed when they share one type"""
+    kinds = {type(v) for v in values}
+    kind = kinds.pop() if len(kinds) == 1 else None
+    if kind in (bool, str):
+        return {'type': _PYTHON_SCALARS[kind], 'values': list(values)}
+    if kind is float:
+        return {'type': 'float', **_numeric_array(np.asarray(values, dtype=float))}
+    if kind is int and all(-2 ** 63 <= v < 2 ** 63 for v in values):
+        return {'type': 'int', **_numeric_array(np.asarray(values, dtype=np.int64))}
+    if kind is not None and issubclass(kind, np.generic) and np.dtype(kind).kind in 'biuf':
+        return {'type': 'numpy', **_numeric_array(np.asarray(values, dtype=kind))}
+    return {'type': 'object', 'values': [encode(v) for v in values]}
+
+
+def _decode_sequence(encoded):
+    """Inverse of _encode_sequence, as a list"""
+    kind = encoded['type']
+    if kind in ('bool', 'str'):
+        return list(encoded['values'])
+    if kind == 'object':
+        return [decode(v) for v in encoded['values']]
+    values = _decode_numeric(encoded)
+    return values.tolist() if kind in ('int', 'float') else list(values)
+
+
+def _encode_array(values):
+    """Encoding of a numpy array or pandas extension array with its dtype"""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'dtype': 'category', 'codes': _numeric_array(np.asarray(values.codes)),
+                'categories': _encode_index(values.categories), 'ordered': bool(dtype.ordered)}
+    if isinstance(dtype, pd.PeriodDtype):
+        return {'dtype': str(dtype), 'ordinals': _numeric_array(np.asarray(values.asi8, dtype=np.int64))}
+    if isinstance(dtype, pd.DatetimeTZDtype) or (isinstance(dtype, np.dtype) and dtype.kind in 'mM'):
+        ints = np.asarray(values.asi8 if hasattr(values, 'asi8') else values.view('i8'), dtype=np.int64)
+        return {'dtype': str(dtype), 'values': ints}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return _numeric_array(values)
+    if isinstance(dtype, np.dtype) and dtype.kind == 'O':
+        return {'dtype': 'object', 'values': _encode_sequence(list(values))}
+    return {'dtype': str(dtype), 'extension': [encode(v) for v in values.tolist()]}
+
+
+def _decode_array(encoded):
+    """Inverse of _encode_array"""
+    dtype = encoded['dtype']
+    if dtype == 'category':
+        categories = _decode_index(encoded['categories'])
+        return pd.Categorical.from_codes(_decode_numeric(encoded['codes']), categories=categories,
+                                         ordered=encoded['ordered'])
+    if 'ordinals' in encoded:
+        return pd.arrays.PeriodArray(_decode_numeric(encoded['ordinals']), dtype=pd.api.types.pandas_dtype(dtype))
+    if 'extension' in encoded:
+        return pd.array([decode(v) for v in encoded['extension']], dtype=dtype)
+    if dtype == 'object':
+        return _object_array(_decode_sequence(encoded['values']))
+    if dtype.startswith(('datetime64', 'timedelta64')):
+        ints = np.asarray(encoded['values'], dtype=np.int64)
+        pandas_dtype = pd.api.types.pandas_dtype(dtype)
+        if isinstance(pandas_dtype, pd.DatetimeTZDtype):
+            naive = pd.DatetimeIndex(ints.view(f'M8[{pandas_dtype.unit}]'))
+            return naive.tz_localize('UTC').tz_convert(pandas_dtype.tz).array
+        return ints.view(pandas_dtype)
+    return _decode_numeric(encoded)
+
+
+def _encode_index(index):
+    """Encoding of a pandas Index, MultiIndex or RangeIndex with its names"""
+    if isinstance(index, pd.RangeIndex):
+        return {'range': [index.start, index.stop, index.step], 'name': encode(index.name)}
+    if isinstance(index, pd.MultiIndex):
+        return {'levels': [_encode_index(index.get_level_values(i)) for i in range(index.nlevels)],
+                'names': [encode(name) for name in index.names]}
+    encoded = {'values': _encode_array(index.array if not isinstance(index.dtype, np.dtype) else index.to_numpy()),
+               'name': encode(index.name)}
+    if getattr(index, 'freq', None) is not None and not isinstance(index, pd.PeriodIndex):
+        encoded['freq'] = index.freqstr
+    return encoded
+
+
+def _decode_index(encoded):
+    """Inverse of _encode_index"""
+    if 'range' in encoded:
+        return pd.RangeIndex(*encoded['range'], name=decode(encoded['name']))
+    if 'levels' in encoded:
+        return pd.MultiIndex.from_arrays([_decode_index(level) for level in encoded['levels']],
+                                         names=[decode(name) for name in encoded['names']])
+    values = _decode_array(encoded['values'])
+    index = pd.Index(values, dtype=values.dtype, name=decode(encoded['name']), tupleize_cols=False)
+    if 'freq' in encoded:
+        index = type(index)(index, freq=encoded['freq'])
+    return index
+
+
+def _encode_frame(df):
+    return {'$frame': {'index': _encode_index(df.index), 'columns': _encode_index(df.columns),
+                       'data': [_encode_array(df.iloc[:, i].array if not isinstance(df.dtypes.iloc[i], np.dtype)
+                                              else df.iloc[:, i].to_numpy())
+                                for i in range(df.shape[1])]}}
+
+
+def _decode_frame(encoded):
+    index = _decode_index(encoded['index'])
+    frame = pd.DataFrame({i: _decode_array(column) for i, column in enumerate(encoded['data'])}, index=index)
+    frame.columns = _decode_index(encoded['columns'])
+    return frame
+
+
+def encode(obj, tables=None):
+    """
+    Encode a result as a tree of JSON-compatible values
+    
+    Dicts with string keys stay JSON objects; other dicts, tuples, numpy
+    and pandas scalars (periods by ordinal and frequency), non-finite
+    floats and pandas containers are tagged
+    with a '$' key so they decode to exactly the same types. Dicts with
+    other keys and pandas containers are stored column-wise.
+    
+    Parameters:
+    -----------
+    obj : object
+        Analysis result
+    tables : list, optional
+        Collects DataFrames/Series to be written as Arrow tables; they are
+        replaced by references in the tree
+        
+    Returns:
+    --------
+    object
+        Encoded tree (may contain numpy arrays, which the writers handle)
+    """
+    if obj is None or isinstance(obj, (bool, str)):
+        return obj
+    if isinstance(obj, int) and type(obj) is int:
+        return obj if -2 ** 63 <= obj < 2 ** 63 else {'$int': str(obj)}
+    if type(obj) is float:
+        return obj if np.isfinite(obj) else {'$float': _float_token(obj)}
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            value = _float_token(value)
+        elif not isinstance(value, (bool, int, float, str)):
+            raise TypeError(f"Cannot serialize numpy scalar of type {type(obj).__name__}")
+        return {'$np': obj.dtype.str, 'v': value}
+    if obj is pd.NaT:
+        return {'$nat': None}
+    if obj is pd.NA:
+        return {'$na': None}
+    if isinstance(obj, pd.Timestamp):
+        return {'$ts': obj.value, 'unit': obj.unit, 'tz': str(obj.tz) if obj.tz is not None else None}
+    if isinstance(obj, pd.Timedelta):
+        return {'$td': obj.value}
+    if isinstance(obj, pd.Period):
+        return {'$period': obj.ordinal, 'freq': obj.freqstr}
+    if isinstance(obj, tuple):
+        return {'$tuple': [encode(v, tables) for v in obj]}
+    if isinstance(obj, list):
+        return [encode(v, tables) for v in obj]
+    if isinstance(obj, (set, frozenset)):
+        return {'$set': [encode(v, tables) for v in obj], 'frozen': isinstance(obj, frozenset)}
+    if isinstance(obj, dict):
+        if all(type(k) is str and not k.startswith('$') for k in obj):
+            return {k: encode(v, tables) for k, v in obj.items()}
+        values = list(obj.values())
+        if tables is not None and any(isinstance(v, (pd.DataFrame, pd.Series, dict, list)) for v in values):
+            encoded_values = {'type': 'object', 'values': [encode(v, tables) for v in values]}
+        else:
+            encoded_values = _encode_sequence(values)
+        return {'$dict': {'keys': _encode_sequence(list(obj)), 'values': encoded_values}}
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        if tables is not None and pa is not None:
+            reference = _table_reference(obj, tables)
+            if reference is not None:
+                return reference
+        if isinstance(obj, pd.Series):
+            return {'$series': {'index': _encode_index(obj.index), 'name': encode(obj.name),
+                                'values': _encode_array(obj.array if not isinstance(obj.dtype, np.dtype)
+                                                        else obj.to_numpy())}}
+        return _encode_frame(obj)
+    if isinstance(obj, pd.Index):
+        return {'$index': _encode_index(obj)}
+    if isinstance(obj, np.ndarray) and obj.ndim == 1:
+        return {'$array': _encode_array(obj)}
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def decode(tree):
+    """
+    Rebuild a result from its encoded tree
+    
+    Parameters:
+    -----------
+    tree : object
+        Output of encode (after a JSON round-trip)
+        
+    Returns:
+    --------
+    object
+        The original result
+    """
+    if isinstance(tree, list):
+        return [decode(v) for v in tree]
+    if not isinstance(tree, dict):
+        return tree
+    if len(tree) == 0 or not next(iter(tree)).startswith('$'):
+        return {k: decode(v) for k, v in tree.items()}
+    tag = next(iter(tree))
+    value = tree[tag]
+    if tag == '$int':
+        return int(value)
+    if tag == '$float':
+        return float(_NONFINITE[value])
+    if tag == '$np':
+        dtype = np.dtype(value)
+        raw = tree['v']
+        return dtype.type(_NONFINITE[raw] if isinstance(raw, str) and dtype.kind == 'f' else raw)
+    if tag == '$nat':
+        return pd.NaT
+    if tag == '$na':
+        return pd.NA
+    if tag == '$ts':
+        stamp = pd.Timestamp(value, tz='UTC').tz_convert(tree['tz']) if tree['tz'] else pd.Timestamp(value)
+        return stamp.as_unit(tree['unit'])
+    if tag == '$td':
+        return pd.Timedelta(value)
+    if tag == '$period':
+        return pd.Period(ordinal=value, freq=tree['freq'])
+    if tag == '$tuple':
+        return tuple(decode(v) for v in value)
+    if tag == '$set':
+        items = [decode(v) for v in value]
+        return frozenset(items) if tree['frozen'] else set(items)
+    if tag == '$dict':
+        return dict(zip(_decode_sequence(value['keys']), _decode_sequence(value['values'])))
+    if tag == '$series':
+        return pd.Series(_decode_array(value['values']), index=_decode_index(value['index']),
+                         name=decode(value['name']), copy=False)
+    if tag == '$frame':
+        return _decode_frame(value)
+    if tag == '$index':
+        return _decode_index(value)
+    if tag == '$array':
+        return _decode_array(value)
+    if tag == '$table':
+        raise ValueError("Arrow table references can only be decoded by read_arrow")
+    raise ValueError(f"Unknown tag '{tag}'")
+
+
+def _json_default(obj):
+    """Fallback for the standard json module, which cannot write numpy arrays"""
+    if isinstance(obj, np.ndarray):
+        return [None if isinstance(v, float) and np.isnan(v) else v for v in obj.tolist()]
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def to_json(obj):
+    """
+    Serialize a result to schema-stable JSON bytes
+    
+    Uses orjson with native numpy array support when installed, the
+    standard json module otherwise.
+    
+    Parameters:
+    -----------
+    obj : object
+        Analysis result
+        
+    Returns:
+    --------
+    bytes
+        JSON document {"format", "version", "result"}
+    """
+    document = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'result': encode(obj)}
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(document, default=_json_default, allow_nan=False, separators=(',', ':')).encode()
+
+
+def from_json(data):
+    """
+    Rebuild a result from to_json output
+    
+    Parameters:
+    -----------
+    data : bytes or str
+        JSON document
+        
+    Returns:
+    --------
+    object
+        The original result
+    """
+    document = orjson.loads(data) if orjson is not None else json.loads(data)
+    if document.get('format') != FORMAT_NAME or document.get('version') != FORMAT_VERSION:
+        raise ValueError("Not a serialized analysis result of a supported version")
+    return decode(document['result'])
+
+
+def _missing_marker(column):
+    """
+    How an object column marks missing values: 'none', 'nan', or None if
+    it holds anything but strings and one kind of missing value
+    """
+    missing = [v for v in column if type(v) is not str]
+    if all(v is None for v in missing):
+        return 'none'
+    if all(type(v) is float and v != v for v in missing):
+        return 'nan'
+    return None
+
+
+def _table_reference(obj, tables):
+    """Register a DataFrame/Series as an Arrow table, or None if Arrow cannot hold it exactly"""
+    frame = obj.to_frame(name='values') if isinstance(obj, pd.Series) else obj
+    # Arrow reads missing strings back as None, so columns using NaN are recorded
+    nan_columns = []
+    for i in range(frame.shape[1]):
+        if frame.dtypes.iloc[i] == object:
+            marker = _missing_marker(frame.iloc[:, i])
+            if marker is None:
+                return None
+            if marker == 'nan':
+                nan_columns.append(i)
+    if frame.columns.dtype == object and not all(type(c) is str for c in frame.columns):
+        return None
+    for i in range(frame.index.nlevels):
+        level = frame.index.get_level_values(i)
+        if level.dtype == object and not all(type(v) is str for v in level):
+            return None
+    try:
+        table = pa.Table.from_pandas(frame)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+        return None
+    tables.append(table)
+    reference = {'$table': len(tables) - 1}
+    if nan_columns:
+        reference['nan_columns'] = nan_columns
+    if getattr(frame.index, 'freq', None) is not None and not isinstance(frame.index, pd.PeriodIndex):
+        reference['freq'] = frame.index.freqstr
+    if isinstance(obj, pd.Series):
+        reference['name'] = encode(obj.name)
+    return reference
+
+
+def _restore_tables(tree, tables):
+    """Decode a skeleton, substituting table references"""
+    if isinstance(tree, list):
+        return [_restore_tables(v, tables) for v in tree]
+    if not isinstance(tree, dict):
+        return tree
+    if '$table' in tree:
+        frame = tables[tree['$table']]
+        for i in tree.get('nan_columns', []):
+            column = frame.iloc[:, i]
+            frame.isetitem(i, column.where(column.notna(), np.nan))
+        if 'freq' in tree:
+            frame.index = type(frame.index)(frame.index, freq=tree['freq'])
+        if 'name' in tree:
+            return frame['values'].rename(decode(tree['name']))
+        return frame
+    if tree and next(iter(tree)).startswith('$'):
+        if next(iter(tree)) == '$dict' and tree['$dict']['values']['type'] == 'object':
+            keys = _decode_sequence(tree['$dict']['keys'])
+            return dict(zip(keys, _restore_tables(tree['$dict']['values']['values'], tables)))
+        if next(iter(tree)) in ('$tuple', '$set'):
+            items = _restore_tables(tree[next(iter(tree))], tables)
+            if '$tuple' in tree:
+                return tuple(items)
+            return frozenset(items) if tree['frozen'] else set(items)
+        return decode(tree)
+    return {k: _restore_tables(v, tables) for k, v in tree.items()}
+
+
+def write_arrow(obj, sink, chunk_size=65_536, compression='zstd'):
+    """
+    Stream a result as Arrow IPC
+    
+    The output is a sequence of IPC streams: a header stream whose schema
+    metadata holds the JSON skeleton of the result, then one stream per
+    DataFrame/Series written in record batches of `chunk_size` rows.
+    Containers Arrow cannot represent exactly stay in the skeleton.
+    
+    Parameters:
+    -----------
+    obj : object
+        Analysis result
+    sink : str or file-like
+        Output path or writable binary file
+    chunk_size : int
+        Rows per record batch
+    compression : str, optional
+        IPC buffer compression ('zstd', 'lz4' or None)
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow output")
+    tables = []
+    skeleton = encode(obj, tables)
+    document = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'result': skeleton, 'tables': len(tables)}
+    metadata = {ARROW_SKELETON_KEY: orjson.dumps(document, option=orjson.OPT_SERIALIZE_NUMPY)
+                if orjson is not None else json.dumps(document, default=_json_default).encode()}
+    
+    owned = isinstance(sink, (str, os.PathLike))
+    stream = open(sink, 'wb') if owned else sink
+    try:
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        header = pa.schema([], metadata=metadata)
+        with pa.ipc.new_stream(stream, header):
+            pass
+        for table in tables:
+            with pa.ipc.new_stream(stream, table.schema, options=options) as writer:
+                writer.write_table(table, max_chunksize=chunk_size)
+    finally:
+        if owned:
+            stream.close()
+
+
+def _open_source(source):
+    """Arrow input stream of a path, bytes or file"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pa.BufferReader(source)
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(source))
+    return pa.PythonFile(source, mode='r')
+
+
+def _read_header(stream):
+    """Skeleton document from the header stream"""
+    reader = pa.ipc.open_stream(stream)
+    reader.read_all()
+    document = json.loads(reader.schema.metadata[ARROW_SKELETON_KEY])
+    if document.get('format') != FORMAT_NAME or document.get('version') != FORMAT_VERSION:
+        raise ValueError("Not a serialized analysis result of a supported version")
+    return document
+
+
+def iter_arrow_batches(source):
+    """
+    Read the tables of an Arrow result incrementally
+    
+    Parameters:
+    -----------
+    source : str, bytes or file-like
+        Output of write_arrow/to_arrow
+        
+    Yields:
+    -------
+    tuple
+        (table number, pd.DataFrame chunk) per record batch
+    """
+    stream = _open_source(source)
+    document = _read_header(stream)
+    for number in range(document['tables']):
+        for batch in pa.ipc.open_stream(stream):
+            yield number, batch.to_pandas()
+
+
+def read_arrow(source):
+    """
+    Rebuild a result written by write_arrow
+    
+    Parameters:
+    -----------
+    source : str, bytes or file-like
+        Output path, bytes or readable binary file
+        
+    Returns:
+    --------
+    object
+        The original result
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow input")
+    stream = _open_source(source)
+    document = _read_header(stream)
+    tables = [pa.ipc.open_stream(stream).read_all().to_pandas() for _ in range(document['tables'])]
+    return _restore_tables(document['result'], tables)
+
+
+def to_arrow(obj, chunk_size=65_536, compression='zstd'):
+    """Serialize a result to Arrow IPC bytes (see write_arrow)"""
+    buffer = io.BytesIO()
+    write_arrow(obj, buffer, chunk_size=chunk_size, compression=compression)
+    return buffer.getvalue()
+
+
+def save_result(obj, path):
+    """
+    Write a result to a '.json' or '.arrow' file
+    
+    Parameters:
+    -----------
+    obj : object
+        Analysis result
+    path : str
+        Output path; the extension selects the format
+    """
+    if str(path).endswith('.arrow'):
+        write_arrow(obj, path)
+    else:
+        with open(path, 'wb') as f:
+            f.write(to_json(obj))
+
+
+def load_result(path):
+    """
+    Read a result written by save_result
+    
+    Parameters:
+    -----------
+    path : str
+        Input path
+        
+    Returns:
+    --------
+    object
+        The original result
+    """
+    if str(path).endswith('.arrow'):
+        return read_arrow(path)
+    with open(path, 'rb') as f:
+        return from_json(f.read())
+
+
+if __name__ == "__main__":
+    print("Serialization Module")
+    print("Import this module to serialize analysis results")
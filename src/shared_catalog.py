@@ -0,0 +1,276 @@
+"""
+Shared Catalog Module
+Utilities for sharing a cleaned catalog with worker processes without copying
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .analysis import TITLE_CLUSTER_COLUMN
+
+# Byte alignment of every column buffer inside the shared block
+_ALIGNMENT = 64
+
+# Catalog attached by a worker process, see _init_worker
+_WORKER_CATALOG = None
+
+
+def _align(offset):
+    """Round an offset up to the buffer alignment"""
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _encode_column(series):
+    """
+    Encode a column as a fixed-width array plus metadata to rebuild it
+    
+    Numeric and boolean columns are stored as-is, datetimes as int64
+    nanoseconds and everything else as categorical codes whose categories
+    travel in the manifest.
+    """
+    if series.dtype == np.dtype('datetime64[ns]'):
+        return series.to_numpy().view('int64'), {'kind': 'datetime'}
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+        return series.to_numpy(), {'kind': 'numeric'}
+    
+    # Codes keep the dtype pandas picks for the category count, so
+    # Categorical.from_codes can wrap the shared buffer without casting
+    categorical = pd.Categorical(series)
+    return categorical.codes, {'kind': 'coded', 'categories': list(categorical.categories)}
+
+
+def _default_columns(df, max_unique_ratio, analyses=None):
+    """
+    Pick the columns the analyses read, or without analyses numeric columns
+    and text columns with few distinct values
+    """
+    if analyses:
+        needed = {c for func in analyses for c in getattr(func, 'required_columns', ())}
+        needed.add(TITLE_CLUSTER_COLUMN)
+        return [column for column in df.columns if column in needed]
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object and series.nunique() > max_unique_ratio * max(len(series), 1):
+            continue
+        columns.append(column)
+    return columns
+
+
+class SharedCatalog:
+    """
+    Handle to a catalog published in shared memory or a memory-mapped file
+    
+    The publishing process owns the block and should call `unlink()` when
+    workers are done; attached processes only call `close()`. The picklable
+    `manifest` is what gets sent to workers. Dataframes returned by
+    `to_frame()` must be released before the handle is closed.
+    """
+    
+    def __init__(self, manifest, buffer, shm=None, owner=False):
+        self.manifest = manifest
+        self._buffer = buffer
+        self._shm = shm
+        self._owner = owner
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+    
+    def column(self, name):
+        """Return a read-only numpy view of one stored column"""
+        spec = next(c for c in self.manifest['columns'] if c['name'] == name)
+        array = np.frombuffer(self._buffer, dtype=np.dtype(spec['dtype']),
+                              count=self.manifest['nrows'], offset=spec['offset'])
+        array.flags.writeable = False
+        return array
+    
+    def to_frame(self, columns=None):
+        """
+        Build a dataframe whose columns are views on the shared buffer
+        
+        Parameters:
+        -----------
+        columns : list of str, optional
+            Columns to include; all published columns if omitted
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Read-only, zero-copy dataframe
+        """
+        data = {}
+        for spec in self.manifest['columns']:
+            if columns is not None and spec['name'] not in columns:
+                continue
+            array = self.column(spec['name'])
+            if spec['kind'] == 'datetime':
+                data[spec['name']] = array.view('datetime64[ns]')
+            elif spec['kind'] == 'coded':
+                data[spec['name']] = pd.Categorical.from_codes(
+                    array, dtype=pd.CategoricalDtype(spec['categories']), validate=False)
+            else:
+                data[spec['name']] = array
+        return pd.DataFrame(data, copy=False)
+    
+    def close(self):
+        """Release this process' mapping of the block"""
+        self._buffer = None
+        if self._shm is not None:
+            self._shm.close()
+    
+    def unlink(self):
+        """Release the mapping and destroy the block (owner only)"""
+        self.close()
+        if self._shm is not None:
+            self._shm.unlink()
+        elif self.manifest.get('path') and os.path.exists(self.manifest['path']):
+            os.remove(self.manifest['path'])
+
+
+def publish_catalog(df, columns=None, path=None, max_unique_ratio=0.5, analyses=None):
+    """
+    Publish a cleaned catalog for zero-copy access from worker processes
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    columns : list of str, optional
+        Columns to publish; defaults to the columns `analyses` read, or
+        without analyses to numeric columns plus text columns with at most
+        `max_unique_ratio` distinct values per row
+    path : str, optional
+        Write a memory-mapped file at this path instead of using a
+        shared memory block
+    max_unique_ratio : float
+        Cardinality limit for text columns picked by default
+    analyses : iterable of callables, optional
+        Functions decorated with requires_columns that will be mapped over
+        the catalog
+        
+    Returns:
+    --------
+    SharedCatalog
+        Owning handle; pass `catalog.manifest` to workers
+    """
+    if columns is None:
+        columns = _default_columns(df, max_unique_ratio, analyses)
+    
+    encoded = []
+    offset = 0
+    for column in columns:
+        array, spec = _encode_column(df[column])
+        array = np.ascontiguousarray(array)
+        offset = _align(offset)
+        spec.update({'name': column, 'dtype': array.dtype.str, 'offset': offset})
+        encoded.append((array, spec))
+        offset += array.nbytes
+    size = max(_align(offset), 1)
+    
+    manifest = {'nrows': len(df), 'columns': [spec for _, spec in encoded]}
+    if path is None:
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        manifest['name'] = shm.name
+        buffer = shm.buf
+    else:
+        shm = None
+        manifest['path'] = os.path.abspath(path)
+        buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=(size,))
+    
+    for array, spec in encoded:
+        target = np.frombuffer(buffer, dtype=array.dtype, count=len(array), offset=spec['offset'])
+        target[:] = array
+    if shm is None:
+        buffer.flush()
+    
+    return SharedCatalog(manifest, buffer, shm=shm, owner=True)
+
+
+def attach_catalog(manifest):
+    """
+    Attach to a catalog published by another process
+    
+    Parameters:
+    -----------
+    manifest : dict
+        `SharedCatalog.manifest` of the published catalog
+        
+    Returns:
+    --------
+    SharedCatalog
+        Non-owning handle; use `to_frame()` for a read-only dataframe
+    """
+    if 'path' in manifest:
+        buffer = np.memmap(manifest['path'], dtype=np.uint8, mode='r')
+        return SharedCatalog(manifest, buffer)
+    
+    try:
+        shm = shared_memory.SharedMemory(name=manifest['name'], track=False)
+    except TypeError:
+        # Python < 3.13 registers every attachment with the resource tracker,
+        # which would destroy the block when the worker exits
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=manifest['name'])
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return SharedCatalog(manifest, shm.buf, shm=shm)
+
+
+def _init_worker(manifest):
+    """Attach the published catalog once per worker process"""
+    global _WORKER_CATALOG
+    _WORKER_CATALOG = attach_catalog(manifest)
+
+
+def _run_on_catalog(func, args):
+    """Call func on the worker's zero-copy dataframe"""
+    return func(_WORKER_CATALOG.to_frame(), *args)
+
+
+def map_over_catalog(func, tasks, catalog, max_workers=None):
+    """
+    Run an analysis function on a shared catalog across worker processes
+    
+    Each worker attaches to the published block once; the dataframe handed
+    to `func` is a read-only view, so no rows are pickled or copied.
+    
+    Parameters:
+    -----------
+    func : callable
+        Picklable function called as func(df, *args), e.g. an analysis
+        function such as analysis.analyze_content_by_country
+    tasks : iterable of tuples
+        Extra positional arguments for each call
+    catalog : SharedCatalog
+        Catalog returned by publish_catalog
+    max_workers : int, optional
+        Number of worker processes
+        
+    Returns:
+    --------
+    list
+        Results in task order
+    """
+    published = {spec['name'] for spec in catalog.manifest['columns']}
+    missing = [c for c in getattr(func, 'required_columns', ()) if c not in published]
+    if missing:
+        raise ValueError(f"{func.__name__} reads columns that were not published: {missing}; "
+                         f"pass analyses=[{func.__name__}] or the columns to publish_catalog")
+    
+    tasks = [tuple(args) for args in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(catalog.manifest,)) as executor:
+        return list(executor.map(_run_on_catalog, [func] * len(tasks), tasks))
+
+
+if __name__ == "__main__":
+    print("Shared Catalog Module")
+    print("Import this module to share catalogs with worker processes")
@@ -0,0 +1,412 @@
+"""
+Streaming Module
+Replay of the catalog as an event stream through windowed aggregators
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+import numpy as np
+import pandas as pd
+
+from .analysis import unique_titles
+from .backends import _identical
+
+# Columns carried by each event
+EVENT_COLUMNS = ['date_added', 'release_year', 'year_added', 'content_lag_years', 'type',
+                 'month_name', 'day_of_week', 'quarter_added', 'listed_in']
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def _key(value):
+    """Group key of a value, or None for missing values (dropped like groupby does)"""
+    return None if pd.isna(value) else value
+
+
+def _ranked(counter):
+    """
+    Counts in descending order, ties in arrival order
+    
+    Counter.most_common sorts stably over insertion order.
+    """
+    return dict(counter.most_common())
+
+
+class WindowedAggregator:
+    """
+    Base class of incremental aggregators over a sliding event-time window
+    
+    Subclasses implement _apply(event, sign) adding (+1) or retracting (-1)
+    one event, and result(). With window=None every event since the start
+    of the replay is kept, so results equal the batch analysis of the
+    events seen so far.
+    """
+    
+    name = 'aggregator'
+    
+    def __init__(self, window=None):
+        self.window = pd.Timedelta(window) if window is not None else None
+        self._events = deque()
+        self.events = 0
+    
+    def update(self, timestamp, event):
+        """Add an event and evict those that fell out of the window"""
+        self._apply(event, 1)
+        self.events += 1
+        if self.window is None:
+            return
+        self._events.append((timestamp, event))
+        cutoff = timestamp - self.window
+        while self._events and self._events[0][0] <= cutoff:
+            self._apply(self._events.popleft()[1], -1)
+            self.events -= 1
+    
+    def _apply(self, event, sign):
+        raise NotImplementedError
+    
+    def result(self):
+        raise NotImplementedError
+
+
+class YearlyContentAggregator(WindowedAggregator):
+    """Streaming counterpart of analysis.analyze_content_by_year"""
+    
+    name = 'content_by_year'
+    
+    def __init__(self, window=None):
+        super().__init__(window)
+        self.releases = Counter()
+        self.additions = Counter()
+        self.lag_sum = Counter()
+        self.lag_count = Counter()
+        self.types = Counter()
+    
+    def _apply(self, event, sign):
+        release_year, year_added = _key(event.release_year), _key(event.year_added)
+        if release_year is not None:
+            self.releases[release_year] += sign
+        if year_added is None:
+            return
+        self.additions[year_added] += sign
+        if not pd.isna(event.content_lag_years):
+            self.lag_sum[year_added] += sign * event.content_lag_years
+            self.lag_count[year_added] += sign
+        if _key(event.type) is not None:
+            self.types[(year_added, event.type)] += sign
+    
+    def result(self):
+        """Same structure as analyze_content_by_year"""
+        additions = sorted(year for year, count in self.additions.items() if count > 0)
+        type_years = sorted({year for (year, _), count in self.types.items() if count > 0})
+        content_types = sorted({kind for (_, kind), count in self.types.items() if count > 0})
+        return {
+            'releases_by_year': {year: self.releases[year] for year in sorted(self.releases)
+                                 if self.releases[year] > 0},
+            'additions_by_year': {year: self.additions[year] for year in additions},
+            'avg_content_lag': {year: (self.lag_sum[year] / self.lag_count[year]
+                                       if self.lag_count[year] > 0 else np.nan)
+                                for year in additions},
+            'content_type_by_year': {kind: {year: self.types[(year, kind)] for year in type_years}
+                                     for kind in content_types}
+        }
+
+
+class LaunchTimingAggregator(WindowedAggregator):
+    """Streaming counterpart of analysis.analyze_optimal_launch_timing"""
+    
+    name = 'launch_timing'
+    
+    def __init__(self, window=None):
+        super().__init__(window)
+        self.months = Counter()
+        self.days = Counter()
+        self.quarters = Counter()
+    
+    def _apply(self, event, sign):
+        for counter, value in ((self.months, event.month_name), (self.days, event.day_of_week),
+                               (self.quarters, event.quarter_added)):
+            value = _key(value)
+            if value is not None:
+                counter[value] += sign
+                if counter[value] == 0:
+                    del counter[value]
+    
+    def result(self):
+        """Same structure as analyze_optimal_launch_timing (without forecast)"""
+        months, days, quarters = _ranked(self.months), _ranked(self.days), _ranked(self.quarters)
+        return {
+            'best_month': next(iter(months), None),
+            'best_day': next(iter(days), None),
+            'best_quarter': next(iter(quarters), None),
+            'month_distribution': months,
+            'day_distribution': days,
+            'quarter_distribution': quarters
+        }
+
+
+class TopGenresAggregator(WindowedAggregator):
+    """Streaming counterpart of analysis.get_top_genres"""
+    
+    name = 'top_genres'
+    
+    def __init__(self, window=None, n=10):
+        super().__init__(window)
+        self.n = n
+        self.genres = Counter()
+    
+    def _apply(self, event, sign):
+        if not isinstance(event.listed_in, str):
+            return
+        for genre in event.listed_in.split(', '):
+            self.genres[genre] += sign
+            if self.genres[genre] == 0:
+                del self.genres[genre]
+    
+    def result(self):
+        """Top genres as a Series, like get_top_genres"""
+        top = self.genres.most_common(self.n)
+        return pd.Series([count for _, count in top], name='count',
+                         index=pd.Index([genre for genre, _ in top], dtype=object, name='listed_in'))
+
+
+def default_aggregators(window=None):
+    """One aggregator of each kind over the same window"""
+    return [YearlyContentAggregator(window), LaunchTimingAggregator(window), TopGenresAggregator(window)]
+
+
+def timed_titles(df):
+    """
+    Titles that can be placed on the timeline: duplicate clusters reduced to
+    one row first, then rows without an addition date dropped
+    
+    Both the replay and its batch check use this, so they count the same rows.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+        
+    Returns:
+    --------
+    pd.DataFrame
+        One row per title cluster with a date_added
+    """
+    df = unique_titles(df)
+    return df[df['date_added'].notna()]
+
+
+def catalog_events(df):
+    """
+    Cleaned rows as (timestamp, event) pairs in order of date_added
+    
+    Titles without an addition date cannot be placed on the timeline and
+    are skipped; duplicate clusters are emitted once.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+        
+    Returns:
+    --------
+    list of tuple
+        (pd.Timestamp, namedtuple with the EVENT_COLUMNS) pairs
+    """
+    df = timed_titles(df)
+    df = df[[c for c in EVENT_COLUMNS if c in df.columns]]
+    df = df.sort_values('date_added', kind='stable')
+    return [(event.date_added, event) for event in df.itertuples(index=False, name='CatalogEvent')]
+
+
+async def _produce(events, queue, speed, policy, stats):
+    """Emit events on the event-time schedule, blocking or dropping when the queue is full"""
+    start = time.perf_counter()
+    origin = events[0][0] if events else None
+    for timestamp, event in events:
+        if speed is not None:
+            due = start + (timestamp - origin).total_seconds() / speed
+            delay = due - time.perf_counter()
+            if delay > 0.001:
+                await asyncio.sleep(delay)
+        emitted = time.perf_counter()
+        if policy == 'drop':
+            try:
+                queue.put_nowait((emitted, timestamp, event))
+            except asyncio.QueueFull:
+                stats['dropped'] += 1
+                continue
+        elif queue.full():
+            await queue.put((emitted, timestamp, event))
+            stats['blocked_seconds'] += time.perf_counter() - emitted
+            stats['blocked_events'] += 1
+        else:
+            queue.put_nowait((emitted, timestamp, event))
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], queue.qsize())
+        # Let the consumer run between events even when nothing blocks
+        if stats['emitted'] % 256 == 0:
+            await asyncio.sleep(0)
+        stats['emitted'] += 1
+    await queue.put(None)
+
+
+async def _consume(queue, aggregators, process_delay, latencies, on_event):
+    """Feed queued events to the aggregators, recording emit-to-processed latency"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        emitted, timestamp, event = item
+        for aggregator in aggregators:
+            aggregator.update(timestamp, event)
+        if on_event is not None:
+            on_event(timestamp, aggregators)
+        if process_delay:
+            await asyncio.sleep(process_delay)
+        latencies.append(time.perf_counter() - emitted)
+
+
+async def replay_async(df, aggregators=None, speed=None, queue_size=1000, policy='block',
+                       process_delay=0.0, on_event=None):
+    """
+    Replay the catalog through aggregators on an asyncio queue
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    aggregators : list of WindowedAggregator, optional
+        Aggregators to feed (defaults to default_aggregators())
+    speed : float, optional
+        Event-time seconds replayed per wall-clock second (86400 replays a
+        day per second); None replays as fast as possible
+    queue_size : int
+        Capacity of the queue between producer and consumer
+    policy : str
+        'block' makes the producer wait when the queue is full; 'drop'
+        discards events instead
+    process_delay : float
+        Extra seconds spent per event by the consumer, to simulate a slow
+        downstream
+    on_event : callable, optional
+        Called as on_event(timestamp, aggregators) after every event
+        
+    Returns:
+    --------
+    dict
+        Replay statistics (see replay_catalog) and 'results' per aggregator
+    """
+    if policy not in ('block', 'drop'):
+        raise ValueError(f"Unknown backpressure policy '{policy}'")
+    aggregators = aggregators if aggregators is not None else default_aggregators()
+    events = catalog_events(df)
+    queue = asyncio.Queue(maxsize=queue_size)
+    stats = {'emitted': 0, 'dropped': 0, 'blocked_events': 0, 'blocked_seconds': 0.0, 'max_queue_depth': 0}
+    latencies = []
+    
+    start = time.perf_counter()
+    await asyncio.gather(_produce(events, queue, speed, policy, stats),
+                         _consume(queue, aggregators, process_delay, latencies, on_event))
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.asarray(latencies) * 1000
+    report = {
+        'events': len(events),
+        'processed': len(latencies),
+        'dropped': stats['dropped'],
+        'elapsed_seconds': elapsed,
+        'events_per_second': len(latencies) / elapsed if elapsed > 0 else np.nan,
+        'blocked_events': stats['blocked_events'],
+        'blocked_seconds': stats['blocked_seconds'],
+        'max_queue_depth': stats['max_queue_depth']
+    }
+    for p in LATENCY_PERCENTILES:
+        report[f'latency_p{p}_ms'] = float(np.percentile(latencies, p)) if len(latencies) else np.nan
+    report['latency_max_ms'] = float(latencies.max()) if len(latencies) else np.nan
+    report['results'] = {aggregator.name: aggregator.result() for aggregator in aggregators}
+    return report
+
+
+def replay_catalog(df, aggregators=None, speed=None, queue_size=1000, policy='block',
+                   process_delay=0.0, on_event=None):
+    """
+    Replay the catalog as a stream ordered by date_added
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    aggregators, speed, queue_size, policy, process_delay, on_event
+        See replay_async
+        
+    Returns:
+    --------
+    dict
+        'events', 'processed', 'dropped', 'elapsed_seconds',
+        'events_per_second', 'blocked_events', 'blocked_seconds' (producer
+        time spent waiting on a full queue), 'max_queue_depth', latency
+        percentiles in milliseconds and 'results' per aggregator
+    """
+    return asyncio.run(replay_async(df, aggregators, speed=speed, queue_size=queue_size, policy=policy,
+                                    process_delay=process_delay, on_event=on_event))
+
+
+def _equivalent(expected, actual):
+    """Equality up to the order of tied counts, which follows arrival order in a stream"""
+    if isinstance(expected, pd.Series):
+        return isinstance(actual, pd.Series) and _identical(expected.sort_index(), actual.sort_index())
+    if isinstance(expected, dict):
+        return (isinstance(actual, dict) and set(expected) == set(actual)
+                and all(_equivalent(expected[k], actual[k]) for k in expected))
+    return _identical(expected, actual)
+
+
+def _best_counts(timing):
+    """Launch timing with each best value replaced by its count, so ties compare equal"""
+    timing = dict(timing)
+    for period in ('month', 'day', 'quarter'):
+        distribution = timing[f'{period}_distribution']
+        timing[f'best_{period}'] = distribution.get(timing[f'best_{period}'])
+    return timing
+
+
+def verify_replay(df, results):
+    """
+    Compare the results of a lossless, unwindowed replay with batch analysis
+    
+    Counts that tie are ranked in arrival order by the stream and in row
+    order by the batch functions, so rankings are compared up to ties.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe that was replayed
+    results : dict
+        'results' of replay_catalog
+        
+    Returns:
+    --------
+    dict
+        Aggregator name -> True if it matches the batch function
+    """
+    from . import analysis
+    
+    timed = timed_titles(df)
+    batch = {
+        'content_by_year': lambda: analysis.analyze_content_by_year(timed),
+        'launch_timing': lambda: _best_counts(analysis.analyze_optimal_launch_timing(timed)),
+        'top_genres': lambda: analysis.get_top_genres(timed)
+    }
+    checks = {}
+    for name, result in results.items():
+        if name not in batch:
+            continue
+        if name == 'launch_timing':
+            result = _best_counts(result)
+        checks[name] = _equivalent(batch[name](), result)
+    return checks
+
+
+if __name__ == "__main__":
+    print("Streaming Module")
+    print("Import this module to replay the catalog as an event stream")
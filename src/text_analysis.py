@@ -0,0 +1,302 @@
+"""
+Text Analysis Module
+Distinctive keywords and bigrams of title descriptions per segment
+"""
+
+import hashlib
+import os
+import re
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+from .analysis import unique_titles
+from .data_processing import build_segment_index
+
+# Hashed feature space; collisions are rare enough to ignore at 2**20
+N_FEATURES = 2 ** 20
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z']+")
+
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being
+between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves
+out over own same she should so some such than that the their theirs them themselves then
+there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself yourselves one two new
+""".split())
+
+# Segment dimension -> column with the segment values
+TEXT_DIMENSIONS = {'genre': 'genre', 'country': 'country', 'year': 'year_added'}
+
+
+def tokenize(text, bigrams=True):
+    """
+    Lowercased word tokens of a text without stopwords, plus bigrams
+    
+    Parameters:
+    -----------
+    text : str
+        Text to tokenize
+    bigrams : bool
+        Also return adjacent token pairs joined by a space
+        
+    Returns:
+    --------
+    list of str
+        Terms
+    """
+    words = [w for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+    if bigrams:
+        return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    return words
+
+
+def _hash_terms(terms, n_features):
+    """Feature ids of terms"""
+    if not len(terms):
+        return np.zeros(0, dtype=np.int64)
+    hashes = pd.util.hash_array(np.asarray(terms, dtype=object), categorize=False)
+    return (hashes % np.uint64(n_features)).astype(np.int64)
+
+
+def _vectorize_chunk(texts, n_features, bigrams):
+    """Hashed term counts of a chunk of texts"""
+    terms, lengths = [], []
+    for text in texts:
+        tokens = tokenize(text, bigrams) if isinstance(text, str) else []
+        terms.extend(tokens)
+        lengths.append(len(tokens))
+    codes, uniques = pd.factorize(np.asarray(terms, dtype=object))
+    features = _hash_terms(uniques, n_features)[codes]
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    matrix = sparse.csr_matrix((np.ones(len(features), dtype=np.int32), (rows, features)),
+                               shape=(len(texts), n_features))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _chunk_bounds(n, chunk_size):
+    """(start, stop) pairs splitting n items into chunks"""
+    return [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+def hash_vectorize(texts, n_features=N_FEATURES, bigrams=True, chunk_size=20_000, n_jobs=1):
+    """
+    Hashed document-term count matrix
+    
+    Terms are hashed into a fixed feature space, so memory depends on the
+    number of term occurrences rather than the vocabulary. Each distinct
+    text is tokenized once, and chunks of distinct texts are vectorized in
+    parallel when `n_jobs` > 1.
+    
+    Parameters:
+    -----------
+    texts : sequence of str
+        Documents (missing values give empty rows)
+    n_features : int
+        Size of the hashed feature space
+    bigrams : bool
+        Include bigrams
+    chunk_size : int
+        Documents per chunk
+    n_jobs : int
+        Worker processes
+        
+    Returns:
+    --------
+    scipy.sparse.csr_matrix
+        Matrix of shape (documents, n_features)
+    """
+    if sparse is None:
+        raise ImportError("scipy is required for text analysis")
+    codes, texts = pd.factorize(pd.Series(list(texts), dtype=object))
+    texts = list(texts) + [None]
+    bounds = _chunk_bounds(len(texts), chunk_size)
+    if n_jobs == 1 or len(bounds) <= 1:
+        chunks = [_vectorize_chunk(texts[a:b], n_features, bigrams) for a, b in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_vectorize_chunk, texts[a:b], n_features, bigrams) for a, b in bounds]
+            chunks = [f.result() for f in futures]
+    # Missing texts (code -1) map to the trailing empty row
+    return sparse.vstack(chunks, format='csr')[codes]
+
+
+def _membership_matrix(df, dimension):
+    """Sparse (segments x documents) membership matrix and segment labels"""
+    index = build_segment_index(df, TEXT_DIMENSIONS.get(dimension, dimension))
+    codes = index['value'].cat.codes.to_numpy()
+    labels = index['value'].cat.categories
+    matrix = sparse.csr_matrix((np.ones(len(index), dtype=np.int32), (codes, index['row'].to_numpy())),
+                               shape=(len(labels), len(df)))
+    matrix.data[:] = 1
+    return matrix, labels
+
+
+def _log_odds_scores(counts, totals, prior=100.0):
+    """
+    z-scores of the log-odds ratio of each term in a segment vs the rest,
+    with an informative Dirichlet prior (Monroe, Colaresi and Quinn 2008)
+    """
+    grand_total = totals.sum()
+    alpha = prior * totals / grand_total
+    segment_sizes = np.asarray(counts.sum(axis=1)).ravel()
+    
+    coo = counts.tocoo()
+    y_in = coo.data.astype(float)
+    y_out = totals[coo.col] - y_in
+    a = alpha[coo.col]
+    n_in = segment_sizes[coo.row]
+    n_out = grand_total - n_in
+    delta = (np.log((y_in + a) / (n_in + prior - y_in - a))
+             - np.log((y_out + a) / (n_out + prior - y_out - a)))
+    variance = 1 / (y_in + a) + 1 / (y_out + a)
+    return coo.row, coo.col, coo.data, delta / np.sqrt(variance)
+
+
+def _tfidf_scores(counts):
+    """Term frequency in the segment times inverse segment frequency"""
+    segment_sizes = np.asarray(counts.sum(axis=1)).ravel()
+    coo = counts.tocoo()
+    segment_frequency = np.bincount(coo.col, minlength=counts.shape[1])
+    idf = np.log(counts.shape[0] / segment_frequency[coo.col])
+    return coo.row, coo.col, coo.data, coo.data / segment_sizes[coo.row] * idf
+
+
+def _feature_terms(texts, features, n_features, bigrams):
+    """Recover the text of hashed features by rescanning documents"""
+    wanted = set(features.tolist())
+    names = {}
+    for text in texts:
+        if not isinstance(text, str):
+            continue
+        tokens = tokenize(text, bigrams)
+        for token, feature in zip(tokens, _hash_terms(tokens, n_features).tolist()):
+            if feature in wanted and feature not in names:
+                names[feature] = token
+        if len(names) == len(wanted):
+            break
+    return names
+
+
+def _fingerprint(df, dimensions, params):
+    """Cache key of the term table inputs"""
+    columns = ['description'] + [c for c in ('listed_in', 'country', 'year_added') if c in df.columns]
+    digest = hashlib.sha256(repr((dimensions, sorted(params.items()))).encode())
+    digest.update(np.ascontiguousarray(pd.util.hash_pandas_object(df[columns], index=False).to_numpy()))
+    return digest.hexdigest()[:16]
+
+
+def distinctive_terms(df, dimensions=('genre', 'country', 'year'), method='log_odds', top_n=20,
+                      min_count=5, bigrams=True, n_features=N_FEATURES, n_jobs=1, cache_dir=None):
+    """
+    Keywords and bigrams that distinguish each segment's descriptions
+    
+    Each segment's term counts are contrasted with the rest of the catalog
+    using either the log-odds ratio with an informative Dirichlet prior
+    (z-scored) or TF-IDF over segments.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe with 'description' and segment columns
+    dimensions : tuple of str
+        'genre', 'country', 'year' (year added) or any single-valued column
+    method : str
+        'log_odds' or 'tfidf'
+    top_n : int
+        Terms kept per segment
+    min_count : int
+        Minimum occurrences of a term within a segment
+    bigrams : bool
+        Include bigrams
+    n_features : int
+        Size of the hashed feature space
+    n_jobs : int
+        Worker processes for vectorizing
+    cache_dir : str, optional
+        Directory caching the term table per input fingerprint
+        
+    Returns:
+    --------
+    pd.DataFrame
+        Columns 'dimension', 'segment', 'term', 'count' and 'score', sorted
+        by score within each segment
+    """
+    df = unique_titles(df).reset_index(drop=True)
+    params = {'method': method, 'top_n': top_n, 'min_count': min_count,
+              'bigrams': bigrams, 'n_features': n_features}
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f'terms_{_fingerprint(df, dimensions, params)}.pkl')
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+    
+    texts = df['description'].tolist()
+    documents = hash_vectorize(texts, n_features=n_features, bigrams=bigrams, n_jobs=n_jobs)
+    totals = np.asarray(documents.sum(axis=0)).ravel().astype(float)
+    
+    tables = []
+    for dimension in dimensions:
+        membership, labels = _membership_matrix(df, dimension)
+        counts = (membership @ documents).tocsr()
+        if method == 'log_odds':
+            rows, features, term_counts, scores = _log_odds_scores(counts, totals)
+        elif method == 'tfidf':
+            rows, features, term_counts, scores = _tfidf_scores(counts)
+        else:
+            raise ValueError(f"Unknown method '{method}'")
+        
+        table = pd.DataFrame({'segment': rows, 'feature': features, 'count': term_counts, 'score': scores})
+        table = table[table['count'] >= min_count]
+        table = table.sort_values(['segment', 'score'], ascending=[True, False], kind='stable')
+        table = table.groupby('segment', sort=False).head(top_n)
+        table['segment'] = labels[table['segment'].to_numpy()]
+        table.insert(0, 'dimension', dimension)
+        tables.append(table)
+    
+    result = pd.concat(tables, ignore_index=True)
+    names = _feature_terms(pd.unique(np.asarray(texts, dtype=object)), result['feature'].unique(),
+                           n_features, bigrams)
+    result.insert(3, 'term', result.pop('feature').map(names))
+    
+    if cache_path:
+        result.to_pickle(cache_path)
+    return result
+
+
+def term_frequencies(table, dimension, segment):
+    """
+    Term weights of one segment, ready for WordCloud.generate_from_frequencies
+    
+    Parameters:
+    -----------
+    table : pd.DataFrame
+        Output of distinctive_terms
+    dimension : str
+        Segment dimension
+    segment : object
+        Segment value
+        
+    Returns:
+    --------
+    dict
+        term -> positive score
+    """
+    rows = table[(table['dimension'] == dimension) & (table['segment'] == segment)]
+    rows = rows[rows['score'] > 0]
+    return dict(zip(rows['term'], rows['score'].astype(float)))
+
+
+if __name__ == "__main__":
+    print("Text Analysis Module")
+    print("Import this module to extract distinctive terms")
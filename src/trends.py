@@ -0,0 +1,288 @@
+"""
+Trends Module
+Rolling, monthly-granularity trend analytics for catalog additions
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data_processing import build_segment_index
+
+
+def _month_ordinals(dates):
+    """Convert datetimes to months since year 0 (-1 for missing dates)"""
+    dates = pd.to_datetime(dates)
+    ordinals = dates.dt.year * 12 + dates.dt.month - 1
+    return ordinals.fillna(-1).astype(np.int64).to_numpy()
+
+
+def _window_sums(cumulative, window):
+    """
+    Trailing window totals for every segment and month in one pass
+    
+    Parameters:
+    -----------
+    cumulative : np.ndarray
+        Array of shape (segments, months + 1) with a leading zero column
+    window : int
+        Window length in months
+        
+    Returns:
+    --------
+    np.ndarray
+        Array of shape (segments, months); months without a full window of
+        history are NaN
+    """
+    months = cumulative.shape[1] - 1
+    sums = np.full((cumulative.shape[0], months), np.nan)
+    if months >= window:
+        sums[:, window - 1:] = cumulative[:, window:] - cumulative[:, :months - window + 1]
+    return sums
+
+
+def _growth_rates(sums, window):
+    """Growth of each trailing window over the window before it"""
+    growth = np.full(sums.shape, np.nan)
+    if sums.shape[1] > window:
+        previous = sums[:, :-window]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth[:, window:] = np.where(previous > 0, sums[:, window:] / previous - 1, np.nan)
+    return growth
+
+
+class TrendEngine:
+    """
+    Incrementally maintained monthly addition counts per segment
+    
+    Counts are held as a (segments x months) matrix together with its
+    cumulative sum along months, so every trailing window for every segment
+    is a single vectorized subtraction. `update` folds in new rows and only
+    recomputes the cumulative sums from the earliest month they touch.
+    Both matrices live in buffers whose capacity grows geometrically, so
+    appending months or segments keeps the existing cumulative prefix;
+    only rows dated before the first month shift the matrices and
+    recompute them fully.
+    
+    Parameters:
+    -----------
+    dimensions : tuple of str
+        Segment dimensions, see data_processing.SEGMENT_DIMENSIONS
+    windows : tuple of int
+        Trailing window lengths in months
+    """
+    
+    def __init__(self, dimensions=('genre', 'country', 'type'), windows=(3, 6, 12)):
+        self.dimensions = tuple(dimensions)
+        self.windows = tuple(sorted(windows))
+        self.segments = []
+        self._segment_ids = {}
+        self.start_month = None
+        self.n_months = 0
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        self._cumulative_buffer = np.zeros((0, 1), dtype=np.int64)
+    
+    @property
+    def counts(self):
+        """Monthly additions, shape (segments, months)"""
+        return self._counts[:len(self.segments), :self.n_months]
+    
+    @property
+    def _cumulative(self):
+        """Cumulative additions with a leading zero column, shape (segments, months + 1)"""
+        return self._cumulative_buffer[:len(self.segments), :self.n_months + 1]
+    
+    @property
+    def months(self):
+        """Monthly periods covered by the engine"""
+        if self.start_month is None:
+            return pd.PeriodIndex([], freq='M', name='month')
+        return pd.period_range(
+            pd.Period(year=self.start_month // 12, month=self.start_month % 12 + 1, freq='M'),
+            periods=self.n_months, freq='M', name='month')
+    
+    def _segment_codes(self, dimension, values):
+        """Map segment values to engine-wide segment ids, adding new ones"""
+        ids = []
+        for value in values:
+            key = (dimension, value)
+            if key not in self._segment_ids:
+                self._segment_ids[key] = len(self.segments)
+                self.segments.append(key)
+            ids.append(self._segment_ids[key])
+        return np.array(ids, dtype=np.int64)
+    
+    def _reserve(self, n_segments, n_months):
+        """Ensure buffer capacity, at least doubling a dimension that grows"""
+        capacity = self._counts.shape
+        if n_segments <= capacity[0] and n_months <= capacity[1]:
+            return
+        shape = tuple(size if needed <= size else max(needed, 2 * size)
+                      for needed, size in zip((n_segments, n_months), capacity))
+        used = min(len(self.segments), capacity[0])
+        counts = np.zeros(shape, dtype=np.int64)
+        counts[:used, :self.n_months] = self._counts[:used, :self.n_months]
+        cumulative = np.zeros((shape[0], shape[1] + 1), dtype=np.int64)
+        cumulative[:used, :self.n_months + 1] = self._cumulative_buffer[:used, :self.n_months + 1]
+        self._counts, self._cumulative_buffer = counts, cumulative
+    
+    def _resize(self, first_month, last_month):
+        """
+        Cover new segments and months
+        
+        Returns the first month column whose cumulative totals are stale:
+        0 when the start moved earlier, otherwise the previous month count
+        (appended months and segments start from the existing prefix).
+        """
+        if self.start_month is None:
+            self.start_month = first_month
+        stale = self.n_months
+        shift = max(self.start_month - first_month, 0)
+        n_months = max(self.n_months + shift, last_month - (self.start_month - shift) + 1)
+        self._reserve(len(self.segments), n_months)
+        if shift:
+            self._counts[:, shift:shift + self.n_months] = self._counts[:, :self.n_months].copy()
+            self._counts[:, :shift] = 0
+            self.start_month -= shift
+            stale = 0
+        self.n_months = n_months
+        return stale
+    
+    def update(self, df):
+        """
+        Add catalog rows to the engine
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Rows with 'date_added' and the segment source columns
+            
+        Returns:
+        --------
+        TrendEngine
+            The engine itself, for chaining
+        """
+        months = _month_ordinals(df['date_added'])
+        valid = months >= 0
+        if not valid.any():
+            return self
+        
+        segment_rows, segment_ids = [], []
+        for dimension in self.dimensions:
+            index = build_segment_index(df, dimension)
+            codes = self._segment_codes(dimension, index['value'].cat.categories)
+            segment_rows.append(index['row'].to_numpy())
+            segment_ids.append(codes[index['value'].cat.codes.to_numpy()])
+        rows = np.concatenate(segment_rows)
+        ids = np.concatenate(segment_ids)
+        keep = valid[rows]
+        rows, ids = rows[keep], ids[keep]
+        
+        stale = self._resize(int(months[valid].min()), int(months[valid].max()))
+        columns = months[rows] - self.start_month
+        
+        # Only months at or after the earliest touched one change their
+        # cumulative totals
+        dirty = min(stale, int(columns.min()))
+        n_segments, width = len(self.segments), self.n_months - dirty
+        self._counts[:n_segments, dirty:self.n_months] += np.bincount(
+            ids * width + columns - dirty, minlength=n_segments * width).reshape(n_segments, width)
+        cumulative = self._cumulative_buffer
+        cumulative[:n_segments, dirty + 1:self.n_months + 1] = (
+            cumulative[:n_segments, [dirty]] + np.cumsum(self._counts[:n_segments, dirty:self.n_months], axis=1))
+        
+        return self
+    
+    def trends(self, since=None):
+        """
+        Rolling additions, growth rates and momentum for all segments
+        
+        Growth compares each trailing window with the window before it;
+        momentum is the shortest window's growth minus the longest's.
+        
+        Parameters:
+        -----------
+        since : str or pd.Period, optional
+            Only return months from this month onward
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Indexed by (dimension, segment, month) with 'additions' and, per
+            window w, 'additions_{w}m' and 'growth_{w}m' plus 'momentum'
+        """
+        n_segments, n_months = self.counts.shape
+        first = 0
+        if since is not None and n_months:
+            first = max(pd.Period(since, freq='M').ordinal - self.months[0].ordinal, 0)
+        
+        columns = {'additions': self.counts[:, first:].astype(float)}
+        growth = {}
+        for window in self.windows:
+            sums = _window_sums(self._cumulative, window)
+            growth[window] = _growth_rates(sums, window)
+            columns[f'additions_{window}m'] = sums[:, first:]
+            columns[f'growth_{window}m'] = growth[window][:, first:]
+        if len(self.windows) > 1:
+            columns['momentum'] = (growth[self.windows[0]] - growth[self.windows[-1]])[:, first:]
+        
+        months = self.months[first:]
+        index = pd.MultiIndex.from_arrays([
+            np.repeat([d for d, _ in self.segments], len(months)),
+            np.repeat([v for _, v in self.segments], len(months)),
+            np.tile(months, n_segments)
+        ], names=['dimension', 'segment', 'month'])
+        
+        return pd.DataFrame({name: values.ravel() for name, values in columns.items()}, index=index)
+    
+    def top_movers(self, dimension, window=None, n=10, min_additions=1):
+        """
+        Segments with the highest growth in the latest month
+        
+        Parameters:
+        -----------
+        dimension : str
+            Segment dimension to rank
+        window : int, optional
+            Window whose growth is ranked (defaults to the shortest)
+        n : int
+            Number of segments to return
+        min_additions : int
+            Minimum additions in the latest window for a segment to qualify
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Latest-month trend rows for the top segments
+        """
+        window = window or self.windows[0]
+        if not self.n_months:
+            return self.trends().droplevel('dimension')
+        latest = self.trends(since=self.months[-1]).xs(dimension, level='dimension')
+        latest = latest[latest[f'additions_{window}m'] >= min_additions]
+        return latest.sort_values(f'growth_{window}m', ascending=False).head(n)
+
+
+def compute_monthly_trends(df, dimensions=('genre', 'country', 'type'), windows=(3, 6, 12)):
+    """
+    Compute rolling monthly trends of additions per segment
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe with 'date_added' and segment columns
+    dimensions : tuple of str
+        Segment dimensions to analyze
+    windows : tuple of int
+        Trailing window lengths in months
+        
+    Returns:
+    --------
+    pd.DataFrame
+        See TrendEngine.trends
+    """
+    return TrendEngine(dimensions=dimensions, windows=windows).update(df).trends()
+
+
+if __name__ == "__main__":
+    print("Trends Module")
+    print("Import this module to use trend analytics")
@@ -10,8 +10,14 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from wordcloud import WordCloud
+import html
+import os
 import warnings
 
+from . import analysis
+from .countries import country_iso3
+from .data_processing import build_country_index
+
 warnings.filterwarnings('ignore')
 
 # Set style
@@ -66,8 +72,9 @@ def create_top_countries_plot(df, n=10, save_path=None):
     save_path : str, optional
         Path to save the figure
     """
-    # Get top countries
-    top_countries = df['country'].value_counts().head(n)
+    # Get top countries, crediting every country of a co-production
+    top_countries = build_country_index(df)['country'].value_counts().head(n)
+    top_countries.index = top_countries.index.astype(str)
     
     fig, ax = plt.subplots(figsize=(10, 8))
     
@@ -324,7 +331,7 @@ def create_content_lag_plot(df, save_path=None):
     plt.show()
 
 
-def create_wordcloud(df, column='description', save_path=None):
+def create_wordcloud(df, column='description', save_path=None, frequencies=None):
     """
     Create a word cloud from text data
     
@@ -336,13 +343,18 @@ def create_wordcloud(df, column='description', save_path=None):
         Column name containing text data
     save_path : str, optional
         Path to save the figure
+    frequencies : dict, optional
+        Precomputed term weights, e.g. text_analysis.term_frequencies of a
+        segment; the raw text is not read when given
     """
-    text = ' '.join(df[column].dropna().astype(str))
-    
     wordcloud = WordCloud(width=1600, height=800, 
                           background_color='white',
                           colormap='Reds',
-                          max_words=100).generate(text)
+                          max_words=100)
+    if frequencies:
+        wordcloud.generate_from_frequencies(frequencies)
+    else:
+        wordcloud.generate(' '.join(df[column].dropna().astype(str)))
     
     fig, ax = plt.subplots(figsize=(16, 8))
     ax.imshow(wordcloud, interpolation='bilinear')
@@ -357,7 +369,62 @@ def create_wordcloud(df, column='description', save_path=None):
     plt.show()
 
 
-def create_interactive_geographic_plot(df):
+def _country_table(df):
+    """Title counts per canonical country, as in get_top_countries, with ISO-3 codes"""
+    counts = analysis.get_top_countries(df, n=None).reset_index()
+    counts.insert(0, 'iso3', counts['country'].map(country_iso3))
+    return counts[counts['iso3'].notna()].reset_index(drop=True)
+
+
+def build_dashboard_tables(df, top_n=15):
+    """
+    Pre-aggregate the small tables the interactive figures are drawn from
+    
+    Every table is bounded by the number of countries, genres, ratings or
+    months rather than titles, so figures built from them stay the same
+    size as the catalog grows. Duplicate title clusters are counted once,
+    and the country and genre tables come from the analysis functions.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    top_n : int
+        Number of genres kept in the genre table
+        
+    Returns:
+    --------
+    dict
+        'countries', 'monthly_additions', 'release_years', 'genres',
+        'ratings' and 'content_lag' dataframes
+    """
+    df = analysis.unique_titles(df)
+    countries = _country_table(df)
+    
+    months = df['date_added'].dt.to_period('M').dt.to_timestamp()
+    monthly_additions = (df.assign(month=months).dropna(subset=['month'])
+                         .groupby(['month', 'type']).size().reset_index(name='count'))
+    
+    release_years = df.groupby(['release_year', 'type']).size().reset_index(name='count')
+    
+    genres = analysis.get_top_genres(df, n=top_n).rename_axis('genre').reset_index(name='count')
+    
+    ratings = df['rating'].value_counts().rename_axis('rating').reset_index(name='count')
+    
+    content_lag = (df.dropna(subset=['year_added', 'content_lag_years'])
+                   .groupby(['year_added', 'content_lag_years']).size().reset_index(name='count'))
+    
+    return {
+        'countries': countries,
+        'monthly_additions': monthly_additions,
+        'release_years': release_years,
+        'genres': genres,
+        'ratings': ratings,
+        'content_lag': content_lag
+    }
+
+
+def create_interactive_geographic_plot(df, tables=None):
     """
     Create an interactive geographic plot using plotly
     
@@ -365,17 +432,18 @@ def create_interactive_geographic_plot(df):
     -----------
     df : pd.DataFrame
         Input dataframe with 'country' column
+    tables : dict, optional
+        Output of build_dashboard_tables, to reuse pre-aggregated counts
         
     Returns:
     --------
     plotly figure object
     """
-    country_counts = df['country'].value_counts().reset_index()
-    country_counts.columns = ['country', 'count']
+    country_counts = _country_table(df) if tables is None else tables['countries']
     
     fig = px.choropleth(country_counts, 
-                        locations='country',
-                        locationmode='country names',
+                        locations='iso3',
+                        locationmode='ISO-3',
                         color='count',
                         hover_name='country',
                         color_continuous_scale='Reds',
@@ -386,6 +454,106 @@ def create_interactive_geographic_plot(df):
     return fig
 
 
+def create_interactive_figures(df, tables=None, top_n=15):
+    """
+    Create the interactive dashboard figures from pre-aggregated tables
+    
+    Time series and scatter plots use WebGL traces so they stay responsive
+    with long histories.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Cleaned dataframe
+    tables : dict, optional
+        Output of build_dashboard_tables; computed from df if omitted
+    top_n : int
+        Number of genres to display
+        
+    Returns:
+    --------
+    dict
+        Figure name -> plotly figure object
+    """
+    tables = tables or build_dashboard_tables(df, top_n=top_n)
+    colors = {'Movie': '#E50914', 'TV Show': '#221F1F'}
+    
+    additions = go.Figure()
+    for content_type, group in tables['monthly_additions'].groupby('type'):
+        additions.add_trace(go.Scattergl(x=group['month'], y=group['count'], mode='lines',
+                                         name=content_type, line=dict(color=colors.get(content_type))))
+    additions.update_layout(title='Monthly Content Additions', xaxis_title='Month',
+                            yaxis_title='Number of Additions', height=500)
+    
+    releases = go.Figure()
+    for content_type, group in tables['release_years'].groupby('type'):
+        releases.add_trace(go.Scattergl(x=group['release_year'], y=group['count'], mode='lines+markers',
+                                        name=content_type, marker=dict(color=colors.get(content_type))))
+    releases.update_layout(title='Content Release Trends', xaxis_title='Release Year',
+                           yaxis_title='Number of Titles', height=500)
+    
+    genres = tables['genres'].iloc[::-1]
+    genre_fig = go.Figure(go.Bar(x=genres['count'], y=genres['genre'], orientation='h',
+                                 marker=dict(color='#B20710')))
+    genre_fig.update_layout(title=f'Top {len(genres)} Genres', xaxis_title='Number of Titles', height=600)
+    
+    rating_fig = go.Figure(go.Pie(labels=tables['ratings']['rating'], values=tables['ratings']['count']))
+    rating_fig.update_layout(title='Distribution of Content Ratings', height=500)
+    
+    lag = tables['content_lag']
+    lag_fig = go.Figure(go.Scattergl(
+        x=lag['year_added'], y=lag['content_lag_years'], mode='markers',
+        marker=dict(size=np.sqrt(lag['count']) * 3, color=lag['count'], colorscale='Reds', showscale=True),
+        text=lag['count'], hovertemplate='Added %{x}<br>Lag %{y} years<br>%{text} titles<extra></extra>'))
+    lag_fig.update_layout(title='Content Lag by Year Added', xaxis_title='Year Added',
+                          yaxis_title='Years Between Release and Addition', height=500)
+    
+    return {
+        'geography': create_interactive_geographic_plot(df, tables=tables),
+        'monthly_additions': additions,
+        'release_trends': releases,
+        'genres': genre_fig,
+        'ratings': rating_fig,
+        'content_lag': lag_fig
+    }
+
+
+def write_interactive_dashboard(figures, save_path, title='Streaming Content Dashboard',
+                                include_plotlyjs='cdn'):
+    """
+    Write several plotly figures into one HTML file sharing one plotly.js
+    
+    Parameters:
+    -----------
+    figures : dict or list
+        Plotly figures, e.g. from create_interactive_figures
+    save_path : str
+        Path of the HTML file to write
+    title : str
+        Page title
+    include_plotlyjs : str or bool
+        How the single plotly.js copy is included: 'cdn' (script tag), True
+        (embedded once, works offline) or 'directory' (plotly.min.js next to
+        the HTML file)
+    """
+    figures = list(figures.values()) if isinstance(figures, dict) else list(figures)
+    
+    # Only the first figure carries plotly.js; the rest reuse it
+    divs = [fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs if i == 0 else False)
+            for i, fig in enumerate(figures)]
+    if include_plotlyjs == 'directory':
+        from plotly.offline import get_plotlyjs
+        directory = os.path.dirname(os.path.abspath(save_path))
+        with open(os.path.join(directory, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+    
+    page = (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{html.escape(title)}</title>\n'
+            f'</head>\n<body>\n<h1>{html.escape(title)}</h1>\n' + '\n'.join(divs) + '\n</body>\n</html>\n')
+    
+    with open(save_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
 if __name__ == "__main__":
     print("Visualization Module")
     print("Import this module to use visualization functions")
@@ -0,0 +1,100 @@
+"""
+Parity tests: every available backend must reproduce the pandas results exactly
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analysis, data_processing
+from src.backends import available_backends, use_backend
+
+# Mismatched null-likes (None vs NaN) only warn in assert_frame_equal today
+pytestmark = pytest.mark.filterwarnings('error::FutureWarning')
+
+# Small catalog covering the string edge cases the kernels handle: missing
+# values, multi-valued and padded lists, repeated entries, ties, unicode,
+# malformed durations and dates, and a duplicated title
+CATALOG_CSV = """show_id,type,title,director,cast,country,date_added,release_year,rating,duration,listed_in,description
+s1,Movie,Dick Johnson Is Dead,Kirsten Johnson,,United States,"September 25, 2021",2020,PG-13,90 min,Documentaries,A father nears the end of his life.
+s2,TV Show,Blood & Water,,"Ama Qamata, Khosi Ngema, Gail Mabalane",South Africa,"September 24, 2021",2021,TV-MA,2 Seasons,"International TV Shows, TV Dramas, TV Mysteries",Crossed paths at a party.
+s3,TV Show,Ganglands,Julien Leclercq,"Sami Bouajila, Tracy Gotoas","France, Belgium","September 24, 2021",2021,TV-MA,1 Season,"Crime TV Shows, International TV Shows, TV Action & Adventure",A protector turns thief.
+s4,Movie,Sankofa,Haile Gerima,"Kofi Ghanaba, Oyafunmike Ogunlano","United States, Ghana, Burkina Faso, United Kingdom, Germany, Ethiopia","September 24, 2021",1993,TV-MA,125 min,"Dramas, Independent Movies, International Movies",A model is transported back in time.
+s5,TV Show,Kota Factory,,"Mayur More, Jitendra Kumar",India,"September 24, 2021",2021,TV-MA,2 Seasons,"International TV Shows, Romantic TV Shows, TV Comedies",Students prepare for exams.
+s6,Movie,The Starling,Theodore Melfi,"Melissa McCarthy, Chris O'Dowd, Kevin Kline",USA,"September 24, 2021",2021,PG-13,104 min,"Comedies, Dramas",A woman adjusts to life after a loss.
+s7,Movie,Sankofa,Haile Gerima,"Kofi Ghanaba, Oyafunmike Ogunlano","Ghana, United States",,1993,TV-MA,124 min,"Dramas, International Movies",A model is transported back in time.
+s8,Movie,Amélie,Jean-Pierre Jeunet,"Audrey Tautou, Mathieu Kassovitz","France, Germany,","  July 1, 2019",2001,R,122 min,"Comedies, International Movies, Romantic Movies",A shy waitress decides to change lives.
+s9,TV Show,Untitled,,,,,2019,74 min,,"TV Comedies",
+s10,Movie,Jeans,S. Shankar,"Prashanth, Aishwarya Rai Bachchan, Nassar, Nassar",India,"December 15, 2019",1998,TV-14,166 min,"Comedies, International Movies, Romantic Movies",Twin brothers marry twin sisters.
+s11,Movie,Grown Ups,Dennis Dugan,"Adam Sandler, Kevin James, Chris Rock",United States,"September 1, 2021",2010,PG-13,,Comedies,Friends reunite for a holiday.
+s12,TV Show,Dark,,"Louis Hofmann, Oliver Masucci",Germany,"December 1, 2017",2017,TV-MA,3 Seasons,"Crime TV Shows, International TV Shows, TV Dramas",A missing child sets four families on a hunt.
+s13,Movie,Bad Date,Someone,"Nassar",Atlantis,"not a date",2022,NR,abc min,"Dramas",
+"""
+
+# Public functions compared across backends
+FUNCTIONS = {
+    'get_top_genres': analysis.get_top_genres,
+    'get_top_directors': analysis.get_top_directors,
+    'get_top_actors': analysis.get_top_actors,
+    'get_top_countries': analysis.get_top_countries,
+    'analyze_content_by_year': analysis.analyze_content_by_year,
+    'analyze_content_by_country': lambda df: analysis.analyze_content_by_country(df, 'United States'),
+    'calculate_diversity_metrics': analysis.calculate_diversity_metrics,
+    'identify_content_gaps': analysis.identify_content_gaps,
+    'create_executive_summary': analysis.create_executive_summary,
+    'extract_duration_info': data_processing.extract_duration_info
+}
+
+
+def assert_identical(expected, result):
+    """Exact equality of nested analysis results, treating NaN as equal"""
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(result, expected, check_exact=True)
+    elif isinstance(expected, pd.Index):
+        pd.testing.assert_index_equal(result, expected, exact=True)
+    elif isinstance(expected, dict):
+        assert list(result) == list(expected)
+        for key in expected:
+            assert_identical(expected[key], result[key])
+    elif isinstance(expected, (list, tuple)):
+        assert type(result) is type(expected) and len(result) == len(expected)
+        for left, right in zip(expected, result):
+            assert_identical(left, right)
+    elif pd.api.types.is_scalar(expected) and pd.isna(expected):
+        assert pd.api.types.is_scalar(result) and pd.isna(result)
+    else:
+        assert result == expected
+        assert type(result) is type(expected) or isinstance(expected, (int, float, np.number))
+
+
+@pytest.fixture(scope='module')
+def catalog_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('catalog') / 'titles.csv'
+    path.write_text(CATALOG_CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture(scope='module')
+def catalog(catalog_path):
+    with use_backend('pandas'):
+        return data_processing.load_and_clean_data(catalog_path)
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_load_and_clean_data_parity(backend, catalog_path, catalog):
+    with use_backend(backend):
+        result = data_processing.load_and_clean_data(catalog_path)
+    assert_identical(catalog, result)
+
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('name', list(FUNCTIONS))
+def test_function_parity(backend, name, catalog):
+    func = FUNCTIONS[name]
+    with use_backend('pandas'):
+        expected = func(catalog)
+    with use_backend(backend):
+        result = func(catalog)
+    assert_identical(expected, result)
@@ -0,0 +1,26 @@
+"""
+Loading applies the declared schema dtypes on every read path
+"""
+
+import pytest
+
+from src import data_processing, profiling
+
+from test_backends import CATALOG_CSV
+
+
+@pytest.fixture(scope='module')
+def catalog_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('catalog') / 'titles.csv'
+    path.write_text(CATALOG_CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('validate', [True, False])
+@pytest.mark.parametrize('read', ['whole', 'chunked', 'profiled'])
+def test_declared_dtypes_on_every_path(read, validate, catalog_path):
+    options = {'whole': {}, 'chunked': {'chunksize': 4}, 'profiled': {'profile': profiling.DataProfile()}}[read]
+    expected = data_processing.load_data(catalog_path)
+    result = data_processing.load_data(catalog_path, validate=validate, **options)
+    assert result['release_year'].dtype == expected['release_year'].dtype
+    assert result['release_year'].tolist() == expected['release_year'].tolist()
@@ -0,0 +1,54 @@
+"""
+Near-duplicate title detection: re-listings merge, different works stay apart
+"""
+
+import pandas as pd
+
+from src import data_processing
+
+
+def _catalog(rows):
+    return pd.DataFrame(rows, columns=['type', 'title', 'director', 'cast', 'release_year'])
+
+
+def test_remastered_copies_merge():
+    df = _catalog([
+        ['Movie', 'The Irishman', 'Martin Scorsese', 'Robert De Niro, Al Pacino', 2019],
+        ['Movie', 'The Irishman (Remastered)', 'Martin Scorsese', 'Robert De Niro, Al Pacino', 2019],
+        ['Movie', 'The Irishman: Director\'s Cut', 'Martin Scorsese', 'Robert De Niro, Al Pacino', 2019],
+        ['TV Show', 'Dark', None, 'Louis Hofmann, Oliver Masucci', 2017],
+        ['TV Show', 'Dark (Remastered)', None, 'Louis Hofmann, Oliver Masucci', 2017]
+    ])
+    clusters = data_processing.find_duplicate_clusters(df)['title_cluster_id'].tolist()
+    assert clusters[0] == clusters[1] == clusters[2]
+    assert clusters[3] == clusters[4] != clusters[0]
+
+
+def test_sequels_stay_apart():
+    df = _catalog([
+        ['Movie', 'Harry Potter 1', 'Chris Columbus', 'Daniel Radcliffe, Emma Watson', 2001],
+        ['Movie', 'Harry Potter 2', 'Chris Columbus', 'Daniel Radcliffe, Emma Watson', 2001],
+        ['Movie', 'Naruto the Movie', 'Tensai Okamura', 'Junko Takeuchi, Chie Nakamura', 2004],
+        ['Movie', 'Naruto the Movie 2', 'Tensai Okamura', 'Junko Takeuchi, Chie Nakamura', 2004],
+        ['Movie', 'Rocky', 'John G. Avildsen', 'Sylvester Stallone, Talia Shire', 1976],
+        ['Movie', 'Rocky II', 'John G. Avildsen', 'Sylvester Stallone, Talia Shire', 1976],
+        ['Movie', 'Sankofa', 'Haile Gerima', 'Kofi Ghanaba', 1993],
+        ['Movie', 'Sankofa', 'Haile Gerima', 'Kofi Ghanaba', 2003]
+    ])
+    clusters = data_processing.find_duplicate_clusters(df)['title_cluster_id']
+    assert clusters.nunique() == len(df)
+
+
+def test_planted_remasters_in_catalog():
+    base = _catalog([
+        ['Movie', f'Feature {word} {i}', f'Director {i % 97}', f'Actor {i % 89}, Actor {i % 83}', 1990 + i % 30]
+        for i, word in enumerate(['Night', 'Ocean', 'River', 'Storm', 'Garden'] * 40)
+    ])
+    planted = base.iloc[::4].copy()
+    planted['title'] = planted['title'] + ' (Remastered)'
+    df = pd.concat([base, planted], ignore_index=True)
+    
+    clusters = data_processing.find_duplicate_clusters(df)['title_cluster_id']
+    originals = clusters.iloc[:len(base)]
+    assert originals.nunique() == len(base)
+    assert (clusters.iloc[len(base):].to_numpy() == originals.iloc[::4].to_numpy()).all()
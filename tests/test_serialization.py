@@ -0,0 +1,62 @@
+"""
+Round-trips of analysis results through the JSON and Arrow formats
+"""
+
+import pandas as pd
+import pytest
+
+from src import data_processing, forecasting, serialization, trends
+
+from test_backends import assert_identical
+
+GENRES = ['Dramas', 'Comedies', 'Documentaries, International Movies']
+COUNTRIES = ['United States', 'India', 'France, Germany']
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    months = pd.date_range('2018-01-01', periods=36, freq='MS')
+    rows = [{
+        'show_id': f's{i}',
+        'type': 'Movie' if i % 3 else 'TV Show',
+        'title': f'Title {i}',
+        'country': COUNTRIES[i % len(COUNTRIES)],
+        'date_added': months[(i * 7) % len(months)].strftime('%B %d, %Y'),
+        'release_year': 2000 + i % 18,
+        'rating': 'TV-MA',
+        'duration': '90 min' if i % 3 else '2 Seasons',
+        'listed_in': GENRES[i % len(GENRES)]
+    } for i in range(120)]
+    path = tmp_path_factory.mktemp('catalog') / 'titles.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return data_processing.load_and_clean_data(str(path))
+
+
+RESULTS = {
+    'compute_monthly_trends': trends.compute_monthly_trends,
+    'forecast_additions': lambda df: forecasting.forecast_additions(df, horizon=6),
+    'forecast_total': lambda df: forecasting.forecast_additions(df, dimensions=(), horizon=6)
+}
+
+FORMATS = {
+    'json': (serialization.to_json, serialization.from_json),
+    'arrow': (serialization.to_arrow, serialization.read_arrow)
+}
+
+
+@pytest.mark.parametrize('fmt', list(FORMATS))
+@pytest.mark.parametrize('name', list(RESULTS))
+def test_period_results_round_trip(name, fmt, catalog):
+    if fmt == 'arrow' and serialization.pa is None:
+        pytest.skip('pyarrow is not installed')
+    result = RESULTS[name](catalog)
+    assert any(isinstance(dtype, pd.PeriodDtype) for dtype in
+               list(result.dtypes) + [result.index.get_level_values(i).dtype for i in range(result.index.nlevels)])
+    write, read = FORMATS[fmt]
+    assert_identical(result, read(write(result)))
+
+
+def test_period_scalars_round_trip():
+    values = {'month': pd.Period('2021-03', freq='M'), 'quarter': pd.Period('2020Q4', freq='Q-DEC'),
+              'missing': pd.NaT, 'months': pd.period_range('2020-11', periods=3, freq='M')}
+    assert_identical(values, serialization.from_json(serialization.to_json(values)))
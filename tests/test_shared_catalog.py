@@ -0,0 +1,31 @@
+"""
+Analyses mapped over a published catalog see every column they read
+"""
+
+import pytest
+
+from src import analysis, data_processing
+from src.shared_catalog import map_over_catalog, publish_catalog
+
+from test_backends import CATALOG_CSV, assert_identical
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    path = tmp_path_factory.mktemp('catalog') / 'titles.csv'
+    path.write_text(CATALOG_CSV, encoding='utf-8')
+    return data_processing.load_and_clean_data(str(path))
+
+
+@pytest.mark.parametrize('func', [analysis.get_top_actors, analysis.calculate_diversity_metrics])
+def test_published_for_analyses(func, catalog):
+    with publish_catalog(catalog, analyses=[func]) as shared:
+        assert set(func.required_columns) <= set(shared.to_frame().columns)
+        result, = map_over_catalog(func, [()], shared, max_workers=1)
+    assert_identical(func(catalog), result)
+
+
+def test_missing_columns_fail_before_mapping(catalog):
+    with publish_catalog(catalog, columns=['type', 'release_year']) as shared:
+        with pytest.raises(ValueError, match='cast'):
+            map_over_catalog(analysis.get_top_actors, [()], shared)
@@ -0,0 +1,43 @@
+"""
+Replays of the catalog must match the batch analyses
+"""
+
+import pandas as pd
+import pytest
+
+from src import data_processing, streaming
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    rows = [{
+        'show_id': f's{i}',
+        'type': 'Movie' if i % 4 else 'TV Show',
+        'title': f'Feature {word} {i}',
+        'director': f'Director {i % 7}',
+        'cast': f'Actor {i % 11}, Actor {i % 13}',
+        'country': ['United States', 'India', 'France'][i % 3],
+        'date_added': pd.Timestamp('2016-01-01') + pd.Timedelta(days=37 * i),
+        'release_year': 2000 + i % 20,
+        'rating': 'TV-MA',
+        'duration': '90 min' if i % 4 else '2 Seasons',
+        'listed_in': ['Dramas', 'Comedies', 'Dramas, International Movies'][i % 3]
+    } for i, word in enumerate(['Night', 'Ocean', 'River', 'Storm', 'Garden'] * 12)]
+    catalog = pd.DataFrame(rows)
+    # Re-listed copies whose first listing has no addition date
+    copies = catalog.iloc[::5].copy()
+    copies['title'] = copies['title'] + ' (Remastered)'
+    catalog.loc[copies.index, 'date_added'] = pd.NaT
+    catalog = pd.concat([catalog, copies], ignore_index=True)
+    catalog['date_added'] = catalog['date_added'].dt.strftime('%B %d, %Y')
+    
+    path = tmp_path_factory.mktemp('catalog') / 'titles.csv'
+    catalog.to_csv(path, index=False)
+    return data_processing.load_and_clean_data(str(path), detect_duplicates=True)
+
+
+def test_replay_matches_batch_with_duplicates(catalog):
+    assert catalog['title_cluster_id'].nunique() < len(catalog)
+    report = streaming.replay_catalog(catalog)
+    assert report['events'] == len(streaming.timed_titles(catalog))
+    assert all(streaming.verify_replay(catalog, report['results']).values())
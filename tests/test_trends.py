@@ -0,0 +1,19 @@
+"""
+Incremental trend engine edge cases
+"""
+
+from src.trends import TrendEngine
+
+
+def test_top_movers_without_months():
+    movers = TrendEngine().top_movers('genre')
+    assert movers.empty
+    assert list(movers.index.names) == ['segment', 'month']
+
+
+def test_reserve_keeps_spare_capacity():
+    engine = TrendEngine()
+    engine._reserve(40, 120)
+    engine._reserve(50, 10)
+    assert engine._counts.shape == (80, 120)
+    assert engine._cumulative_buffer.shape == (80, 121)